@@ -425,10 +425,8 @@ class OptimalTargets(analysis.AnalysisInterface):
 
         # Write all functions to the .js file
         if self.dump_files:
-            with open(
-                    os.path.join(out_dir,
-                                 constants.OPTIMAL_TARGETS_ALL_FUNCTIONS),
-                    'w') as func_file:
-                func_file.write("var analysis_1_data = ")
-                func_file.write(json.dumps(all_functions_json))
+            json_report.write_json_records(
+                all_functions_json,
+                os.path.join(out_dir, constants.OPTIMAL_TARGETS_ALL_FUNCTIONS),
+                prefix="var analysis_1_data = ")
         return html_string
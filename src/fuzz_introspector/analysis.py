@@ -14,17 +14,23 @@
 """Performs analysis on the profiles output from fuzz introspector LLVM pass"""
 
 import abc
+import bisect
+import concurrent.futures
 import logging
 import multiprocessing
 import os
+import re
 import shutil
 
-from typing import (Dict, List, Type, Set, Union)
+from typing import (Any, Dict, List, Optional, Type, Set, Tuple, Union)
+
+import numpy as np
 
 from fuzz_introspector import (cfg_load, code_coverage, constants, data_loader,
                                debug_info, html_helpers, json_report, utils)
 
 from fuzz_introspector.datatypes import (
+    branch_profile,
     project_profile,
     fuzzer_profile,
     function_profile,
@@ -50,30 +56,44 @@ class IntrospectionProject():
         self.base_folder = target_folder
         self.coverage_url = coverage_url
         self.optional_analyses = []
+        self.jobs: Optional[int] = None
 
     def load_data_files(self,
                         parallelise=True,
                         correlation_file=None,
                         out_dir: str = '',
-                        harness_lists=None):
+                        harness_lists=None,
+                        jobs: Optional[int] = None):
         """Generates the `proj_profile` and `profiles` elements of this class
         based on the raw data given as arguments. This function must be called
         before any real use of `IntrospectionProject` can happen.
         """
 
-        if harness_lists:
-            logger.info('Loading profiles using harness list')
-            self.profiles = []
-            for report_yaml, calltree_text in harness_lists:
-                self.profiles.append(
-                    fuzzer_profile.FuzzerProfile('cfg_file',
-                                                 report_yaml,
-                                                 self.language,
-                                                 cfg_content=calltree_text))
-        else:
-            logger.info('Loading profiles using files')
-            self.profiles = data_loader.load_all_profiles(
-                self.base_folder, self.language, parallelise)
+        correlation_dict = utils.data_file_read_yaml(correlation_file)
+        self.jobs = jobs
+
+        # Parse the coverage reports once, before the profiles are loaded, as
+        # profiles without a report of their own use all of them. The parsed
+        # reports are only needed while loading the profiles.
+        try:
+            if (self.language in ('c-cpp', 'rust')
+                    and not os.getenv('FI_KERNEL_COV', '')):
+                code_coverage.preload_llvm_coverage(self.base_folder,
+                                                    self.language == 'rust',
+                                                    parallelise)
+
+            if harness_lists:
+                logger.info('Loading profiles using harness list')
+                self.profiles = data_loader.load_all_harness_profiles(
+                    harness_lists, self.base_folder, self.language,
+                    correlation_dict, parallelise, jobs)
+            else:
+                logger.info('Loading profiles using files')
+                self.profiles = data_loader.load_all_profiles(
+                    self.base_folder, self.language, parallelise,
+                    correlation_dict, jobs)
+        finally:
+            code_coverage.clear_llvm_coverage_cache()
 
         logger.info("Found %d profiles", len(self.profiles))
         if len(self.profiles) == 0:
@@ -81,35 +101,6 @@ class IntrospectionProject():
             raise DataLoaderError("No fuzzer profiles")
 
         self.input_bugs = data_loader.try_load_input_bugs()
-        correlation_dict = utils.data_file_read_yaml(correlation_file)
-        if correlation_dict is not None and "pairings" in correlation_dict:
-            for profile in self.profiles:
-                profile.correlate_executable_name(correlation_dict)
-
-        logger.info("[+] Accummulating profiles")
-        logger.info("Accummulating using multiprocessing")
-        manager = multiprocessing.Manager()
-        semaphore = multiprocessing.Semaphore(10)
-
-        return_dict = manager.dict()
-
-        jobs = []
-        idx = 0
-        for profile in self.profiles:
-            p = multiprocessing.Process(
-                target=fuzzer_profile.FuzzerProfile.accummulate_profile,
-                args=(profile, self.base_folder, return_dict, f"uniq-{idx}",
-                      semaphore))
-            jobs.append(p)
-            idx += 1
-            p.start()
-        for proc in jobs:
-            proc.join()
-
-        new_profiles = []
-        for idx in return_dict:
-            new_profiles.append(return_dict[idx])
-        self.profiles = new_profiles
 
         logger.info("[+] Creating project profile")
         self.proj_profile = project_profile.MergedProjectProfile(
@@ -120,10 +111,10 @@ class IntrospectionProject():
         for profile in self.profiles:
             profile.refine_paths(self.proj_profile.basefolder)
 
-        for profile in self.profiles:
-            overlay_calltree_with_coverage(profile, self.proj_profile,
-                                           self.coverage_url, self.base_folder,
-                                           out_dir)
+        overlay_all_calltrees_with_coverage(self.profiles, self.proj_profile,
+                                            self.coverage_url,
+                                            self.base_folder, out_dir,
+                                            parallelise, jobs)
         # Load all debug files
         self.debug_files = data_loader.load_all_debug_files(self.base_folder)
 
@@ -135,14 +126,16 @@ class IntrospectionProject():
 
     def load_debug_report(self, out_dir, dump_files=True):
         """Load and digest debug information."""
-        self.debug_report = debug_info.load_debug_report(self.debug_files)
+        self.debug_report = debug_info.load_debug_report(self.debug_files,
+                                                         jobs=self.jobs)
 
         # Load the yaml  content of debug files holding type information and
-        # function information.
-        self.debug_all_types = debug_info.load_debug_all_yaml_files(
-            self.debug_type_files)
+        # function information. The types are indexed by address, and are
+        # only turned into dicts when looked up.
+        self.debug_all_types = debug_info.DebugTypeTable(self.debug_type_files,
+                                                         jobs=self.jobs)
         self.debug_all_functions = debug_info.load_debug_all_yaml_files(
-            self.debug_function_files)
+            self.debug_function_files, jobs=self.jobs)
 
         # Index the functions based on file locations. This is useful for
         # quickly looking up debug function details based on their file
@@ -158,9 +151,7 @@ class IntrospectionProject():
 
         # Cleanup some debug values that we know have weird names and
         # not the names fro the source.
-        for debug_type in self.debug_all_types:
-            if debug_type['name'] == '_Bool':
-                debug_type['name'] = 'bool'
+        self.debug_all_types.rename_types('_Bool', 'bool')
 
         self.debug_all_functions = no_path_debug_funcs + list(
             tmp_debug_functions.values())
@@ -358,13 +349,8 @@ def get_node_coverage_hitcount(demangled_name: str, callstack: Dict[int, str],
                 # Handle coverage
                 return profile.coverage.get_kernel_hitcount(node)
             else:
-                coverage_data = profile.coverage.get_hit_details(
-                    callstack_get_parent(node, callstack))
-                for (n_line_number, hit_count_cov) in coverage_data:
-                    logger.debug("  - iterating %d : %d", n_line_number,
-                                 hit_count_cov)
-                    if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                        node_hitcount = hit_count_cov
+                node_hitcount = profile.coverage.get_line_hitcount(
+                    callstack_get_parent(node, callstack), node.src_linenumber)
         elif profile.target_lang == "python":
             ih = profile.coverage.is_file_lineno_hit(
                 callstack_get_parent(node, callstack), node.src_linenumber,
@@ -372,29 +358,14 @@ def get_node_coverage_hitcount(demangled_name: str, callstack: Dict[int, str],
             if ih:
                 node_hitcount = 200
         elif profile.target_lang == "jvm":
-            coverage_data = profile.coverage.get_hit_details(
-                callstack_get_parent(node, callstack))
-            for (n_line_number, hit_count_cov) in coverage_data:
-                logger.debug("  - iterating %d : %d", n_line_number,
-                             hit_count_cov)
-                if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                    node_hitcount = hit_count_cov
+            node_hitcount = profile.coverage.get_line_hitcount(
+                callstack_get_parent(node, callstack), node.src_linenumber)
         elif profile.target_lang == "rust":
-            coverage_data = profile.coverage.get_hit_details(
-                callstack_get_parent(node, callstack))
-            for (n_line_number, hit_count_cov) in coverage_data:
-                logger.debug("  - iterating %d : %d", n_line_number,
-                             hit_count_cov)
-                if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                    node_hitcount = hit_count_cov
+            node_hitcount = profile.coverage.get_line_hitcount(
+                callstack_get_parent(node, callstack), node.src_linenumber)
         elif profile.target_lang == "go":
-            coverage_data = profile.coverage.get_hit_details(
-                callstack_get_parent(node, callstack))
-            for (n_line_number, hit_count_cov) in coverage_data:
-                logger.debug("  - iterating %d : %d", n_line_number,
-                             hit_count_cov)
-                if n_line_number == node.src_linenumber and hit_count_cov > 0:
-                    node_hitcount = hit_count_cov
+            node_hitcount = profile.coverage.get_line_hitcount(
+                callstack_get_parent(node, callstack), node.src_linenumber)
         node.cov_parent = callstack_get_parent(node, callstack)
     else:
         logger.error(
@@ -476,8 +447,26 @@ def get_parent_callsite_link(node, callstack, profile, target_coverage_url):
 
 def overlay_calltree_with_coverage(
         profile: fuzzer_profile.FuzzerProfile,
-        proj_profile: project_profile.MergedProjectProfile, coverage_url: str,
-        basefolder: str, out_dir) -> None:
+        proj_profile: project_profile.MergedProjectProfile,
+        coverage_url: str,
+        basefolder: str,
+        out_dir,
+        branch_table: Optional['BranchComplexityTable'] = None) -> None:
+    """Overlays the calltree of a fuzzer with its coverage, and adds the
+    branch blockers of the fuzzer to the report. The branch complexity table
+    of the project functions can be shared between fuzzers."""
+    if _overlay_calltree(profile, proj_profile, coverage_url, branch_table):
+        _add_branch_blockers_to_report(profile, out_dir)
+
+
+def _overlay_calltree(
+        profile: fuzzer_profile.FuzzerProfile,
+        proj_profile: project_profile.MergedProjectProfile,
+        coverage_url: str,
+        branch_table: Optional['BranchComplexityTable'] = None) -> bool:
+    """Sets the coverage details of the calltree nodes and the branch
+    blockers of a fuzzer. Returns False if the fuzzer has no coverage or
+    calltree."""
     # We use the callstack to keep track of all function parents. We need this
     # when looking up if a callsite was hit or not. This is because the coverage
     # information about a callsite is located in coverage data of the function
@@ -485,21 +474,27 @@ def overlay_calltree_with_coverage(
     callstack: Dict[int, str] = {}
 
     if profile.coverage is None:
-        return
+        return False
 
     is_first = True
-    ct_idx = 0
     if profile.fuzzer_callsite_calltree is None:
-        return
+        return False
 
     target_name = profile.identifier
     target_coverage_url = utils.get_target_coverage_url(
         coverage_url, target_name, profile.target_lang)
     logger.info("Using coverage url: %s", target_coverage_url)
-    for node in cfg_load.extract_all_callsites(
-            profile.fuzzer_callsite_calltree):
+
+    # Overlay the coverage in a single pass over the calltree, collecting the
+    # data needed to find the nodes blocking the fuzzer as we go.
+    all_callsites = cfg_load.extract_all_callsites(
+        profile.fuzzer_callsite_calltree)
+    hit_zero = np.zeros(len(all_callsites), dtype=bool)
+    depths = np.zeros(len(all_callsites), dtype=np.int64)
+    complexities = np.zeros(len(all_callsites), dtype=np.int64)
+    later_node_hit = False
+    for ct_idx, node in enumerate(all_callsites):
         node.cov_ct_idx = ct_idx
-        ct_idx += 1
 
         if profile.target_lang == "jvm":
             demangled_name = utils.demangle_jvm_func(
@@ -525,72 +520,50 @@ def overlay_calltree_with_coverage(
                                               target_coverage_url)
         node.cov_callsite_link = get_parent_callsite_link(
             node, callstack, profile, target_coverage_url)
+
+        depths[ct_idx] = node.depth
+        if node.cov_hitcount == 0:
+            hit_zero[ct_idx] = True
+            fd = proj_profile.dst_to_fd_cache.get(node.dst_function_name)
+            if fd is not None:
+                complexities[ct_idx] = fd.total_cyclomatic_complexity
+        elif ct_idx > 0 and node.cov_hitcount > 0:
+            later_node_hit = True
+
     # For python, do a hack where we check if any node is covered, and, if so,
     # ensure the entrypoint is covered.
-    logger.info("Overlaying 2")
-    all_nodes = cfg_load.extract_all_callsites(
-        profile.fuzzer_callsite_calltree)
-    if len(all_nodes) > 0:
-        for node in cfg_load.extract_all_callsites(
-                profile.fuzzer_callsite_calltree)[1:]:
-            if node.cov_hitcount > 0:
-                all_nodes[0].cov_hitcount = 200
-                all_nodes[0].cov_color = get_hit_count_color(200)
-                break
+    if later_node_hit:
+        all_callsites[0].cov_hitcount = 200
+        all_callsites[0].cov_color = get_hit_count_color(200)
+        hit_zero[0] = False
 
     # Extract data about which nodes unlocks data
-    logger.info("Overlaying 3")
-    all_callsites = cfg_load.extract_all_callsites(
-        profile.fuzzer_callsite_calltree)
-    prev_end = -1
-    for idx1, n1 in enumerate(all_callsites):
-        n1 = all_callsites[idx1]
-        prev = None
-        if idx1 > 0:
-            prev = all_callsites[idx1 - 1]
-        if n1.cov_hitcount == 0 and (
-            (prev is not None and prev.depth <= n1.depth) or idx1 < prev_end):
-            n1.cov_forward_reds = 0
-            n1.cov_largest_blocked_func = "none"
-            continue
-
-        # Read forward untill we see a green node.
-        idx2 = idx1 + 1
-        forward_red = 0
-        largest_blocked_name = ""
-        largest_blocked_count = 0
-        while idx2 < len(all_callsites):
-            # Check if we should break or increment forward_red
-            n2 = all_callsites[idx2]
-
-            # break if the node is visited. We *could* change this to another
-            # metric, e.g. all nodes underneath n1 that are off, i.e. instead
-            # of breaking here we would increment forward_red iff
-            # cov-hitcount != 0. This, however, would prioritise blockers at
-            # the top rather than precisely locate them in the calltree.
-            if n2.cov_hitcount != 0:
-                break
-
-            try:
-                fd = proj_profile.dst_to_fd_cache[n2.dst_function_name]
-                if fd.total_cyclomatic_complexity > largest_blocked_count:
-                    largest_blocked_count = fd.total_cyclomatic_complexity
-                    largest_blocked_name = n2.dst_function_name
-            except KeyError:
-                pass
-
-            forward_red += 1
-            idx2 += 1
-        prev_end = idx2 - 1
-        # logger.info("Assigning forward red: %d for index %d"%(forward_red, idx1))
-        n1.cov_forward_reds = forward_red
-        n1.cov_largest_blocked_func = largest_blocked_name
+    logger.info("Finding calltree blockers")
+    forward_reds, largest_blocked, skipped = calltree_forward_reds(
+        hit_zero, depths, complexities)
+    for node, node_forward_reds, blocked_idx, node_skipped in zip(
+            all_callsites, forward_reds.tolist(), largest_blocked.tolist(),
+            skipped.tolist()):
+        node.cov_forward_reds = node_forward_reds
+        if node_skipped:
+            node.cov_largest_blocked_func = "none"
+        elif blocked_idx >= 0:
+            node.cov_largest_blocked_func = all_callsites[
+                blocked_idx].dst_function_name
+        else:
+            node.cov_largest_blocked_func = ""
 
     logger.info("Updating branch complexities")
-    update_branch_complexities(proj_profile.all_functions, profile.coverage)
+    update_branch_complexities(proj_profile.all_functions, profile.coverage,
+                               branch_table)
     profile.branch_blockers = detect_branch_level_blockers(
         proj_profile.all_functions, profile, target_coverage_url)
     logger.info("[+] found %d branch blockers.", len(profile.branch_blockers))
+    return True
+
+
+def _add_branch_blockers_to_report(profile: fuzzer_profile.FuzzerProfile,
+                                   out_dir: str) -> None:
     branch_blockers_list = []
     for blk in profile.branch_blockers:
         branch_blockers_list.append({
@@ -624,40 +597,242 @@ def overlay_calltree_with_coverage(
                                                        out_dir)
 
 
+# Calltree node attributes set by the coverage overlay, sent back by the
+# overlay workers.
+_OVERLAY_NODE_ATTRS = ('cov_ct_idx', 'cov_hitcount', 'cov_color', 'cov_link',
+                       'cov_callsite_link', 'cov_parent', 'cov_forward_reds',
+                       'cov_largest_blocked_func')
+
+# Profiles and project profile of overlay_all_calltrees_with_coverage. The
+# workers are forked after it is set, so they inherit the project data
+# instead of receiving a copy of it for every fuzzer.
+_overlay_state: Optional[Tuple[List[fuzzer_profile.FuzzerProfile],
+                               project_profile.MergedProjectProfile, str,
+                               'BranchComplexityTable']] = None
+
+
+def _overlay_calltree_worker(
+    profile_idx: int
+) -> Optional[Tuple[Dict[str, List[Any]], List[FuzzBranchBlocker]]]:
+    """Overlays the calltree of a fuzzer in a worker process. Returns the
+    overlay attributes of the calltree nodes, in preorder, and the branch
+    blockers of the fuzzer."""
+    assert _overlay_state is not None
+    profiles, proj_profile, coverage_url, branch_table = _overlay_state
+    profile = profiles[profile_idx]
+    if not _overlay_calltree(profile, proj_profile, coverage_url,
+                             branch_table):
+        return None
+    all_callsites = cfg_load.extract_all_callsites(
+        profile.fuzzer_callsite_calltree)
+    node_attrs = {
+        attr: [getattr(node, attr) for node in all_callsites]
+        for attr in _OVERLAY_NODE_ATTRS
+    }
+    return node_attrs, profile.branch_blockers
+
+
+def overlay_all_calltrees_with_coverage(
+        profiles: List[fuzzer_profile.FuzzerProfile],
+        proj_profile: project_profile.MergedProjectProfile,
+        coverage_url: str,
+        basefolder: str,
+        out_dir: str,
+        parallelise: bool = True,
+        jobs: Optional[int] = None) -> None:
+    """Runs overlay_calltree_with_coverage for each fuzzer. The fuzzers are
+    independent, so they are overlaid in a pool of forked processes when
+    parallelise is set, and the results are applied to the profiles in
+    order."""
+    branch_table = BranchComplexityTable(proj_profile.all_functions)
+    worker_count = min(
+        data_loader.get_worker_count(proj_profile.target_lang, jobs),
+        len(profiles))
+    if (not parallelise or worker_count <= 1
+            or multiprocessing.parent_process() is not None
+            or 'fork' not in multiprocessing.get_all_start_methods()):
+        for profile in profiles:
+            overlay_calltree_with_coverage(profile, proj_profile, coverage_url,
+                                           basefolder, out_dir, branch_table)
+        return
+
+    # The workers read the profiles from _overlay_state, so they have to be
+    # forked whatever the default start method is.
+    global _overlay_state
+    _overlay_state = (profiles, proj_profile, coverage_url, branch_table)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=worker_count,
+                mp_context=multiprocessing.get_context('fork')) as executor:
+            results = list(
+                executor.map(_overlay_calltree_worker, range(len(profiles))))
+    finally:
+        _overlay_state = None
+
+    last_overlaid = None
+    for profile, result in zip(profiles, results):
+        if result is None:
+            continue
+        node_attrs, branch_blockers = result
+        all_callsites = cfg_load.extract_all_callsites(
+            profile.fuzzer_callsite_calltree)
+        for attr, values in node_attrs.items():
+            for node, value in zip(all_callsites, values):
+                setattr(node, attr, value)
+        profile.branch_blockers = branch_blockers
+        _add_branch_blockers_to_report(profile, out_dir)
+        last_overlaid = profile
+
+    # The branch side complexities are stored in the project functions, and
+    # are left as computed for the last fuzzer when overlaying serially.
+    if last_overlaid is not None and last_overlaid.coverage is not None:
+        update_branch_complexities(proj_profile.all_functions,
+                                   last_overlaid.coverage, branch_table)
+
+
+def calltree_forward_reds(
+        hit_zero: np.ndarray, depths: np.ndarray,
+        complexities: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Finds the nodes of a calltree, in preorder, blocking the fuzzer.
+
+    A node blocks the nodes without coverage that directly follow it, its
+    forward reds, and the largest blocked function is the first of these
+    with the highest positive complexity. Nodes without coverage are not
+    considered as blockers themselves if they are within the forward reds of
+    a previous node, or if they are not shallower than the previous node.
+    The exception is the first node. As the forward reds of a node are the
+    remainder of a run of nodes without coverage, the runs are computed once
+    with a suffix scan instead of reading forward from every node.
+
+    Returns the forward reds of each node, the index of its largest blocked
+    function or -1 if there is none, and whether the node was skipped.
+    """
+    node_count = len(hit_zero)
+    forward_reds = np.zeros(node_count, dtype=np.int64)
+    largest_blocked = np.full(node_count, -1, dtype=np.int64)
+    if node_count == 0:
+        return forward_reds, largest_blocked, np.zeros(0, dtype=bool)
+
+    # Index of the first node with coverage after each node.
+    node_idx = np.arange(node_count)
+    hit_idx = np.append(np.flatnonzero(~hit_zero), node_count)
+    next_hit = hit_idx[np.searchsorted(hit_idx, node_idx, side='right')]
+
+    # A node without coverage is within the forward reds of a previous node,
+    # unless it ends its run or is the first node.
+    is_blocker = ~hit_zero
+    is_blocker[0] = True
+    is_blocker[1:] |= (hit_zero[1:] & (next_hit[1:] == node_idx[1:] + 1)
+                       & (depths[:-1] > depths[1:]))
+    forward_reds[is_blocker] = (next_hit - node_idx - 1)[is_blocker]
+
+    # The forward reds of the blockers are disjoint, and only separated by
+    # nodes with coverage, so the largest blocked functions are found with
+    # a segmented reduction.
+    blockers = np.flatnonzero(is_blocker & (forward_reds > 0))
+    if len(blockers) > 0:
+        starts = blockers + 1
+        blocked_complexities = np.where(hit_zero, complexities, 0)
+        largest = np.maximum.reduceat(blocked_complexities, starts)
+        segment_lengths = np.diff(np.append(starts, node_count))
+        tail = blocked_complexities[starts[0]:]
+        is_largest = (tail == np.repeat(largest, segment_lengths)) & (tail > 0)
+        largest_idx = np.flatnonzero(is_largest) + starts[0]
+        has_largest = largest > 0
+        largest_blocked[blockers[has_largest]] = largest_idx[np.searchsorted(
+            largest_idx, starts[has_largest])]
+
+    return forward_reds, largest_blocked, ~is_blocker
+
+
+class BranchComplexityTable:
+    """Complexities of the branch sides of a set of functions.
+
+    The reachable complexities of a side only depend on the functions, so
+    they are computed once. Every function reachable from a side is stored
+    as an entry, repeated functions included, with the side it belongs to,
+    its complexity and whether it is unique to the side. The complexities
+    not covered by a fuzzer are then sums over the entries of functions
+    that are not hit, computed from a mask of the functions hit by the
+    fuzzer.
+    """
+
+    def __init__(self, all_functions: Dict[str,
+                                           function_profile.FunctionProfile]):
+        self.sides: List[branch_profile.BranchSide] = []
+        self.func_names: List[str] = []
+        func_ids: Dict[str, int] = {}
+        entry_sides: List[int] = []
+        entry_funcs: List[int] = []
+        entry_complexities: List[int] = []
+        entry_unique: List[bool] = []
+        for func in all_functions.values():
+            for branch in func.branch_profiles.values():
+                for side_idx, side in enumerate(branch.sides):
+                    side_unique_funcs = branch.get_side_unique_reachable_funcnames(
+                        side_idx)
+                    # Iterate over the list of funcs instead of set, because
+                    # we want to account for the complexity of repeating
+                    # functions.
+                    for fn in side.funcs:
+                        if fn not in all_functions:
+                            continue
+                        func_id = func_ids.get(fn)
+                        if func_id is None:
+                            func_id = len(self.func_names)
+                            func_ids[fn] = func_id
+                            self.func_names.append(fn)
+                        entry_sides.append(len(self.sides))
+                        entry_funcs.append(func_id)
+                        entry_complexities.append(
+                            all_functions[fn].total_cyclomatic_complexity)
+                        entry_unique.append(fn in side_unique_funcs)
+                    self.sides.append(side)
+
+        self.entry_sides = np.array(entry_sides, dtype=np.int64)
+        self.entry_funcs = np.array(entry_funcs, dtype=np.int64)
+        self.entry_complexities = np.array(entry_complexities, dtype=np.int64)
+        self.entry_unique = np.array(entry_unique, dtype=bool)
+        self.reachable_complexities = self._side_sums(self.entry_complexities)
+        self.unique_reachable_complexities = self._side_sums(
+            self.entry_complexities * self.entry_unique)
+
+    def _side_sums(self, entry_values: np.ndarray) -> List[int]:
+        return np.bincount(self.entry_sides,
+                           weights=entry_values,
+                           minlength=len(self.sides)).astype(
+                               np.int64).tolist()
+
+    def update(self, coverage: code_coverage.CoverageProfile) -> None:
+        """Sets the complexities of all sides for the given coverage."""
+        func_hit = np.fromiter(
+            (coverage.is_func_hit(fn) for fn in self.func_names),
+            dtype=bool,
+            count=len(self.func_names))
+        not_covered = self.entry_complexities * ~func_hit[self.entry_funcs]
+        for side, reachable, unique_reachable, not_covered_sum, unique_sum in zip(
+                self.sides, self.reachable_complexities,
+                self.unique_reachable_complexities,
+                self._side_sums(not_covered),
+                self._side_sums(not_covered * self.entry_unique)):
+            side.reachable_complexity = reachable
+            side.unique_reachable_complexity = unique_reachable
+            side.not_covered_complexity = not_covered_sum
+            side.unique_not_covered_complexity = unique_sum
+
+
 def update_branch_complexities(
         all_functions: Dict[str, function_profile.FunctionProfile],
-        coverage: code_coverage.CoverageProfile) -> None:
+        coverage: code_coverage.CoverageProfile,
+        branch_table: Optional[BranchComplexityTable] = None) -> None:
     """
     Traverse every branch profile and update the side complexities based on reached funcs
-    complexity.
+    complexity. A table built for the same functions can be given to reuse
+    the reachable complexities.
     """
-    for func in all_functions.values():
-        for branch in func.branch_profiles.values():
-            sides_number = len(branch.sides)
-            for side_idx in range(sides_number):
-                branch.sides[side_idx].unique_not_covered_complexity = 0
-                branch.sides[side_idx].unique_reachable_complexity = 0
-                branch.sides[side_idx].reachable_complexity = 0
-                branch.sides[side_idx].not_covered_complexity = 0
-                side_unique_funcs = branch.get_side_unique_reachable_funcnames(
-                    side_idx)
-
-                # Iterate over the list of funcs instead of set, because we want to account
-                # for the complexity of repeating functions.
-                for fn in branch.sides[side_idx].funcs:
-                    if fn not in all_functions:
-                        continue
-                    new_comp = all_functions[fn].total_cyclomatic_complexity
-                    branch.sides[side_idx].reachable_complexity += new_comp
-                    if fn in side_unique_funcs:
-                        branch.sides[
-                            side_idx].unique_reachable_complexity += new_comp
-                    if coverage.is_func_hit(fn) is False:
-                        branch.sides[
-                            side_idx].not_covered_complexity += new_comp
-                        if fn in side_unique_funcs:
-                            branch.sides[
-                                side_idx].unique_not_covered_complexity += new_comp
+    if branch_table is None:
+        branch_table = BranchComplexityTable(all_functions)
+    branch_table.update(coverage)
 
 
 def detect_branch_level_blockers(
@@ -986,10 +1161,94 @@ def correlate_introspector_func_to_debug_information(if_func,
     return None, None
 
 
+# Identifiers directly followed by a parenthesis, matched from the start of
+# the identifier only so long identifier runs are scanned once.
+_HEADER_CALL_NAME_RE = re.compile(r'(?<!\w)(\w+)\(')
+_IDENTIFIER_RE = re.compile(r'\w+')
+
+
+def _read_header_file(header_file: str) -> str:
+    try:
+        with open(header_file, 'r') as header_file_fd:
+            return header_file_fd.read()
+    except UnicodeDecodeError:
+        return ""
+
+
+def _extract_header_call_names(header_file: str) -> Set[str]:
+    """Returns the identifiers directly followed by `(` in a header."""
+    return set(_HEADER_CALL_NAME_RE.findall(_read_header_file(header_file)))
+
+
+class HeaderFunctionIndex:
+    """Inverted index of the headers of a project, mapping each identifier
+    directly followed by `(` to the headers it appears in.
+
+    A header matches a function name if it contains `name(`, which includes
+    identifiers ending with the name. These are found with a sorted list of
+    the reversed identifiers. Names that are not plain identifiers are
+    matched against the header content, as the index cannot answer them.
+    """
+
+    def __init__(self,
+                 header_files: List[str],
+                 parallelise: bool = True,
+                 jobs: Optional[int] = None):
+        self.header_files = header_files
+        self.headers_by_name: Dict[str, Set[str]] = {}
+        for header_file, call_names in zip(
+                header_files,
+                self._extract_call_names(header_files, parallelise, jobs)):
+            for call_name in call_names:
+                self.headers_by_name.setdefault(call_name,
+                                                set()).add(header_file)
+        self.reversed_names = sorted(name[::-1]
+                                     for name in self.headers_by_name)
+        self._matches: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _extract_call_names(header_files: List[str], parallelise: bool,
+                            jobs: Optional[int]) -> List[Set[str]]:
+        # Header files only come from C/C++ targets.
+        max_workers = min(len(header_files),
+                          data_loader.get_worker_count('c-cpp', jobs))
+        if (not parallelise or max_workers <= 1
+                or multiprocessing.parent_process() is not None):
+            return [_extract_header_call_names(f) for f in header_files]
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers) as executor:
+            return list(
+                executor.map(_extract_header_call_names,
+                             header_files,
+                             chunksize=64))
+
+    def find(self, name: str) -> Set[str]:
+        """Returns the headers containing `name(`."""
+        matches = self._matches.get(name)
+        if matches is not None:
+            return matches
+
+        matches = set()
+        if _IDENTIFIER_RE.fullmatch(name):
+            reversed_name = name[::-1]
+            idx = bisect.bisect_left(self.reversed_names, reversed_name)
+            while (idx < len(self.reversed_names)
+                   and self.reversed_names[idx].startswith(reversed_name)):
+                matches |= self.headers_by_name[self.reversed_names[idx][::-1]]
+                idx += 1
+        else:
+            for header_file in self.header_files:
+                if f'{name}(' in _read_header_file(header_file):
+                    matches.add(header_file)
+        self._matches[name] = matches
+        return matches
+
+
 def correlate_introspection_functions_to_debug_info(all_functions_json_report,
                                                     debug_all_functions,
                                                     proj_lang,
-                                                    report_dict=None):
+                                                    report_dict=None,
+                                                    jobs=None):
     """Correlates function data collected by debug information to function
     data collected by LLVMs module, and uses the correlated data to generate
     function signatures for each function based on debug information."""
@@ -1003,32 +1262,26 @@ def correlate_introspection_functions_to_debug_info(all_functions_json_report,
 
     # A lot of look-ups are needed when matching LLVM functions to debug
     # functions. Start with creating two indexes to make these look-ups
-    # faster.
+    # faster. Header files are indexed once, when the first debug function
+    # is looked up.
     debug_dict_by_name = {}
     debug_dict_by_filename = {}
+    header_index: Optional[HeaderFunctionIndex] = None
     for df in debug_all_functions:
         # Normalize the source file
         df['source']['source_file'] = os.path.normpath(df['source'].get(
             'source_file', ''))
 
         # Find the header file of this debug function.
-        possible_header_files = set()
-        for header_src_file in normalized_paths:
-            if not (header_src_file.endswith(".h")
-                    or header_src_file.endswith(".hpp")):
-                continue
-            if not os.path.isfile(header_src_file):
-                continue
-            try:
-                with open(header_src_file, 'r') as header_file_fd:
-                    content = header_file_fd.read()
-            except UnicodeDecodeError:
-                content = ""
-
-            name = df.get('name', 'TOTALLYRANDOMNOTFUNCNAME123')
-            for line_idx, line in enumerate(content.split("\n")):
-                if f'{name}(' in line:
-                    possible_header_files.add(header_src_file)
+        if header_index is None:
+            header_files = [
+                header_src_file for header_src_file in normalized_paths
+                if (header_src_file.endswith(".h") or header_src_file.endswith(
+                    ".hpp")) and os.path.isfile(header_src_file)
+            ]
+            header_index = HeaderFunctionIndex(header_files, jobs=jobs)
+        possible_header_files = header_index.find(
+            df.get('name', 'TOTALLYRANDOMNOTFUNCNAME123'))
         df['possible-header-files'] = list(possible_header_files)
 
         # Append debug function to name-index.
@@ -13,9 +13,11 @@
 # limitations under the License.
 """ Module for loading CFG files """
 
+import gc
+import sys
 import logging
 
-from typing import (List, Optional)
+from typing import (Iterator, List, Optional)
 
 from fuzz_introspector.exceptions import CalltreeError
 
@@ -27,6 +29,16 @@ class CalltreeCallsite():
     Represents a single node in the calltree
     """
 
+    # Calltrees can have hundreds of thousands of nodes, so the nodes do not
+    # have a __dict__. Function names and source files are interned as they
+    # repeat heavily across nodes.
+    __slots__ = ('dst_function_name', 'dst_function_source_file',
+                 'src_linenumber', 'parent_calltree_callsite', 'depth',
+                 'src_function_source_file', 'src_function_name', 'children',
+                 'cov_ct_idx', 'cov_parent', 'cov_hitcount', 'cov_color',
+                 'hitcount', 'cov_link', 'cov_callsite_link',
+                 'cov_forward_reds', 'cov_largest_blocked_func', 'preorder')
+
     def __init__(
             self, dst_function_name: str, dst_function_source_file: str,
             depth: int, src_linenumber: int,
@@ -51,35 +63,47 @@ class CalltreeCallsite():
         self.cov_callsite_link: str = ""
         self.cov_forward_reds: int = -1
         self.cov_largest_blocked_func: str = ""
+        # All nodes of the tree in preorder. Only set on the root of a tree
+        # read by `data_file_read_calltree`.
+        self.preorder: Optional[List[CalltreeCallsite]] = None
+
+
+def iter_callsites(calltree: CalltreeCallsite) -> Iterator[CalltreeCallsite]:
+    """Yields a node and all nodes below it in preorder, without recursion."""
+    stack = [calltree]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
 
 
 def extract_all_callsites_recursive(
         calltree: CalltreeCallsite,
         callsite_nodes: List[CalltreeCallsite]) -> None:
-    """Given a node, will assemble all callsites in the children.
-    Recursive function."""
-    callsite_nodes.append(calltree)
-    for c in calltree.children:
-        extract_all_callsites_recursive(c, callsite_nodes)
+    """Given a node, will assemble all callsites in the children in
+    preorder. Despite the name, the tree is walked iteratively so deep
+    calltrees do not hit the recursion limit."""
+    callsite_nodes.extend(iter_callsites(calltree))
 
 
 def extract_all_callsites(
         calltree: Optional[CalltreeCallsite]) -> List[CalltreeCallsite]:
+    """Returns all nodes of a calltree in preorder. The list is a copy of
+    the preorder cached on the root of the tree, if there is one."""
     if calltree is None:
         logger.debug("Trying to extract from a None calltree")
         return []
 
-    cs_list: List[CalltreeCallsite] = []
-    extract_all_callsites_recursive(calltree, cs_list)
-    return cs_list
+    if calltree.preorder is not None:
+        return list(calltree.preorder)
+    return list(iter_callsites(calltree))
 
 
 def print_ctcs_tree(ctcs: CalltreeCallsite) -> None:
-    spacing = " " * int(ctcs.depth)
-    print(f"{spacing}{ctcs.dst_function_name}"
-          f" -- {ctcs.dst_function_source_file} -- {ctcs.src_linenumber}")
-    for c in ctcs.children:
-        print_ctcs_tree(c)
+    for node in iter_callsites(ctcs):
+        spacing = " " * int(node.depth)
+        print(f"{spacing}{node.dst_function_name}"
+              f" -- {node.dst_function_source_file} -- {node.src_linenumber}")
 
 
 def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
@@ -87,24 +111,37 @@ def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
     Extracts the calltree of a fuzzer from a .data file.
     This is for C/C++ files
 
-    Returns a CalltreeCallsite that is the root of the tree read.
+    Returns a CalltreeCallsite that is the root of the tree read. The nodes
+    of the tree in preorder are cached in the `preorder` of the root.
     """
+    # Nodes reference their parent and children, so the garbage collector
+    # would otherwise repeatedly scan the growing tree while it is built.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _read_calltree(cfg_content)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
     read_tree = False
     curr_ctcs_node = None
     curr_depth = -1
+    all_nodes: List[CalltreeCallsite] = []
 
-    all_lines = []
     try:
-        for line in cfg_content.split('\n'):
-            if line.strip():
-                all_lines.append(line)
+        all_lines = cfg_content.split('\n')
     except UnicodeDecodeError:
         raise CalltreeError("Decoding error when reading CFG file")
 
     for line in all_lines:
-        line = line.replace("\n", "")
+        stripped = line.strip()
+        if not stripped:
+            continue
         if read_tree and "======" not in line:
-            stripped_line = line.strip().split(" ")
+            stripped_line = stripped.split(" ")
             # Parse the line
             # Type: {spacing depth} {target filename} {line count}
             if len(stripped_line) == 3:
@@ -121,11 +158,13 @@ def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
                 target_func = target_func.replace("......", "")
 
             space_count = len(line) - len(line.lstrip(' '))
-            depth = int(space_count / 2)
+            depth = space_count // 2
 
             # Create a callsite nide
-            ctcs = CalltreeCallsite(target_func, filename, depth, linenumber,
+            ctcs = CalltreeCallsite(sys.intern(target_func),
+                                    sys.intern(filename), depth, linenumber,
                                     curr_ctcs_node)
+            all_nodes.append(ctcs)
 
             # Check if this node is still a child of the current parent node
             # and handle if not.
@@ -142,7 +181,7 @@ def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
 
             elif depth < curr_depth and curr_ctcs_node is not None:
                 # We are going up, find out how much
-                depth_diff = int(curr_depth - depth)
+                depth_diff = curr_depth - depth
                 tmp_node = curr_ctcs_node
                 idx = 0
                 while (idx < depth_diff
@@ -153,8 +192,7 @@ def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
             # Add the node to the current parent
             if curr_depth != -1 and curr_ctcs_node is not None:
                 ctcs.parent_calltree_callsite = curr_ctcs_node
-                ctcs.src_function_name = (
-                    ctcs.parent_calltree_callsite.dst_function_name)
+                ctcs.src_function_name = curr_ctcs_node.dst_function_name
                 curr_ctcs_node.children.append(ctcs)
             curr_depth = depth
 
@@ -171,5 +209,14 @@ def data_file_read_calltree(cfg_content: str) -> Optional[CalltreeCallsite]:
         ctcs_root = ctcs_root.parent_calltree_callsite
         if ctcs_root is None:
             return None
+
+    # Nodes are created in preorder, so this is the preorder of the tree
+    # unless some lines were not attached below the root.
+    if all_nodes and all_nodes[0] is ctcs_root and all(
+            node.parent_calltree_callsite is not None
+            for node in all_nodes[1:]):
+        ctcs_root.preorder = all_nodes
+    else:
+        ctcs_root.preorder = list(iter_callsites(ctcs_root))
     # print_ctcs_tree(ctcs_root)
     return ctcs_root
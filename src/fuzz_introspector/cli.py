@@ -68,6 +68,11 @@ def get_cmdline_parser() -> argparse.ArgumentParser:
         '--module-only',
         action='store_true',
         help='Will dump program analysis data even if not harness exists.')
+    full_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help='Number of worker processes to use. Defaults to all cores.')
 
     # Report generation command
     report_parser = subparsers.add_parser(
@@ -119,6 +124,11 @@ def get_cmdline_parser() -> argparse.ArgumentParser:
         nargs="+",
         default=["FuzzEngineInputAnalysis"],
         help="State which analysis requires separate json report output")
+    report_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes to use. Defaults to all cores.")
 
     # Command for correlating binary files to fuzzerLog files
     correlate_parser = subparsers.add_parser(
@@ -309,10 +319,15 @@ def main() -> int:
 
     logger.info("Running fuzz introspector post-processing")
     if args.command == 'report':
-        return_code, _ = commands.run_analysis_on_dir(
-            args.target_dir, args.coverage_url, args.analyses,
-            args.correlation_file, args.enable_all_analyses, args.name,
-            args.language, args.output_json)
+        return_code, _ = commands.run_analysis_on_dir(args.target_dir,
+                                                      args.coverage_url,
+                                                      args.analyses,
+                                                      args.correlation_file,
+                                                      args.enable_all_analyses,
+                                                      args.name,
+                                                      args.language,
+                                                      args.output_json,
+                                                      jobs=args.jobs)
         logger.info("Ending fuzz introspector report generation")
     elif args.command == 'correlate':
         return_code = commands.correlate_binaries_to_logs(args.binaries_dir)
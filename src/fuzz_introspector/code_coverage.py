@@ -16,12 +16,20 @@
 import os
 import sys
 import json
+import mmap
+import pickle
 import logging
 import re
+import bisect
+import functools
+import itertools
+import multiprocessing
+import concurrent.futures
 
 from typing import (
     Any,
     Dict,
+    Iterator,
     List,
     Set,
     Optional,
@@ -36,9 +44,34 @@ COVERAGE_SWITCH_REGEX = re.compile(r'.*\|.*\sswitch.*\(.*\)')
 COVERAGE_CASE_REGEX = re.compile(r'.*\|.*\scase.*:')
 COVERAGE_BRANCH_REGEX = re.compile(r'.*\|.*\sBranch.*\(.*:.*\):')
 
+# Version of the parsed covreport cache files. Must be bumped whenever the
+# parsed format changes.
+COVERAGE_CACHE_VERSION = 1
+COVERAGE_CACHE_SUFFIX = '.covcache'
+
 logger = logging.getLogger(name=__name__)
 
 
+class _FunctionLineHits:
+    """Line number lookups into the coverage of a single function."""
+
+    __slots__ = ('lines', 'hitcounts', 'first_hitcounts', 'hit_lines')
+
+    def __init__(self, lines: List[Tuple[int, int]]) -> None:
+        # The covmap entry this was built from.
+        self.lines = lines
+        # Last positive hitcount of each line.
+        self.hitcounts: Dict[int, int] = dict()
+        # Hitcount of the first entry of each line.
+        self.first_hitcounts: Dict[int, int] = dict()
+        self.hit_lines = 0
+        for line_number, hitcount in lines:
+            if hitcount > 0:
+                self.hit_lines += 1
+                self.hitcounts[line_number] = hitcount
+            self.first_hitcounts.setdefault(line_number, hitcount)
+
+
 class CoverageProfile:
     """Stores and handles a runtime coverage data.
 
@@ -66,6 +99,31 @@ class CoverageProfile:
         self.coverage_files: List[str] = []
         self.dual_file_map: Dict[str, Dict[str, List[int]]] = dict()
         self.kernel_coverage: List[Dict[Any, Any]] = []
+        self._reset_func_index()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The lookup indices are rebuilt on demand, there is no need to
+        # transfer them between processes.
+        state = self.__dict__.copy()
+        for attr in ('_func_keys', '_line_hits', '_rust_key_suffixes',
+                     '_indexed_covmap', '_indexed_covmap_len'):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset_func_index()
+
+    def _reset_func_index(self) -> None:
+        # Resolved covmap key of each function name that has been looked up.
+        self._func_keys: Dict[str, Optional[str]] = dict()
+        self._line_hits: Dict[str, _FunctionLineHits] = dict()
+        # Sorted reversed covmap keys, and the keys with their position in the
+        # covmap, to find the first key ending with a given suffix.
+        self._rust_key_suffixes: Optional[Tuple[List[str],
+                                                List[Tuple[int, str]]]] = None
+        self._indexed_covmap = self.covmap
+        self._indexed_covmap_len = len(self.covmap)
 
     def set_type(self, cov_type: str) -> None:
         self._cov_type = cov_type
@@ -171,7 +229,32 @@ class CoverageProfile:
             was covered.
         """
         logger.debug(f"Getting coverage of {funcname}")
-        fuzz_key = None
+        fuzz_key = self.get_func_key(funcname)
+        if fuzz_key is None:
+            return []
+
+        return self.covmap[fuzz_key]
+
+    def get_func_key(self, funcname: str) -> Optional[str]:
+        """Returns the covmap key of a function. The function name may be
+        mangled, not normalised, hold JVM generics or miss the Rust crate.
+        Lookups are cached until covmap keys are added or removed.
+
+        :param funcname: Function name to lookup.
+        :type funcname: str
+
+        :rtype: Optional[str]
+        :returns: The key in covmap or `None` if the function has no coverage.
+        """
+        if (self._indexed_covmap is not self.covmap
+                or self._indexed_covmap_len != len(self.covmap)):
+            self._reset_func_index()
+        try:
+            return self._func_keys[funcname]
+        except KeyError:
+            pass
+
+        fuzz_key: Optional[str] = None
         if funcname in self.covmap:
             fuzz_key = funcname
         elif utils.demangle_cpp_func(funcname) in self.covmap:
@@ -182,13 +265,65 @@ class CoverageProfile:
             fuzz_key = utils.remove_jvm_generics(funcname)
         else:
             # Handle special case for rust where crate is missing from function name
-            fuzz_key = utils.locate_rust_fuzz_key(
-                utils.demangle_rust_func(funcname), self.covmap)
+            fuzz_key = self._locate_rust_fuzz_key(
+                utils.demangle_rust_func(funcname))
+        self._func_keys[funcname] = fuzz_key
+        return fuzz_key
+
+    def _locate_rust_fuzz_key(self, funcname: str) -> Optional[str]:
+        """Same as `utils.locate_rust_fuzz_key` on covmap, using a sorted
+        index of the reversed keys instead of scanning covmap."""
+        if self._rust_key_suffixes is None:
+            reversed_keys = sorted(
+                (key[::-1], idx, key) for idx, key in enumerate(self.covmap))
+            self._rust_key_suffixes = ([
+                reversed_key for reversed_key, _, _ in reversed_keys
+            ], [(idx, key) for _, idx, key in reversed_keys])
+        sorted_keys, key_entries = self._rust_key_suffixes
+
+        while funcname:
+            # Keys ending with funcname are the consecutive reversed keys
+            # starting with the reversed funcname. Take the first of them in
+            # covmap order.
+            prefix = funcname[::-1]
+            start = bisect.bisect_left(sorted_keys, prefix)
+            end = start
+            while end < len(sorted_keys) and sorted_keys[end].startswith(
+                    prefix):
+                end += 1
+            if start < end:
+                _, match = min(key_entries[start:end])
+                if '::' in match:
+                    return match
+
+            if '::' in funcname:
+                funcname = funcname.split('::', 1)[1]
+            else:
+                break
 
-        if fuzz_key is None or fuzz_key not in self.covmap:
-            return []
+        return None
 
-        return self.covmap[fuzz_key]
+    def _get_line_hits(self, funcname: str) -> Optional[_FunctionLineHits]:
+        fuzz_key = self.get_func_key(funcname)
+        if fuzz_key is None:
+            return None
+        lines = self.covmap[fuzz_key]
+        line_hits = self._line_hits.get(fuzz_key)
+        if line_hits is None or line_hits.lines is not lines:
+            line_hits = _FunctionLineHits(lines)
+            self._line_hits[fuzz_key] = line_hits
+        return line_hits
+
+    def get_line_hitcount(self, funcname: str, lineno: int) -> int:
+        """Returns the hitcount of a line in a function, or 0 if the line is
+        not hit. If the line has multiple entries the last hit one is used.
+
+        This should only be used for coverage profiles that are non-file type.
+        """
+        line_hits = self._get_line_hits(funcname)
+        if line_hits is None:
+            return 0
+        return line_hits.hitcounts.get(lineno, 0)
 
     def _python_ast_funcname_to_cov_file(self, function_name) -> Optional[str]:
         """Convert a Python module path to a given file, and searches the
@@ -365,39 +500,20 @@ class CoverageProfile:
             the total amount of lines in a function and second element is the
             amount of lines in the function that are hit.
         """
-        fuzz_key = None
-        if funcname in self.covmap:
-            fuzz_key = funcname
-        elif utils.demangle_cpp_func(funcname) in self.covmap:
-            fuzz_key = utils.demangle_cpp_func(funcname)
-        elif utils.normalise_str(funcname) in self.covmap:
-            fuzz_key = utils.normalise_str(funcname)
-        elif utils.remove_jvm_generics(funcname) in self.covmap:
-            fuzz_key = utils.remove_jvm_generics(funcname)
-        else:
-            # Handle special case for rust where crate is missing from function name
-            fuzz_key = utils.locate_rust_fuzz_key(
-                utils.demangle_rust_func(funcname), self.covmap)
-
-        if fuzz_key is None:
+        line_hits = self._get_line_hits(funcname)
+        if line_hits is None:
             return None, None
 
-        lines_hit = [ht for ln, ht in self.covmap[fuzz_key] if ht > 0]
-        return len(self.covmap[fuzz_key]), len(lines_hit)
+        return len(line_hits.lines), line_hits.hit_lines
 
     def is_func_lineno_hit(self, func_name: str, lineno: int) -> bool:
         """
         Checks if a given line number in a function is hit.
         """
-        func_hit_details = self.get_hit_details(func_name)
-
-        for line_info in func_hit_details:
-            if lineno == line_info[0]:
-                if line_info[1] != 0:
-                    return True
-                else:
-                    return False
-        return False
+        line_hits = self._get_line_hits(func_name)
+        if line_hits is None:
+            return False
+        return line_hits.first_hitcounts.get(lineno, 0) != 0
 
 
 def extract_hitcount(coverage_line: str) -> int:
@@ -431,7 +547,8 @@ def extract_hitcount(coverage_line: str) -> int:
 
 def load_llvm_coverage(target_dir: str,
                        target_name: Optional[str] = None,
-                       is_rust: bool = False) -> CoverageProfile:
+                       is_rust: bool = False,
+                       parallelise: bool = True) -> CoverageProfile:
     """
     Scans a directory to read one or more coverage reports, and returns a CoverageProfile
 
@@ -452,7 +569,9 @@ def load_llvm_coverage(target_dir: str,
     As such, this function accepts an arugment "target_name" which is used to
     target specific coverage profiles. However, if no coverage profile matches
     that given name then the function will find *all* coverage reports it can and
-    use all of them.
+    use all of them. Multiple reports are parsed in parallel if parallelise
+    is set. Parsed reports are kept for the rest of the run, and on disk if
+    FI_COVERAGE_CACHE_DIR is set, so each report is only parsed once.
     """
 
     if target_name is not None:
@@ -480,22 +599,266 @@ def load_llvm_coverage(target_dir: str,
     cp = CoverageProfile()
     logger.info(f"Using the following coverages {coverage_reports}")
     cp.set_type("function")
-    for profile_file in coverage_reports:
+    for profile_file, (covmap, branch_cov_map) in zip(
+            coverage_reports,
+            _parse_llvm_coverage_reports(coverage_reports, is_rust,
+                                         parallelise)):
         cp.coverage_files.append(profile_file)
-        logger.info(f"Reading coverage report: {profile_file}")
-        with open(profile_file, 'rb') as pf:
-            curr_func = None
+        cp.covmap.update(covmap)
+        cp.branch_cov_map.update(branch_cov_map)
+    return cp
+
+
+LlvmCoverageMaps = Tuple[Dict[str, List[Tuple[int, int]]], Dict[str,
+                                                                List[int]]]
+
+LlvmCoverageCacheKey = Tuple[str, int, int, bool]
+
+# Covreports parsed during this run, keyed by path, size, modification time
+# and language. Profiles that fall back to using all reports of a directory
+# share the parsed reports instead of parsing them again. Worker processes
+# forked after `preload_llvm_coverage` inherit the parsed reports, others are
+# given them with `update_llvm_coverage_cache` when they start.
+_llvm_coverage_cache: Dict[LlvmCoverageCacheKey, LlvmCoverageMaps] = dict()
+
+
+def clear_llvm_coverage_cache() -> None:
+    """Drops all covreports parsed during this run."""
+    _llvm_coverage_cache.clear()
+
+
+def get_llvm_coverage_cache() -> Dict[LlvmCoverageCacheKey, LlvmCoverageMaps]:
+    """Returns the covreports parsed during this run."""
+    return dict(_llvm_coverage_cache)
+
+
+def update_llvm_coverage_cache(
+        coverage_cache: Dict[LlvmCoverageCacheKey, LlvmCoverageMaps]) -> None:
+    """Adds covreports parsed by another process of this run."""
+    _llvm_coverage_cache.update(coverage_cache)
+
+
+def preload_llvm_coverage(target_dir: str,
+                          is_rust: bool = False,
+                          parallelise: bool = True) -> None:
+    """Parses all coverage reports in a directory into the cache of this
+    run, so fuzzer profiles loaded afterwards do not parse them again."""
+    coverage_reports = utils.get_all_files_in_tree_with_regex(
+        target_dir, ".*\.covreport$")
+    if coverage_reports:
+        logger.info(f"Preloading {len(coverage_reports)} coverage reports")
+        _parse_llvm_coverage_reports(coverage_reports, is_rust, parallelise)
+
+
+def _llvm_coverage_cache_key(profile_file: str,
+                             is_rust: bool) -> LlvmCoverageCacheKey:
+    stat = os.stat(profile_file)
+    return (os.path.realpath(profile_file), stat.st_size, stat.st_mtime_ns,
+            is_rust)
+
+
+def _coverage_cache_dir() -> str:
+    """Directory holding parsed covreports across runs, keyed by content
+    hash. The on-disk cache is only used if FI_COVERAGE_CACHE_DIR is set."""
+    return os.environ.get('FI_COVERAGE_CACHE_DIR', '')
+
+
+def _coverage_cache_path(cache_dir: str, digest: str, is_rust: bool) -> str:
+    lang = 'rust' if is_rust else 'llvm'
+    return os.path.join(cache_dir, f'{digest}-{lang}{COVERAGE_CACHE_SUFFIX}')
+
+
+def _read_coverage_cache(cache_file: str) -> Optional[LlvmCoverageMaps]:
+    """Reads a parsed covreport, returns None if the cache file is missing,
+    stale or corrupt."""
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        logger.info('Ignoring corrupt coverage cache %s: %s', cache_file,
+                    str(e))
+        return None
+    if (not isinstance(cached, dict)
+            or cached.get('version') != COVERAGE_CACHE_VERSION):
+        logger.info('Ignoring stale coverage cache %s', cache_file)
+        return None
+    return cached['covmap'], cached['branch_cov_map']
+
+
+def _write_coverage_cache(cache_file: str,
+                          coverage_maps: LlvmCoverageMaps) -> None:
+    """Writes a parsed covreport. Failures are not fatal."""
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                {
+                    'version': COVERAGE_CACHE_VERSION,
+                    'covmap': coverage_maps[0],
+                    'branch_cov_map': coverage_maps[1],
+                },
+                f,
+                protocol=5)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.info('Could not write coverage cache %s: %s', cache_file,
+                    str(e))
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _load_llvm_coverage_report(profile_file: str,
+                               is_rust: bool) -> LlvmCoverageMaps:
+    """Parses a single report, going through the on-disk cache if one is
+    configured."""
+    cache_dir = _coverage_cache_dir()
+    if not cache_dir:
+        return parse_llvm_coverage_report(profile_file, is_rust)
+
+    try:
+        digest = utils.file_sha256(profile_file)
+    except OSError:
+        return parse_llvm_coverage_report(profile_file, is_rust)
+    cache_file = _coverage_cache_path(cache_dir, digest, is_rust)
+    coverage_maps = _read_coverage_cache(cache_file)
+    if coverage_maps is not None:
+        logger.info('Loaded %s from coverage cache', profile_file)
+        return coverage_maps
+
+    coverage_maps = parse_llvm_coverage_report(profile_file, is_rust)
+    _write_coverage_cache(cache_file, coverage_maps)
+    return coverage_maps
+
+
+def _parse_llvm_coverage_reports(coverage_reports: List[str], is_rust: bool,
+                                 parallelise: bool) -> List[LlvmCoverageMaps]:
+    """Parses a list of coverage reports, reusing the reports already parsed
+    in this run. Multiple reports are parsed in a process pool, unless we
+    already are in a worker process, e.g. when profiles are loaded in
+    parallel."""
+    cache_keys = [
+        _llvm_coverage_cache_key(profile_file, is_rust)
+        for profile_file in coverage_reports
+    ]
+    to_parse: Dict[LlvmCoverageCacheKey, str] = dict()
+    for profile_file, cache_key in zip(coverage_reports, cache_keys):
+        if cache_key not in _llvm_coverage_cache:
+            to_parse.setdefault(cache_key, profile_file)
+
+    max_workers = min(len(to_parse), os.cpu_count() or 1)
+    if (not parallelise or max_workers <= 1
+            or multiprocessing.parent_process() is not None):
+        for cache_key, profile_file in to_parse.items():
+            _llvm_coverage_cache[cache_key] = _load_llvm_coverage_report(
+                profile_file, is_rust)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers) as executor:
+            _llvm_coverage_cache.update(
+                zip(
+                    to_parse,
+                    executor.map(_load_llvm_coverage_report, to_parse.values(),
+                                 itertools.repeat(is_rust))))
+
+    return [_llvm_coverage_cache[cache_key] for cache_key in cache_keys]
+
+
+@functools.lru_cache(maxsize=65536)
+def _demangle_llvm_cov_func(func_name: str, is_rust: bool) -> str:
+    if is_rust:
+        return utils.demangle_rust_func(func_name)
+    return utils.demangle_cpp_func(func_name)
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_hitcount_bytes(coverage_count: bytes) -> int:
+    return extract_hitcount(coverage_count.decode())
+
+
+def _iter_buffer_lines(buf: mmap.mmap,
+                       chunk_size: int = 1 << 24) -> Iterator[bytes]:
+    """Iterates the lines of a buffer, without line endings. The buffer is
+    split in chunks at line boundaries to keep the memory use bounded."""
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = min(pos + chunk_size, size)
+        if end < size:
+            newline = buf.rfind(b'\n', pos, end)
+            if newline == -1:
+                newline = buf.find(b'\n', end)
+            if newline != -1:
+                yield from buf[pos:newline].split(b'\n')
+                pos = newline + 1
+                continue
+            end = size
+        yield from buf[pos:end].split(b'\n')
+        pos = end
+
+
+def parse_llvm_coverage_report(profile_file: str,
+                               is_rust: bool = False) -> LlvmCoverageMaps:
+    """Parses a single report from "llvm-cov show", see load_llvm_coverage.
+
+    The file is mapped into memory and read line by line as bytes. Plain
+    source code lines, which is the vast majority, are parsed without
+    decoding. Only function names and lines that may hold switch, case or
+    Branch information are decoded and matched against the regexes.
+
+    Returns the function coverage map and the branch coverage map.
+    """
+    covmap: Dict[str, List[Tuple[int, int]]] = dict()
+    branch_cov_map: Dict[str, List[int]] = dict()
+    logger.info(f"Reading coverage report: {profile_file}")
+    with open(profile_file, 'rb') as pf:
+        if os.fstat(pf.fileno()).st_size == 0:
+            return covmap, branch_cov_map
+        with mmap.mmap(pf.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            curr_func: Optional[str] = None
+            curr_lines: List[Tuple[int, int]] = []
             switch_string = str()
             switch_line_number = None
             case_line_numbers: Set[int] = set()
-            for raw_line in pf:
+            for raw_line in _iter_buffer_lines(buf):
+                has_separator = b'|' in raw_line
+                if not has_separator:
+                    # Only function names are of interest here.
+                    if raw_line[-1:] != b':':
+                        continue
+                elif (b'switch' not in raw_line and b'case' not in raw_line
+                      and b'Branch' not in raw_line):
+                    # Parse lines that signal specific line of code, e.g.
+                    #  "   83|  5.99M|    char *kldfj = (char*)malloc(123);"
+                    if curr_func is None:
+                        continue
+                    line_segs = raw_line.split(b'|', 2)
+                    try:
+                        line_number = int(line_segs[0])
+                    except Exception:
+                        continue
+                    try:
+                        hit_times = _extract_hitcount_bytes(line_segs[1])
+                        if hit_times == -1:
+                            continue
+                    except Exception:
+                        # Avoid overcounting the code lines by skipping
+                        # comments and empty lines.
+                        if b' 0| ' in raw_line:
+                            hit_times = 0
+                        else:
+                            continue
+                    curr_lines.append((line_number, hit_times))
+                    continue
+
                 line = utils.safe_decode(raw_line)
                 if line is None:
                     continue
 
-                line = line.replace("\n", "")
-                logger.debug(f"cov-readline: { line }")
-
                 # Parse lines that signal function names. These linse indicate that the
                 # lines following this line will be the specific source code lines of
                 # the given function.
@@ -508,11 +871,9 @@ def load_llvm_coverage(target_dir: str,
                                                                    ":", "")
                     else:
                         curr_func = line.replace(" ", "").replace(":", "")
-                    if is_rust:
-                        curr_func = utils.demangle_rust_func(curr_func)
-                    else:
-                        curr_func = utils.demangle_cpp_func(curr_func)
-                    cp.covmap[curr_func] = list()
+                    curr_func = _demangle_llvm_cov_func(curr_func, is_rust)
+                    curr_lines = list()
+                    covmap[curr_func] = curr_lines
                     switch_string = ''
                     switch_line_number = None
                 # Special treatment for switch statement coverage:
@@ -520,26 +881,28 @@ def load_llvm_coverage(target_dir: str,
                 # overall hitcout of statement.
                 # Each `case` gets its own Branch entry for coverage. The important part
                 # is true_hit because that means if a `case` is taken or not.
-                if curr_func and COVERAGE_SWITCH_REGEX.match(line):
-                    line_segs = line.split("|")
+                if (curr_func and 'switch' in line
+                        and COVERAGE_SWITCH_REGEX.match(line)):
+                    line_segs_str = line.split("|")
                     try:
-                        switch_line_number = int(line_segs[0])
+                        switch_line_number = int(line_segs_str[0])
                     except Exception:
                         continue
 
                     try:
                         # Calculate the column of the switch keyword.
-                        column_number = line_segs[2].find('switch') + 1
+                        column_number = line_segs_str[2].find('switch') + 1
                     except Exception:
                         continue
                     case_line_numbers = set()  # To keep track of switch cases.
                     # This string may be updated if there is Branch pattern for this line.
                     switch_string = f'{curr_func}:{switch_line_number},{column_number}'
-                    logger.debug(f'Seen switch in coverage: {switch_string}')
+                    logger.debug('Seen switch in coverage: %s', switch_string)
 
                 # This parses Branch cov info in the form of:
                 #  |  Branch (81:7): [True: 1.2k, False: 0]
-                if curr_func and COVERAGE_BRANCH_REGEX.match(line):
+                if (curr_func and 'Branch' in line
+                        and COVERAGE_BRANCH_REGEX.match(line)):
                     try:
                         line_number = int(line.split('(')[1].split(':')[0])
                     except Exception:
@@ -568,33 +931,26 @@ def load_llvm_coverage(target_dir: str,
                         # This Branch pattern belongs to switch line.
                         # Note that the column number is inacurrate as it belongs to
                         # the variable inside pranthesis. Should not use it for switch_string.
-                        cp.branch_cov_map[switch_string] = [
-                            true_hit, false_hit
-                        ]
+                        branch_cov_map[switch_string] = [true_hit, false_hit]
                     elif line_number in case_line_numbers:
                         # This Branch pattern belongs to a `case`.
                         try:
                             # This collects for `case` taken side.
-                            cp.branch_cov_map[switch_string].append(true_hit)
+                            branch_cov_map[switch_string].append(true_hit)
                         except Exception:
                             # Taking care of anomalies where the coverage report has no
                             # Branch pattern for switch line.
-                            logger.debug(
-                                f'The switch had no Branch pattern {switch_string}'
-                            )
-                            cp.branch_cov_map[switch_string] = [
+                            logger.debug('The switch had no Branch pattern %s',
+                                         switch_string)
+                            branch_cov_map[switch_string] = [
                                 true_hit, false_hit, true_hit
                             ]
                     else:
                         # This Branch pattern belongs to a conditional branch.
                         branch_string = f'{curr_func}:{line_number},{column_number}'
-                        cp.branch_cov_map[branch_string] = [
-                            true_hit, false_hit
-                        ]
+                        branch_cov_map[branch_string] = [true_hit, false_hit]
                 # Parse lines that signal specific line of code. These lines only
                 # offer after the function names parsed above.
-                # Example line:
-                #  "   83|  5.99M|    char *kldfj = (char*)malloc(123);\n"
                 elif curr_func is not None and "|" in line:
                     # Extract source code line number
                     try:
@@ -602,7 +958,7 @@ def load_llvm_coverage(target_dir: str,
                     except Exception:
                         continue
 
-                    if COVERAGE_CASE_REGEX.match(line):
+                    if 'case' in line and COVERAGE_CASE_REGEX.match(line):
                         if switch_string:
                             case_line_numbers.add(line_number)
                         else:
@@ -621,11 +977,8 @@ def load_llvm_coverage(target_dir: str,
                             hit_times = 0
                         else:
                             continue
-                    # Add source code line and hitcount to coverage map of current function
-                    logger.debug(f"reading coverage: {curr_func} "
-                                 f"-- {line_number} -- {hit_times}")
-                    cp.covmap[curr_func].append((line_number, hit_times))
-    return cp
+                    curr_lines.append((line_number, hit_times))
+    return covmap, branch_cov_map
 
 
 def load_python_json_coverage(json_file: str,
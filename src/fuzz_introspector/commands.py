@@ -24,6 +24,7 @@ from fuzz_introspector import analysis
 from fuzz_introspector import constants
 from fuzz_introspector import diff_report
 from fuzz_introspector import html_report
+from fuzz_introspector import json_report
 from fuzz_introspector import utils
 
 from fuzz_introspector.exceptions import DataLoaderError
@@ -76,7 +77,8 @@ def end_to_end(args) -> int:
                                       out_dir=out_dir,
                                       coverage_url=args.coverage_url,
                                       report_name=args.name,
-                                      module_only=args.module_only)
+                                      module_only=args.module_only,
+                                      jobs=args.jobs)
     return exit_code
 
 
@@ -87,7 +89,8 @@ def analyse_end_to_end(arg_language,
                        coverage_url='',
                        report_name='default-report',
                        module_only=False,
-                       dump_files=True):
+                       dump_files=True,
+                       jobs: Optional[int] = None):
     """End to end analysis helper function."""
     return_values = {}
     project, harness_lists = oss_fuzz.analyse_folder(language=arg_language,
@@ -95,7 +98,8 @@ def analyse_end_to_end(arg_language,
                                                      entrypoint=entrypoint,
                                                      out=out_dir,
                                                      module_only=module_only,
-                                                     dump_output=dump_files)
+                                                     dump_output=dump_files,
+                                                     jobs=jobs)
     if harness_lists:
         logger.info('We have a harness list')
     else:
@@ -123,7 +127,8 @@ def analyse_end_to_end(arg_language,
             language=language,
             out_dir=out_dir,
             dump_files=dump_files,
-            harness_lists=harness_lists)
+            harness_lists=harness_lists,
+            jobs=jobs)
         for k, v in return_values2.items():
             return_values[k] = v
     except DataLoaderError:
@@ -132,18 +137,20 @@ def analyse_end_to_end(arg_language,
     return exit_code, return_values
 
 
-def run_analysis_on_dir(target_folder: str,
-                        coverage_url: str,
-                        analyses_to_run: list[str],
-                        correlation_file: str,
-                        enable_all_analyses: bool,
-                        report_name: str,
-                        language: str,
-                        output_json: Optional[list[str]] = None,
-                        parallelise: bool = True,
-                        dump_files: bool = True,
-                        out_dir: str = '',
-                        harness_lists=None) -> Tuple[int, Dict[str, Any]]:
+def run_analysis_on_dir(
+        target_folder: str,
+        coverage_url: str,
+        analyses_to_run: list[str],
+        correlation_file: str,
+        enable_all_analyses: bool,
+        report_name: str,
+        language: str,
+        output_json: Optional[list[str]] = None,
+        parallelise: bool = True,
+        dump_files: bool = True,
+        out_dir: str = '',
+        harness_lists=None,
+        jobs: Optional[int] = None) -> Tuple[int, Dict[str, Any]]:
     """Runs Fuzz Introspector analysis from based on the results
     from a frontend run. The primary task is to aggregate the data
     and generate a HTML report."""
@@ -157,19 +164,22 @@ def run_analysis_on_dir(target_folder: str,
 
     introspection_proj = analysis.IntrospectionProject(language, target_folder,
                                                        coverage_url)
-    introspection_proj.load_data_files(parallelise, correlation_file, out_dir,
-                                       harness_lists)
-
-    logger.info("Analyses to run: %s", str(analyses_to_run))
-    logger.info("[+] Creating HTML report")
-    if output_json is None:
-        output_json = []
-    html_report.create_html_report(introspection_proj,
-                                   analyses_to_run,
-                                   output_json,
-                                   report_name,
-                                   dump_files,
-                                   out_dir=out_dir)
+    # The json reports are collected in memory and written once the report
+    # is complete.
+    with json_report.batched_reports(out_dir):
+        introspection_proj.load_data_files(parallelise, correlation_file,
+                                           out_dir, harness_lists, jobs)
+
+        logger.info("Analyses to run: %s", str(analyses_to_run))
+        logger.info("[+] Creating HTML report")
+        if output_json is None:
+            output_json = []
+        html_report.create_html_report(introspection_proj,
+                                       analyses_to_run,
+                                       output_json,
+                                       report_name,
+                                       dump_files,
+                                       out_dir=out_dir)
 
     return_values = {'introspector-project': introspection_proj}
 
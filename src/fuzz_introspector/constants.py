@@ -31,6 +31,10 @@ DEBUG_INFO_DUMP = "all_debug_info.json"
 
 SAVED_SOURCE_FOLDER = 'source-code'
 
+# Key of the frontend yaml header holding the sha256 of the 'All functions'
+# table, which is written last so harnesses of the same project can share it.
+FUNCTION_TABLE_DIGEST_KEY = 'All functions digest'
+
 
 class LANGUAGES:
     C = 'c'
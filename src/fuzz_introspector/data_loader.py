@@ -15,22 +15,460 @@
 
 import os
 import json
+import mmap
+import yaml
+import pickle
+import hashlib
 import logging
+import tempfile
+import contextlib
 import multiprocessing
+import concurrent.futures
 
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     Optional,
+    Tuple,
 )
 
+from fuzz_introspector import code_coverage
 from fuzz_introspector import constants
 from fuzz_introspector import utils
-from fuzz_introspector.datatypes import (fuzzer_profile, bug)
+from fuzz_introspector.datatypes import (fuzzer_profile, function_profile, bug)
 
 logger = logging.getLogger(name=__name__)
 
+# Bump whenever the layout of FunctionProfile changes, so that sidecar
+# caches written by older versions are ignored.
+PROFILE_CACHE_VERSION = 1
+PROFILE_CACHE_SUFFIX = '.ficache'
+
+FrontendYamlData = Tuple[Optional[Dict[Any, Any]],
+                         Optional[List[function_profile.FunctionProfile]]]
+ProfileWorker = Callable[..., Optional[fuzzer_profile.FuzzerProfile]]
+
+# Function tables shared by the harnesses of a project, pickled and keyed by
+# the digest of their yaml. Each profile unpickles its own copy, as profiles
+# update their function profiles during analysis. The tables shared by
+# several harnesses are loaded by `preload_function_tables` and handed to the
+# profile workers.
+_function_tables: Dict[str, bytes] = {}
+
+
+def _construct_yaml_scalar(loader: Any, event: Any) -> Any:
+    """Converts a yaml scalar event into its python value, following the
+    same tag resolution as the safe loader."""
+    tag = event.tag
+    if tag is None or tag == '!':
+        tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+    if tag == 'tag:yaml.org,2002:str':
+        return event.value
+    constructor = loader.yaml_constructors.get(tag)
+    if constructor is None:
+        raise yaml.constructor.ConstructorError(
+            None, None, f'could not determine a constructor for {tag}',
+            event.start_mark)
+    return constructor(
+        loader,
+        yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark,
+                        event.style))
+
+
+def _construct_yaml_value(loader: Any, anchors: Dict[str, Any]) -> Any:
+    """Builds the python object for the next node in the event stream."""
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent) and event.anchor is not None:
+        return anchors[event.anchor]
+
+    value: Any
+    if isinstance(event, yaml.ScalarEvent):
+        value = _construct_yaml_scalar(loader, event)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        value = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            value.append(_construct_yaml_value(loader, anchors))
+        loader.get_event()
+    elif isinstance(event, yaml.MappingStartEvent):
+        value = {}
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _construct_yaml_value(loader, anchors)
+            value[key] = _construct_yaml_value(loader, anchors)
+        loader.get_event()
+    else:
+        raise yaml.YAMLError(f'Unexpected yaml event {event}')
+
+    if event.anchor is not None:
+        anchors[event.anchor] = value
+    return value
+
+
+def _construct_all_functions(
+        loader: Any, anchors: Dict[str, Any],
+        functions: List[function_profile.FunctionProfile]) -> Dict[Any, Any]:
+    """Reads the 'All functions' mapping, converting each of the elements
+    into a FunctionProfile as soon as it has been parsed. The elements
+    themselves are not kept in the returned dictionary."""
+    loader.get_event()
+    all_functions: Dict[Any, Any] = {}
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = _construct_yaml_value(loader, anchors)
+        if key == 'Elements' and loader.check_event(yaml.SequenceStartEvent):
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                elem = _construct_yaml_value(loader, anchors)
+                functions.append(function_profile.FunctionProfile(elem))
+            loader.get_event()
+            all_functions[key] = []
+        else:
+            all_functions[key] = _construct_yaml_value(loader, anchors)
+    loader.get_event()
+    return all_functions
+
+
+def _function_table_digest(filename: str) -> str:
+    """Digest of the 'All functions' table at the end of a frontend yaml file,
+    computed in the same way as the tree-sitter frontends do when writing the
+    table. Returns an empty string if the file has no top-level table."""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            offset = buf.find(b'\nAll functions:')
+            if offset == -1:
+                return ''
+            with memoryview(buf)[offset + 1:] as table:
+                return hashlib.sha256(table).hexdigest()
+
+
+def _function_table_cache_dir() -> str:
+    """Directory holding function tables across runs, keyed by digest. The
+    on-disk cache is only used if FI_FUNCTION_TABLE_CACHE_DIR is set."""
+    return os.environ.get('FI_FUNCTION_TABLE_CACHE_DIR', '')
+
+
+def _function_table_cache_path(cache_dir: str, table_digest: str) -> str:
+    return os.path.join(
+        cache_dir, f'function-table-{table_digest}{PROFILE_CACHE_SUFFIX}')
+
+
+def _load_function_table(
+    table_digest: str
+) -> Optional[Tuple[Dict[Any, Any], List[function_profile.FunctionProfile]]]:
+    """Returns a copy of a function table that has already been loaded in
+    this run, or in an earlier one if the on-disk cache is used."""
+    pickled_table = _function_tables.get(table_digest)
+    cache_dir = _function_table_cache_dir()
+    if pickled_table is None and cache_dir:
+        cache_file = _function_table_cache_path(cache_dir, table_digest)
+        if os.path.isfile(cache_file):
+            with open(cache_file, 'rb') as f:
+                pickled_table = f.read()
+    if pickled_table is None:
+        return None
+
+    try:
+        cached = pickle.loads(pickled_table)
+    except Exception as e:
+        logger.info('Ignoring corrupt function table %s: %s', table_digest,
+                    str(e))
+        return None
+    if (not isinstance(cached, dict)
+            or cached.get('version') != PROFILE_CACHE_VERSION
+            or cached.get('digest') != table_digest):
+        return None
+    _function_tables[table_digest] = pickled_table
+    return cached['all_functions'], cached['functions']
+
+
+def _store_function_table(
+        table_digest: str, all_functions: Dict[Any, Any],
+        functions: List[function_profile.FunctionProfile]) -> None:
+    """Keeps a loaded function table for the other harnesses of the project.
+    It is also written to the on-disk cache if one is set, for later
+    runs."""
+    pickled_table = pickle.dumps(
+        {
+            'version': PROFILE_CACHE_VERSION,
+            'digest': table_digest,
+            'all_functions': all_functions,
+            'functions': functions,
+        },
+        protocol=5)
+    _function_tables[table_digest] = pickled_table
+    cache_dir = _function_table_cache_dir()
+    if not cache_dir:
+        return
+
+    cache_file = _function_table_cache_path(cache_dir, table_digest)
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            f.write(pickled_table)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.info('Could not write function table %s: %s', cache_file,
+                    str(e))
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _read_function_table_digest(yaml_file: str) -> str:
+    """Returns the digest of the function table recorded in the header of a
+    frontend yaml file, or an empty string if it has none. Only the header
+    is parsed."""
+    loader_cls = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        with open(yaml_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                offset = buf.find(b'\nAll functions:')
+                if offset == -1:
+                    return ''
+                header = yaml.load(buf[:offset + 1], Loader=loader_cls)
+    except Exception as e:
+        logger.info('Could not read the header of %s: %s', yaml_file, str(e))
+        return ''
+    if not isinstance(header, dict):
+        return ''
+    table_digest = header.get(constants.FUNCTION_TABLE_DIGEST_KEY)
+    return table_digest if isinstance(table_digest, str) else ''
+
+
+def preload_function_tables(yaml_files: List[str]) -> None:
+    """Loads the function tables shared by several of the frontend yaml files,
+    so that the profile workers get a copy instead of each parsing them."""
+    yaml_files_by_digest: Dict[str, List[str]] = {}
+    for yaml_file in yaml_files:
+        if not os.path.isfile(yaml_file):
+            continue
+        table_digest = _read_function_table_digest(yaml_file)
+        if table_digest:
+            yaml_files_by_digest.setdefault(table_digest, []).append(yaml_file)
+
+    for table_digest, shared_files in yaml_files_by_digest.items():
+        if (len(shared_files) < 2
+                or _load_function_table(table_digest) is not None):
+            continue
+        logger.info('Preloading the function table shared by %d harnesses',
+                    len(shared_files))
+        stream_frontend_yaml(shared_files[0])
+
+
+def _construct_frontend_document(loader: Any, functions: List[
+    function_profile.FunctionProfile], filename: str) -> Tuple[Any, bool]:
+    """Reads a single yaml document of the frontend output. Returns the
+    document and whether its function table was shared with a previously
+    loaded file, in which case the rest of the stream is not read."""
+    anchors: Dict[str, Any] = {}
+    if not loader.check_event(yaml.MappingStartEvent):
+        return _construct_yaml_value(loader, anchors), False
+
+    loader.get_event()
+    doc: Dict[Any, Any] = {}
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = _construct_yaml_value(loader, anchors)
+        if key == 'All functions' and loader.check_event(
+                yaml.MappingStartEvent):
+            table_digest = doc.get(constants.FUNCTION_TABLE_DIGEST_KEY)
+            if (table_digest is not None
+                    and table_digest != _function_table_digest(filename)):
+                logger.info('Function table of %s does not match its digest',
+                            filename)
+                del doc[constants.FUNCTION_TABLE_DIGEST_KEY]
+                table_digest = None
+
+            # The digest covers everything from the table to the end of the
+            # file, so a known table means there is nothing left to parse.
+            shared_table = None
+            if table_digest is not None:
+                shared_table = _load_function_table(table_digest)
+            if shared_table is not None:
+                logger.info('Using shared function table of %s', filename)
+                doc[key] = shared_table[0]
+                functions.extend(shared_table[1])
+                return doc, True
+
+            table_start = len(functions)
+            doc[key] = _construct_all_functions(loader, anchors, functions)
+            if table_digest is not None:
+                _store_function_table(table_digest, doc[key],
+                                      functions[table_start:])
+        else:
+            doc[key] = _construct_yaml_value(loader, anchors)
+    loader.get_event()
+    return doc, False
+
+
+def stream_frontend_yaml(filename: str) -> FrontendYamlData:
+    """Reads the yaml output of a frontend in a single pass over the event
+    stream. Function elements are converted into FunctionProfiles while
+    parsing, so the raw dictionaries of all functions are never held in
+    memory at the same time.
+
+    Returns a tuple of the yaml data without the function elements and the
+    list of function profiles. The list is None if the yaml had no function
+    elements, and both are None if the file could not be parsed. Multiple
+    documents in the same file are merged in the same way as
+    utils.data_file_read_yaml.
+    """
+    if filename == '' or not os.path.isfile(filename):
+        return None, None
+
+    loader_cls = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    functions: List[function_profile.FunctionProfile] = []
+    docs = []
+    try:
+        with open(filename, 'r') as stream:
+            loader = loader_cls(stream)
+            try:
+                loader.get_event()
+                while not loader.check_event(yaml.StreamEndEvent):
+                    loader.get_event()
+                    doc, table_shared = _construct_frontend_document(
+                        loader, functions, filename)
+                    docs.append(doc)
+                    if table_shared:
+                        break
+                    loader.get_event()
+            finally:
+                loader.dispose()
+    except Exception as e:
+        # YAML library does not completely wrap exceptions, so unless
+        # we catch all exceptions here we might end up in a crashing state.
+        logger.info('Failed loading YAML: %s', str(e))
+        return None, None
+
+    if not docs:
+        return None, None
+
+    if len(docs) == 1:
+        data_dict = docs[0]
+        if not isinstance(data_dict, dict) or 'All functions' not in data_dict:
+            return data_dict, None
+        return data_dict, functions
+
+    # Multiple documents, keep only what the merged loader would.
+    content: Dict[Any, Any] = {}
+    for doc in docs:
+        if not doc or not isinstance(doc, dict):
+            return None, None
+        if 'Fuzzer filename' in doc and 'Fuzzer filename' not in content:
+            content['Fuzzer filename'] = doc['Fuzzer filename']
+        if 'All functions' in doc and 'All functions' not in content:
+            content['All functions'] = doc['All functions']
+    if 'Fuzzer filename' not in content or 'All functions' not in content:
+        return None, None
+    return content, functions
+
+
+def _profile_cache_path(yaml_file: str) -> str:
+    """Path of the sidecar cache for a given frontend yaml file. The file is
+    hidden so it does not match any of the data file patterns."""
+    dirname, basename = os.path.split(yaml_file)
+    return os.path.join(dirname, f'.{basename}{PROFILE_CACHE_SUFFIX}')
+
+
+def _profile_cache_enabled() -> bool:
+    return os.environ.get('FI_DISABLE_PROFILE_CACHE', '') == ''
+
+
+def _read_profile_cache(cache_file: str, digest: str) -> FrontendYamlData:
+    """Reads a sidecar cache, returns (None, None) if the cache is missing,
+    stale or corrupt."""
+    if not os.path.isfile(cache_file):
+        return None, None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        logger.info('Ignoring corrupt profile cache %s: %s', cache_file,
+                    str(e))
+        return None, None
+
+    if (not isinstance(cached, dict)
+            or cached.get('version') != PROFILE_CACHE_VERSION
+            or cached.get('digest') != digest):
+        logger.info('Ignoring stale profile cache %s', cache_file)
+        return None, None
+    return cached['data'], cached['functions']
+
+
+def _write_profile_cache(cache_file: str, digest: str,
+                         data: FrontendYamlData) -> None:
+    """Writes a sidecar cache. Failures are not fatal, e.g. if the data
+    folder is read-only."""
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                {
+                    'version': PROFILE_CACHE_VERSION,
+                    'digest': digest,
+                    'data': data[0],
+                    'functions': data[1],
+                },
+                f,
+                protocol=5)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.info('Could not write profile cache %s: %s', cache_file, str(e))
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def read_frontend_yaml(yaml_file: str) -> FrontendYamlData:
+    """Reads the yaml output of a frontend, using a sidecar cache keyed by
+    the hash of the yaml content when available. The cache is only written
+    when the analysis is allowed to dump files, and can be disabled with the
+    FI_DISABLE_PROFILE_CACHE environment variable.
+    """
+    if yaml_file == '' or not os.path.isfile(yaml_file):
+        return None, None
+    if not _profile_cache_enabled():
+        return stream_frontend_yaml(yaml_file)
+
+    cache_file = _profile_cache_path(yaml_file)
+    digest = ''
+    if os.path.isfile(cache_file):
+        try:
+            digest = utils.file_sha256(yaml_file)
+        except OSError:
+            return stream_frontend_yaml(yaml_file)
+        data = _read_profile_cache(cache_file, digest)
+        if data[0] is not None:
+            logger.info('Loaded %s from profile cache', yaml_file)
+            return data
+
+    data = stream_frontend_yaml(yaml_file)
+    # Files with a shared function table are cached through the function
+    # table cache.
+    if (data[0] is not None and constants.should_dump_files
+            and not (isinstance(data[0], dict)
+                     and constants.FUNCTION_TABLE_DIGEST_KEY in data[0])):
+        try:
+            digest = digest or utils.file_sha256(yaml_file)
+        except OSError:
+            return data
+        _write_profile_cache(cache_file, digest, data)
+    return data
+
+
+def _frontend_data_file(cfg_file: str) -> str:
+    """Path of the frontend data belonging to a .data file (CFG), without the
+    .yaml extension."""
+    if cfg_file.endswith('.txt'):
+        return '/'.join(cfg_file.split('/')[:-1]) + '/report'
+    return cfg_file
+
 
 def read_fuzzer_data_file_to_profile(
         cfg_file: str,
@@ -40,9 +478,7 @@ def read_fuzzer_data_file_to_profile(
     This is a bit odd way of doing it and should probably be improved.
     """
     logger.info(" - loading %s", cfg_file)
-    target_data_f = cfg_file
-    if cfg_file.endswith('.txt'):
-        target_data_f = '/'.join(cfg_file.split('/')[:-1]) + '/report'
+    target_data_f = _frontend_data_file(cfg_file)
 
     logging.info('target data f: %s' % (target_data_f))
     if not os.path.isfile(target_data_f) and not os.path.isfile(target_data_f +
@@ -50,13 +486,15 @@ def read_fuzzer_data_file_to_profile(
         logger.info('R1')
         return None
 
-    data_dict_yaml = utils.data_file_read_yaml(target_data_f + ".yaml")
+    data_dict_yaml, function_profiles = read_frontend_yaml(target_data_f +
+                                                           ".yaml")
 
     # Must be  dictionary
     if data_dict_yaml is None or not isinstance(data_dict_yaml, dict):
         logger.info('Found no data yaml file')
         if os.path.isfile('report.yaml'):
-            data_dict_yaml = utils.data_file_read_yaml('report.yaml')
+            data_dict_yaml, function_profiles = read_frontend_yaml(
+                'report.yaml')
             if data_dict_yaml is None or not isinstance(data_dict_yaml, dict):
                 logger.info('Report.yaml is not a valid yaml file')
                 return None
@@ -74,7 +512,8 @@ def read_fuzzer_data_file_to_profile(
     profile = fuzzer_profile.FuzzerProfile(cfg_file,
                                            data_dict_yaml,
                                            language,
-                                           cfg_content=cfg_content)
+                                           cfg_content=cfg_content,
+                                           function_profiles=function_profiles)
 
     if not profile.has_entry_point():
         logger.info("Found no entrypoints")
@@ -83,18 +522,175 @@ def read_fuzzer_data_file_to_profile(
     return profile
 
 
-def _load_profile(data_file: str, language: str, manager, semaphore=None):
-    """Internal function used for multithreaded profile loading"""
-    if semaphore is not None:
-        semaphore.acquire()
+def get_worker_count(language: str, jobs: Optional[int] = None) -> int:
+    """Number of worker processes to use for loading profiles. If jobs is not
+    given we use all cores, except for Java targets which tend to be quite
+    large, so we try to avoid memory exhaustion here."""
+    if jobs is not None and jobs > 0:
+        return jobs
+    if language == "jvm":
+        return 3
+    return os.cpu_count() or 1
+
+
+def _accummulate_profile(
+    profile: fuzzer_profile.FuzzerProfile, target_folder: str,
+    correlation_dict: Optional[Dict[Any,
+                                    Any]]) -> fuzzer_profile.FuzzerProfile:
+    """Correlates and accummulates a loaded profile"""
+    if correlation_dict is not None and "pairings" in correlation_dict:
+        profile.correlate_executable_name(correlation_dict)
+    profile.accummulate_profile(target_folder, None, None, None)
+    return profile
+
 
+def _load_and_accummulate_profile(
+    data_file: str, language: str, target_folder: str,
+    correlation_dict: Optional[Dict[Any, Any]]
+) -> Optional[fuzzer_profile.FuzzerProfile]:
+    """Internal function used for multiprocess profile loading. Loading and
+    accummulating happens in the same worker, so the profile is only sent
+    back to the parent once."""
     profile = read_fuzzer_data_file_to_profile(data_file, language)
-    if profile is not None:
-        manager[data_file] = profile
-    else:
+    if profile is None:
         logger.error('profile is none')
-    if semaphore is not None:
-        semaphore.release()
+        return None
+    return _accummulate_profile(profile, target_folder, correlation_dict)
+
+
+def _create_and_accummulate_profile(
+    report_yaml: Dict[Any, Any], calltree_text: str, language: str,
+    target_folder: str, correlation_dict: Optional[Dict[Any, Any]]
+) -> Optional[fuzzer_profile.FuzzerProfile]:
+    """Same as _load_and_accummulate_profile but for frontend data that is
+    already in memory, e.g. the harness lists of the light frontends."""
+    profile = fuzzer_profile.FuzzerProfile('cfg_file',
+                                           report_yaml,
+                                           language,
+                                           cfg_content=calltree_text)
+    return _accummulate_profile(profile, target_folder, correlation_dict)
+
+
+def _use_file_handoff(language: str) -> bool:
+    """Whether workers should hand profiles back through temporary files
+    rather than the result pipe of the pool. Large Java profiles otherwise
+    sit in memory as pickled bytes on both sides of the pipe. Can be forced
+    with FI_PROFILE_HANDOFF set to "file" or "pipe"."""
+    handoff = os.environ.get('FI_PROFILE_HANDOFF', '')
+    if handoff:
+        return handoff == 'file'
+    return language == 'jvm'
+
+
+def _run_profile_worker(worker: ProfileWorker, handoff_dir: Optional[str],
+                        *args: Any) -> Any:
+    """Runs a profile worker in a pool process. If handoff_dir is set the
+    profile is written to a file in that folder and the path returned."""
+    profile = worker(*args)
+    if profile is None or handoff_dir is None:
+        return profile
+
+    fd, handoff_file = tempfile.mkstemp(dir=handoff_dir, suffix='.profile')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(profile, f, protocol=5)
+    return handoff_file
+
+
+def _receive_profile(result: Any) -> Optional[fuzzer_profile.FuzzerProfile]:
+    """Reads the profile sent back by _run_profile_worker"""
+    if not isinstance(result, str):
+        return result
+    try:
+        with open(result, 'rb') as f:
+            profile: fuzzer_profile.FuzzerProfile = pickle.load(f)
+    finally:
+        os.remove(result)
+    return profile
+
+
+def _profile_pool_context() -> multiprocessing.context.BaseContext:
+    """Start method of the profile workers. Forked workers inherit what the
+    parent has loaded already."""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def _init_profile_worker(coverage_cache: Dict[Any, Any],
+                         function_tables: Dict[str, bytes]) -> None:
+    """Initialises a profile worker that was not forked from the parent with
+    the covreports and function tables the parent has loaded already."""
+    code_coverage.update_llvm_coverage_cache(coverage_cache)
+    _function_tables.update(function_tables)
+
+
+def _new_profile_pool(
+        max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Returns a pool of profile workers sharing the state of the parent."""
+    context = _profile_pool_context()
+    if context.get_start_method() == 'fork':
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                      mp_context=context)
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_profile_worker,
+        initargs=(code_coverage.get_llvm_coverage_cache(),
+                  dict(_function_tables)))
+
+
+def _run_profile_jobs(
+        worker: ProfileWorker, jobs_args: List[Tuple[Any, ...]],
+        parallelise: bool, language: str,
+        jobs: Optional[int]) -> List[fuzzer_profile.FuzzerProfile]:
+    """Runs the profile worker on each of the arguments, using a bounded
+    pool of processes if parallelise is set. Profiles that fail to load are
+    skipped, and the order of the results follows the order of arguments."""
+    worker_count = get_worker_count(language, jobs)
+    results: List[Optional[fuzzer_profile.FuzzerProfile]] = []
+    if not parallelise or worker_count <= 1 or len(jobs_args) <= 1:
+        for args in jobs_args:
+            try:
+                results.append(worker(*args))
+            except Exception:
+                logger.exception('Failed loading profile %s', args[0])
+        return [profile for profile in results if profile is not None]
+
+    with contextlib.ExitStack() as stack:
+        handoff_dir = None
+        if _use_file_handoff(language):
+            handoff_dir = stack.enter_context(
+                tempfile.TemporaryDirectory(prefix='fi-profiles-'))
+            logger.info('Handing off profiles through %s', handoff_dir)
+        executor = stack.enter_context(
+            _new_profile_pool(min(worker_count, len(jobs_args))))
+        futures = [
+            executor.submit(_run_profile_worker, worker, handoff_dir, *args)
+            for args in jobs_args
+        ]
+        for idx, future in enumerate(futures):
+            try:
+                results.append(_receive_profile(future.result()))
+            except Exception:
+                logger.exception('Failed loading profile %s',
+                                 jobs_args[idx][0])
+    return [profile for profile in results if profile is not None]
+
+
+def load_all_harness_profiles(
+        harness_lists: List[Tuple[Dict[Any, Any], str]],
+        target_folder: str,
+        language: str,
+        correlation_dict: Optional[Dict[Any, Any]] = None,
+        parallelise: bool = True,
+        jobs: Optional[int] = None) -> List[fuzzer_profile.FuzzerProfile]:
+    """Creates and accummulates profiles from in-memory frontend data, as
+    pairs of report yaml and calltree, in a multi-process manner"""
+    logger.info("Loading %d harness profiles", len(harness_lists))
+    return _run_profile_jobs(_create_and_accummulate_profile, [
+        (report_yaml, calltree_text, language, target_folder, correlation_dict)
+        for report_yaml, calltree_text in harness_lists
+    ], parallelise, language, jobs)
 
 
 def load_all_debug_files(target_folder: str):
@@ -124,20 +720,8 @@ def find_all_debug_function_files(target_folder: str):
     return debug_info_files
 
 
-def load_all_profiles(
-        target_folder: str,
-        language: str,
-        parallelise: bool = True) -> List[fuzzer_profile.FuzzerProfile]:
-    """Loads all profiles in target_folder in a multi-threaded manner"""
-    logger.info('Loading profiles from %s', target_folder)
-    if language == "jvm":
-        # Java targets tend to be quite large, so we try to avoid memory
-        # exhaustion here.
-        semaphore_count = 3
-    else:
-        semaphore_count = 6
-
-    profiles = []
+def find_all_profile_data_files(target_folder: str) -> List[str]:
+    """Finds all the fuzzer data files (calltrees) in target_folder"""
     data_files = utils.get_all_files_in_tree_with_regex(
         target_folder, "fuzzerLogFile.*\.data$")
     data_files.extend(
@@ -147,32 +731,33 @@ def load_all_profiles(
         target_folder, "targetCalltree.txt$")
     logger.info(target_calltrees)
     data_files.extend(target_calltrees)
+    return data_files
 
-    logger.info(" - found %d profiles to load", len(data_files))
-    if parallelise:
-        manager = multiprocessing.Manager()
-        semaphore = multiprocessing.Semaphore(semaphore_count)
-        return_dict = manager.dict()
-        jobs = []
-        for data_file in data_files:
-            p = multiprocessing.Process(target=_load_profile,
-                                        args=(data_file, language, return_dict,
-                                              semaphore))
-            jobs.append(p)
-            p.start()
-        for proc in jobs:
-            proc.join()
-
-        for v in return_dict.values():
-            profiles.append(v)
-    else:
-        return_dict_gen: Dict[Any, Any] = dict()
-        for data_file in data_files:
-            _load_profile(data_file, language, return_dict_gen, None)
-        for v in return_dict_gen.values():
-            profiles.append(v)
 
-    return profiles
+def load_all_profiles(
+        target_folder: str,
+        language: str,
+        parallelise: bool = True,
+        correlation_dict: Optional[Dict[Any, Any]] = None,
+        jobs: Optional[int] = None) -> List[fuzzer_profile.FuzzerProfile]:
+    """Loads and accummulates all profiles in target_folder in a
+    multi-process manner"""
+    logger.info('Loading profiles from %s', target_folder)
+    data_files = find_all_profile_data_files(target_folder)
+
+    logger.info(" - found %d profiles to load", len(data_files))
+    try:
+        preload_function_tables([
+            _frontend_data_file(data_file) + '.yaml'
+            for data_file in data_files
+        ])
+        return _run_profile_jobs(
+            _load_and_accummulate_profile,
+            [(data_file, language, target_folder, correlation_dict)
+             for data_file in data_files], parallelise, language, jobs)
+    finally:
+        # The shared function tables are only needed while loading.
+        _function_tables.clear()
 
 
 def try_load_input_bugs() -> List[bug.Bug]:
@@ -19,13 +19,15 @@ import logging
 from typing import (
     Any,
     Dict,
+    Iterable,
     List,
     Optional,
     Set,
     Tuple,
 )
 
-from fuzz_introspector import (cfg_load, code_coverage, json_report, utils)
+from fuzz_introspector import (cfg_load, code_coverage, json_report,
+                               reachability, utils)
 from fuzz_introspector.datatypes import function_profile
 from fuzz_introspector.exceptions import DataLoaderError
 
@@ -39,11 +41,15 @@ class FuzzerProfile:
     plugin. That means, the output from the plugin for a single fuzzer.
     """
 
-    def __init__(self,
-                 cfg_file: str,
-                 frontend_yaml: Dict[Any, Any],
-                 target_lang: str = "c-cpp",
-                 cfg_content='') -> None:
+    def __init__(
+        self,
+        cfg_file: str,
+        frontend_yaml: Dict[Any, Any],
+        target_lang: str = "c-cpp",
+        cfg_content='',
+        function_profiles: Optional[List[
+            function_profile.FunctionProfile]] = None
+    ) -> None:
         # Defaults
         self.binary_executable: str = ""
         self.file_targets: Dict[str, Set[str]] = dict()
@@ -59,6 +65,8 @@ class FuzzerProfile:
 
         self.functions_reached_by_fuzzer: List[str] = []
         self.functions_reached_by_fuzzer_runtime: List[str] = []
+        self._reached_by_fuzzer: Set[str] = set()
+        self._reached_by_fuzzer_runtime: Set[str] = set()
 
         # Load calltree file
         self.fuzzer_callsite_calltree = cfg_load.data_file_read_calltree(
@@ -80,7 +88,7 @@ class FuzzerProfile:
         if target_lang == 'jvm' or target_lang == 'go':
             self.entrypoint_method = frontend_yaml.get('Fuzzing method', '')
 
-        self._set_function_list(frontend_yaml)
+        self._set_function_list(frontend_yaml, function_profiles)
         self.dst_to_fd_cache: Dict[str,
                                    function_profile.FunctionProfile] = dict()
 
@@ -260,7 +268,7 @@ class FuzzerProfile:
         :returns: `True` if the fuzzer statically reaches the function. `False`
                   otherwise.
         """
-        return func_name in self.functions_reached_by_fuzzer
+        return func_name in self._reached_by_fuzzer
 
     def reaches_func_runtime(self, func_name: str) -> bool:
         """Identifies if the fuzzer dynamically reaches a given function in runtime
@@ -272,7 +280,7 @@ class FuzzerProfile:
         :returns: `True` if the fuzzer reaches the function in runtime. `False`
                   otherwise.
         """
-        return func_name in self.functions_reached_by_fuzzer_runtime
+        return func_name in self._reached_by_fuzzer_runtime
 
     def reaches_func_combined(self, func_name: str) -> bool:
         """Identifies if the fuzzer statically or dynamically reaches a given
@@ -285,7 +293,7 @@ class FuzzerProfile:
         :returns: `True` if the fuzzer reaches the function statically or in
                   runtime. `False` otherwise.
         """
-        return (func_name in self.functions_reached_by_fuzzer
+        return (func_name in self._reached_by_fuzzer
                 or self.reaches_func_runtime(func_name))
 
     def correlate_executable_name(self, correlation_dict) -> None:
@@ -307,49 +315,17 @@ class FuzzerProfile:
 
     def _propagate_functions_reached(self) -> None:
         """Accummulates all functions reached by a given fuzzer. This is
-        achieved by iterating the outgoing edges of each function recursively
+        achieved by computing the transitive closure of the outgoing edges
+        of each function, which also gives the depth of each function.
         """
-        new_all_class_functions: Dict[
-            str, function_profile.FunctionProfile] = dict()
-
+        graph = reachability.ReachabilityGraph({
+            func:
+            func_profile.functions_reached
+            for func, func_profile in self.all_class_functions.items()
+        })
         for func, func_profile in self.all_class_functions.items():
-            worklist = []
-            max_depth = 0
-            for func_reached in func_profile.functions_reached:
-                worklist.append((func_reached, 1))
-            visited = set()
-
-            while len(worklist) > 0:
-                elem, depth = worklist.pop()
-                max_depth = max(depth, max_depth)
-
-                if elem in visited:
-                    continue
-                visited.add(elem)
-
-                # Check if we have done this function already.
-                try:
-                    fd = new_all_class_functions[elem]
-                    visited.update(set(fd.functions_reached))
-                    tmp_depth = fd.function_depth + depth
-                    max_depth = max(max_depth, tmp_depth)
-                    continue
-                except KeyError:
-                    pass
-
-                # Otherwise traverse the functions reached.
-                try:
-                    for func_reached2 in self.all_class_functions[
-                            elem].functions_reached:
-                        worklist.append((func_reached2, depth + 1))
-                except KeyError:
-                    pass
-
-            # Save the work
-            new_all_class_functions[func] = func_profile
-            new_all_class_functions[func].functions_reached = list(visited)
-            new_all_class_functions[func].function_depth = max_depth
-        self.all_class_functions = new_all_class_functions
+            func_profile.functions_reached = graph.reached_names(func)
+            func_profile.function_depth = graph.function_depth(func)
 
     def _set_fd_cache(self):
         for _, fd in self.all_class_functions.items():
@@ -508,7 +484,6 @@ class FuzzerProfile:
                     self.entrypoint_function].functions_reached)
                 self.functions_reached_by_fuzzer.append(
                     self.entrypoint_function)
-                return
 
         # Find Python entrypoint
         elif self._target_lang == "python":
@@ -516,7 +491,6 @@ class FuzzerProfile:
             reached = self.all_class_functions[ep_key].functions_reached
             self.functions_reached_by_fuzzer = reached
             self.functions_reached_by_fuzzer.append(self.entrypoint_function)
-            return
 
         # Find JVM entrypoint
         elif self._target_lang == "jvm":
@@ -529,7 +503,8 @@ class FuzzerProfile:
                 self.functions_reached_by_fuzzer = (
                     self.all_class_functions[entrypoint].functions_reached)
                 self.functions_reached_by_fuzzer.append(entrypoint)
-                return
+
+        self._reached_by_fuzzer = set(self.functions_reached_by_fuzzer)
 
     def _set_all_unreached_functions(self) -> None:
         """Sets self.functions_unreached_by_fuzzer to all functions that are
@@ -538,7 +513,7 @@ class FuzzerProfile:
         """
         self.functions_unreached_by_fuzzer = [
             f.function_name for f in self.all_class_functions.values()
-            if f.function_name not in self.functions_reached_by_fuzzer
+            if f.function_name not in self._reached_by_fuzzer
         ]
 
     def _set_all_reached_functions_runtime(self) -> None:
@@ -554,6 +529,8 @@ class FuzzerProfile:
         for func_name in self.coverage.covmap:
             if self.coverage.is_func_hit(func_name):
                 self.functions_reached_by_fuzzer_runtime.append(func_name)
+        self._reached_by_fuzzer_runtime = set(
+            self.functions_reached_by_fuzzer_runtime)
 
     def _load_coverage(self, target_folder: str) -> None:
         """Load coverage data for this profile"""
@@ -630,16 +607,30 @@ class FuzzerProfile:
             except Exception as e:
                 logger.debug(e)
 
-    def _set_function_list(self, frontend_yaml: Dict[Any, Any]) -> None:
+    def _set_function_list(
+        self,
+        frontend_yaml: Dict[Any, Any],
+        function_profiles: Optional[List[
+            function_profile.FunctionProfile]] = None
+    ) -> None:
         """Read all function field from yaml data dictionary into
-        instances of FunctionProfile
+        instances of FunctionProfile. If the profiles have already been
+        created, e.g. by a streaming loader, these are used instead.
         """
-        for elem in frontend_yaml['All functions']['Elements']:
-            if self._is_func_name_missing_normalisation(elem['functionName']):
+        func_profiles: Iterable[function_profile.FunctionProfile]
+        if function_profiles is None:
+            func_profiles = (
+                function_profile.FunctionProfile(elem)
+                for elem in frontend_yaml['All functions']['Elements'])
+        else:
+            func_profiles = function_profiles
+
+        for func_profile in func_profiles:
+            if self._is_func_name_missing_normalisation(
+                    func_profile.raw_function_name):
                 logger.info("May have non-normalised function: %s",
-                            elem['functionName'])
+                            func_profile.raw_function_name)
 
-            func_profile = function_profile.FunctionProfile(elem)
             logger.debug("Adding %s", func_profile.function_name)
 
             # Avoid loading more entrypoints as this will cause issues when
@@ -648,7 +639,8 @@ class FuzzerProfile:
                 if func_profile.function_source_file not in self.fuzzer_source_file:
                     continue
 
-            if self.target_lang == "jvm" and "<init>" in elem['functionName']:
+            if (self.target_lang == "jvm"
+                    and "<init>" in func_profile.raw_function_name):
                 # Store JVM constructor separately
                 self.all_class_constructors[
                     func_profile.function_name] = func_profile
@@ -15,6 +15,9 @@
 
 import os
 import logging
+import itertools
+
+import numpy as np
 
 from typing import (
     Dict,
@@ -71,6 +74,10 @@ class MergedProjectProfile:
         # add duplicates
         logger.info("Creating all_functions dictionary")
         excluded_functions = {"sanitizer", "llvm", "LLVMFuzzerTestOneInput"}
+        # All copies of each function, as every profile has its own
+        # FunctionProfile objects.
+        function_copies: Dict[str,
+                              List[function_profile.FunctionProfile]] = dict()
         for profile in profiles:
             # Handles jvm constructors
             for fd in profile.all_class_constructors.values():
@@ -83,125 +90,202 @@ class MergedProjectProfile:
                 if any(to_exclude in fd.function_name
                        for to_exclude in excluded_functions):
                     continue
-
-                # populate hitcount and reached_by_fuzzers and whether it has been handled already
-                # Also populate the reached_by_fuzzers_runtime and reached_by_fuzzers_combined
-                for profile2 in profiles:
-                    # Statically reached functions
-                    if profile2.reaches_func(fd.function_name):
-                        fd.reached_by_fuzzers.append(profile2.identifier)
-
-                    # Dynamically reached functions
-                    if profile2.reaches_func_runtime(fd.function_name):
-                        fd.reached_by_fuzzers_runtime.append(
-                            profile2.identifier)
-
-                    # Statically or dynamically reached functions
-                    if profile2.reaches_func_combined(fd.function_name):
-                        fd.reached_by_fuzzers_combined.append(
-                            profile2.identifier)
-
-                    if fd.function_name not in self.all_functions:
-                        self.all_functions[fd.function_name] = fd
-
-                # Deduplicate the reached_by_fuzzer* list
-                fd.reached_by_fuzzers = list(set(fd.reached_by_fuzzers))
-                fd.reached_by_fuzzers_runtime = list(
-                    set(fd.reached_by_fuzzers_runtime))
-                fd.reached_by_fuzzers_combined = list(
-                    set(fd.reached_by_fuzzers_combined))
-
-                # Refine hitcount
-                fd.hitcount = len(fd.reached_by_fuzzers)
-                fd.hitcount_runtime = len(fd.reached_by_fuzzers_runtime)
-                fd.hitcount_combined = len(fd.reached_by_fuzzers_combined)
+                if fd.function_name not in self.all_functions:
+                    self.all_functions[fd.function_name] = fd
+                    function_copies[fd.function_name] = [fd]
+                else:
+                    function_copies[fd.function_name].append(fd)
+
+        # populate hitcount and reached_by_fuzzers, also populate the
+        # reached_by_fuzzers_runtime and reached_by_fuzzers_combined
+        logger.info("Creating function reachability matrices")
+        self._set_reachability_matrices()
+        static_fuzzers = self._get_fuzzers_per_function(self.static_reach)
+        runtime_fuzzers = self._get_fuzzers_per_function(self.runtime_reach)
+        combined_fuzzers = self._get_fuzzers_per_function(self.combined_reach)
+        for row, func_name in enumerate(self.all_functions):
+            for fd in function_copies[func_name]:
+                fd.reached_by_fuzzers = list(static_fuzzers[row])
+                fd.reached_by_fuzzers_runtime = list(runtime_fuzzers[row])
+                fd.reached_by_fuzzers_combined = list(combined_fuzzers[row])
+                fd.hitcount = len(static_fuzzers[row])
+                fd.hitcount_runtime = len(runtime_fuzzers[row])
+                fd.hitcount_combined = len(combined_fuzzers[row])
 
         # Gather complexity information about each function
         logger.info(
             "Gathering complexity and incoming references of each function")
-        for fp_obj in {**self.all_functions, **self.all_constructors}.values():
-            total_cyclomatic_complexity = 0
-            total_new_complexity = 0
-
-            for reached_func_name in fp_obj.functions_reached:
-                if reached_func_name in self.all_functions:
-                    reached_func_obj = self.all_functions[reached_func_name]
-                elif reached_func_name in self.all_constructors:
-                    reached_func_obj = self.all_constructors[reached_func_name]
-                else:
-                    if profile.target_lang == "jvm":
-                        logger.debug(
-                            f"{reached_func_name} not provided within classpath"
-                        )
-                    else:
-                        logger.debug(
-                            f"Mismatched function name: {reached_func_name}")
-                    continue
-                reached_func_obj.incoming_references.append(
-                    fp_obj.function_name)
-
-                # Skip complexity additions if this is a recursive call
-                if (fp_obj.function_source_file
-                        == reached_func_obj.function_source_file
-                        and fp_obj.function_linenumber
-                        == reached_func_obj.function_linenumber
-                        and fp_obj.function_line_number_end
-                        == reached_func_obj.function_line_number_end):
-                    continue
-                total_cyclomatic_complexity += reached_func_obj.cyclomatic_complexity
-                if reached_func_obj.hitcount == 0:
-                    total_new_complexity += reached_func_obj.cyclomatic_complexity
-            if fp_obj.hitcount == 0:
-                fp_obj.new_unreached_complexity = (
-                    total_new_complexity + fp_obj.cyclomatic_complexity)
-            else:
-                fp_obj.new_unreached_complexity = total_new_complexity
-            fp_obj.total_cyclomatic_complexity = (total_cyclomatic_complexity +
-                                                  fp_obj.cyclomatic_complexity)
+        self._set_complexity_and_incoming_references()
 
         # Accumulate run-time coverage mapping
         self.runtime_coverage = code_coverage.CoverageProfile()
-        for profile in profiles:
-            if profile.coverage is None:
-                continue
-            for func_name in profile.coverage.covmap:
-                if func_name not in self.runtime_coverage.covmap:
-                    self.runtime_coverage.covmap[
-                        func_name] = profile.coverage.covmap[func_name]
-                else:
-                    # Merge by picking highest line numbers. Here we can assume they coverage
-                    # maps have the same number of elements with the same line numbers but
-                    # different hit counts.
-                    new_line_counts = list()
-                    for idx1 in range(
-                            len(self.runtime_coverage.covmap[func_name])):
-                        try:
-                            ln1, ht1 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                            ln2, ht2 = profile.coverage.covmap[func_name][idx1]
-                        except Exception:
-                            ln1, ht1 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                            ln2, ht2 = self.runtime_coverage.covmap[func_name][
-                                idx1]
-                        # It may be that line numbers are not the same for the same function
-                        # name across different fuzzers.
-                        # This *could* actually happen, and will often (almost always) happen for
-                        # LLVMFuzzerTestOneInput. In this case we just gracefully
-                        # continue and ignore issues.
-                        if ln1 != ln2:
-                            logger.info(
-                                f"Line numbers are different in the same function: "
-                                f"{func_name}:{ln1}:{ln2}, ignoring")
-                            continue
-                        new_line_counts.append((ln1, max(ht1, ht2)))
-                    self.runtime_coverage.covmap[func_name] = new_line_counts
-            # TODO (navidem): will need to merge branch coverages (branch_cov_map) if we need to
-            # identify blockers based on all fuzz targets coverage
+        self._merge_runtime_coverage(profiles)
         self._set_basefolder()
         self._set_fd_cache()
         logger.info("Completed creationg of merged profile")
 
+    def _merge_runtime_coverage(
+            self, profiles: List[fuzzer_profile.FuzzerProfile]) -> None:
+        """Merges the covmaps of all profiles into `self.runtime_coverage`,
+        taking the highest hitcount of each line."""
+        func_coverages: Dict[str, List[List[Tuple[int, int]]]] = dict()
+        for profile in profiles:
+            if profile.coverage is None:
+                continue
+            for func_name, line_counts in profile.coverage.covmap.items():
+                func_coverages.setdefault(func_name, []).append(line_counts)
+        # TODO (navidem): will need to merge branch coverages (branch_cov_map) if we need to
+        # identify blockers based on all fuzz targets coverage
+        for func_name, coverages in func_coverages.items():
+            self.runtime_coverage.covmap[func_name] = _merge_line_coverage(
+                func_name, coverages)
+
+    def _set_reachability_matrices(self) -> None:
+        """Creates function by fuzzer boolean matrices of the static, runtime
+        and combined reachability. Rows follow the order of
+        `self.all_functions` as given by `self.function_index`, and columns
+        the fuzzer identifiers in `self.fuzzer_identifiers`. Profiles with
+        the same identifier share a column.
+        """
+        self.function_index: Dict[str, int] = {
+            func_name: idx
+            for idx, func_name in enumerate(self.all_functions)
+        }
+        self.fuzzer_identifiers: List[str] = list(
+            dict.fromkeys(profile.identifier for profile in self.profiles))
+        fuzzer_columns = {
+            identifier: idx
+            for idx, identifier in enumerate(self.fuzzer_identifiers)
+        }
+
+        shape = (len(self.function_index), len(self.fuzzer_identifiers))
+        self.static_reach = np.zeros(shape, dtype=bool)
+        self.runtime_reach = np.zeros(shape, dtype=bool)
+        for profile in self.profiles:
+            column = fuzzer_columns[profile.identifier]
+            self.static_reach[
+                self._get_function_rows(profile.functions_reached_by_fuzzer),
+                column] = True
+            self.runtime_reach[self._get_function_rows(
+                profile.functions_reached_by_fuzzer_runtime), column] = True
+        self.combined_reach = self.static_reach | self.runtime_reach
+
+    def _get_function_rows(self, func_names: List[str]) -> np.ndarray:
+        """Matrix rows of the given function names that are in the merged
+        profile."""
+        return np.fromiter(
+            (self.function_index[func_name]
+             for func_name in func_names if func_name in self.function_index),
+            dtype=np.int64)
+
+    def _get_fuzzers_per_function(self,
+                                  reach_matrix: np.ndarray) -> List[List[str]]:
+        """Converts a reachability matrix to the list of fuzzer identifiers
+        of each function row."""
+        fuzzers_per_function: List[List[str]] = [
+            [] for _ in range(reach_matrix.shape[0])
+        ]
+        rows, columns = np.nonzero(reach_matrix)
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            fuzzers_per_function[row].append(self.fuzzer_identifiers[column])
+        return fuzzers_per_function
+
+    def _set_complexity_and_incoming_references(self) -> None:
+        """Sets the total and new unreached complexity, as well as the
+        incoming references, of each function in the merged profile.
+
+        The reached functions of all functions form a sparse reachability
+        matrix, and the complexities are computed as products of that matrix
+        with the complexity vectors of the reached functions.
+        """
+        # Reached functions are resolved as normal functions first and as
+        # constructors otherwise.
+        targets = list(self.all_functions.values())
+        for func_name, fd in self.all_constructors.items():
+            if func_name not in self.all_functions:
+                targets.append(fd)
+        target_index = {
+            fd.function_name: idx
+            for idx, fd in enumerate(targets)
+        }
+        sources = list({
+            **self.all_functions,
+            **self.all_constructors
+        }.values())
+
+        source_rows: List[int] = []
+        target_columns: List[int] = []
+        mismatched_names = 0
+        for row, fp_obj in enumerate(sources):
+            reached_columns = [
+                target_index[reached_func_name]
+                for reached_func_name in fp_obj.functions_reached
+                if reached_func_name in target_index
+            ]
+            mismatched_names += (len(fp_obj.functions_reached) -
+                                 len(reached_columns))
+            source_rows.extend([row] * len(reached_columns))
+            target_columns.extend(reached_columns)
+        if mismatched_names:
+            if self.language == "jvm":
+                logger.debug(
+                    "%d reached functions not provided within "
+                    "classpath", mismatched_names)
+            else:
+                logger.debug("%d mismatched reached function names",
+                             mismatched_names)
+
+        rows = np.array(source_rows, dtype=np.int64)
+        columns = np.array(target_columns, dtype=np.int64)
+
+        # Incoming references in the order of the sources.
+        target_names = np.array([fd.function_name for fd in sources],
+                                dtype=object)
+        order = np.argsort(columns, kind='stable')
+        split_at = np.flatnonzero(np.diff(columns[order])) + 1
+        for column_rows in np.split(order, split_at):
+            if len(column_rows) == 0:
+                continue
+            targets[columns[column_rows[0]]].incoming_references.extend(
+                target_names[rows[column_rows]].tolist())
+
+        # Skip complexity additions if this is a recursive call
+        locations: Dict[Tuple[str, int, int], int] = dict()
+
+        def location_of(fd: function_profile.FunctionProfile) -> int:
+            return locations.setdefault(
+                (fd.function_source_file, fd.function_linenumber,
+                 fd.function_line_number_end), len(locations))
+
+        source_locations = np.array([location_of(fd) for fd in sources],
+                                    dtype=np.int64)
+        target_locations = np.array([location_of(fd) for fd in targets],
+                                    dtype=np.int64)
+        non_recursive = (source_locations[rows] != target_locations[columns])
+        rows = rows[non_recursive]
+        columns = columns[non_recursive]
+
+        target_complexity = np.array(
+            [fd.cyclomatic_complexity for fd in targets], dtype=np.int64)
+        target_unreached = np.array([fd.hitcount == 0 for fd in targets],
+                                    dtype=bool)
+        total_complexity = np.bincount(rows,
+                                       weights=target_complexity[columns],
+                                       minlength=len(sources))
+        new_complexity = np.bincount(rows,
+                                     weights=(target_complexity *
+                                              target_unreached)[columns],
+                                     minlength=len(sources))
+
+        for row, fp_obj in enumerate(sources):
+            if fp_obj.hitcount == 0:
+                fp_obj.new_unreached_complexity = (
+                    int(new_complexity[row]) + fp_obj.cyclomatic_complexity)
+            else:
+                fp_obj.new_unreached_complexity = int(new_complexity[row])
+            fp_obj.total_cyclomatic_complexity = (int(total_complexity[row]) +
+                                                  fp_obj.cyclomatic_complexity)
+
     def get_all_runtime_covered_functions(self) -> List[str]:
         """Gets the name of all functions that are covered by runtime
         code coverage analysis.
@@ -211,13 +295,7 @@ class MergedProjectProfile:
         """
         all_covered_functions = []
         for funcname in self.get_all_functions_with_source():
-            is_covered = False
-            coverage_data = self.runtime_coverage.get_hit_details(funcname)
-            if len(coverage_data) > 0:
-                for linenumber, hitcount in coverage_data:
-                    if hitcount > 0:
-                        is_covered = True
-            if is_covered:
+            if self.runtime_coverage.is_func_hit(funcname):
                 all_covered_functions.append(funcname)
 
         return all_covered_functions
@@ -560,3 +638,56 @@ class MergedProjectProfile:
             else:
                 self.dst_to_fd_cache[utils.demangle_cpp_func(
                     fd.function_name)] = fd
+
+
+def _line_coverage_arrays(
+        line_counts: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Splits a covmap entry in an array of line numbers and an array of
+    hitcounts."""
+    pairs = np.fromiter(itertools.chain.from_iterable(line_counts),
+                        dtype=np.int64,
+                        count=2 * len(line_counts)).reshape(-1, 2)
+    return pairs[:, 0].astype(np.int32), pairs[:, 1]
+
+
+def _merge_line_coverage(
+        func_name: str,
+        coverages: List[List[Tuple[int, int]]]) -> List[Tuple[int, int]]:
+    """Merges the covmap entries of a function from multiple fuzzers by
+    picking the highest hitcount of each line.
+
+    The entries are merged in order and matched by position. It may be that
+    line numbers are not the same for the same function name across different
+    fuzzers. This *could* actually happen, and will often (almost always)
+    happen for LLVMFuzzerTestOneInput. Positions with different line numbers
+    are dropped, and lines beyond the end of the other entry are kept.
+    """
+    merged = coverages[0]
+    if len(coverages) == 1:
+        return merged
+
+    lines, hitcounts = _line_coverage_arrays(merged)
+    merged_ids = {id(merged)}
+    dropped_lines = False
+    for line_counts in coverages[1:]:
+        # Merging the same entry again is a no-op, unless positions have
+        # shifted because lines were dropped.
+        if id(line_counts) in merged_ids and not dropped_lines:
+            continue
+        merged_ids.add(id(line_counts))
+
+        other_lines, other_hitcounts = _line_coverage_arrays(line_counts)
+        common = min(len(lines), len(other_lines))
+        same_line = lines[:common] == other_lines[:common]
+        max_hitcounts = np.maximum(hitcounts[:common],
+                                   other_hitcounts[:common])
+        if not same_line.all():
+            logger.info(
+                f"Line numbers are different in the same function: "
+                f"{func_name}, ignoring {common - int(same_line.sum())} lines")
+            dropped_lines = True
+        lines = np.concatenate((lines[:common][same_line], lines[common:]))
+        hitcounts = np.concatenate(
+            (max_hitcounts[same_line], hitcounts[common:]))
+
+    return list(zip(lines.tolist(), hitcounts.tolist()))
@@ -17,13 +17,37 @@ import logging
 import os
 import json
 import shutil
+import collections.abc
+import multiprocessing
+import concurrent.futures
+import pickle
+
+from typing import Any
+
+import numpy as np
 import yaml
 
 logger = logging.getLogger(name=__name__)
 
+# Bump whenever the layout of the debug yaml caches changes, so that caches
+# written by older versions are ignored.
+DEBUG_YAML_CACHE_VERSION = 1
+DEBUG_YAML_CACHE_SUFFIX = '.ficache'
 
-def extract_all_compile_units(content, all_files_in_debug_info):
-    for line in content.split("\n"):
+_SafeLoader: Any = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _new_file_entry(source_file):
+    return {'source_file': source_file, 'language': 'N/A'}
+
+
+class _CompileUnitCollector:
+    """Collects the source files of the compile units in a debug file."""
+
+    def __init__(self, all_files_in_debug_info):
+        self.all_files_in_debug_info = all_files_in_debug_info
+
+    def feed(self, line):
         # Source code files
         if "Compile unit:" in line:
             split_line = line.split(" ")
@@ -40,11 +64,17 @@ def extract_all_compile_units(content, all_files_in_debug_info):
                 file_dict['source_file'] = '/' + '/'.join(
                     file_dict['source_file'].split('//')[1:])
 
-            all_files_in_debug_info[file_dict['source_file']] = file_dict
+            self.all_files_in_debug_info[file_dict['source_file']] = file_dict
 
 
-def extract_global_variables(content, global_variables, source_files):
-    for line in content.split("\n"):
+class _GlobalVariableCollector:
+    """Collects the global variables of a debug file."""
+
+    def __init__(self, global_variables, source_files):
+        self.global_variables = global_variables
+        self.source_files = source_files
+
+    def feed(self, line):
         if "Global variable: " in line:
             sline = line.replace("Global variable: ", "").split(" from ")
             global_variable_name = sline[0]
@@ -54,7 +84,7 @@ def extract_global_variables(content, global_variables, source_files):
                 source_line = location.split(":")[1]
             except IndexError:
                 source_line = "-1"
-            global_variables[source_file + source_line] = {
+            self.global_variables[source_file + source_line] = {
                 'name': global_variable_name,
                 'source': {
                     'source_file': source_file,
@@ -62,241 +92,306 @@ def extract_global_variables(content, global_variables, source_files):
                 }
             }
             # Add the file to all files in project
-            if source_file not in source_files:
-                source_files[source_file] = {
-                    'source_file': source_file,
-                    'language': 'N/A'
-                }
+            if source_file not in self.source_files:
+                self.source_files[source_file] = _new_file_entry(source_file)
 
 
-def extract_types(content, all_types, all_files_in_debug_info):
-    current_type = None
-    current_struct = None
+class _TypeCollector:
+    """Collects the structs and typedefs defined in a debug file."""
     types_identifier = "## Types defined in module"
-    read_types = False
 
-    for line in content.split("\n"):
-        if types_identifier in line:
-            read_types = True
-
-        if read_types:
-            if "Type: Name:" in line:
-                if current_struct is not None:
-                    hashkey = current_struct['source'][
-                        'source_file'] + current_struct['source']['source_line']
-                    all_types[hashkey] = current_struct
-                    current_struct = None
-                if "DW_TAG_structure" in line:
-                    current_struct = dict()
-                    struct_name = line.split("{")[-1].split("}")[0].strip()
-                    location = line.split("from")[-1].strip().split(" ")[0]
-                    source_file = location.split(":")[0]
-                    try:
-                        source_line = location.split(":")[1]
-                    except IndexError:
-                        source_line = "-1"
-                    current_struct = {
-                        'type': 'struct',
-                        'name': struct_name,
-                        'source': {
-                            'source_file': source_file,
-                            'source_line': source_line
-                        },
-                        'elements': []
+    def __init__(self, all_types, all_files_in_debug_info):
+        self.all_types = all_types
+        self.all_files_in_debug_info = all_files_in_debug_info
+        self.current_struct = None
+        self.read_types = False
+
+    def _add_source_file(self, source_file):
+        # Add the file to all files in project
+        if source_file not in self.all_files_in_debug_info:
+            self.all_files_in_debug_info[source_file] = _new_file_entry(
+                source_file)
+
+    def feed(self, line):
+        if self.types_identifier in line:
+            self.read_types = True
+        if not self.read_types:
+            return
+
+        if "Type: Name:" in line:
+            if self.current_struct is not None:
+                hashkey = self.current_struct['source'][
+                    'source_file'] + self.current_struct['source'][
+                        'source_line']
+                self.all_types[hashkey] = self.current_struct
+                self.current_struct = None
+            if "DW_TAG_structure" in line:
+                struct_name = line.split("{")[-1].split("}")[0].strip()
+                location = line.split("from")[-1].strip().split(" ")[0]
+                source_file = location.split(":")[0]
+                try:
+                    source_line = location.split(":")[1]
+                except IndexError:
+                    source_line = "-1"
+                self.current_struct = {
+                    'type': 'struct',
+                    'name': struct_name,
+                    'source': {
+                        'source_file': source_file,
+                        'source_line': source_line
+                    },
+                    'elements': []
+                }
+                self._add_source_file(source_file)
+            if "DW_TAG_typedef" in line:
+                name = line.split("{")[-1].strip().split("}")[0]
+                location = line.split(" from ")[-1].split(" ")[0]
+                source_file = location.split(":")[0]
+                try:
+                    source_line = location.split(":")[1]
+                except IndexError:
+                    source_line = "-1"
+                current_type = {
+                    'type': 'typedef',
+                    'name': name,
+                    'source': {
+                        'source_file': source_file,
+                        'source_line': source_line
                     }
-                    # Add the file to all files in project
-                    if source_file not in all_files_in_debug_info:
-                        all_files_in_debug_info[source_file] = {
-                            'source_file': source_file,
-                            'language': 'N/A'
-                        }
-                if "DW_TAG_typedef" in line:
-                    name = line.split("{")[-1].strip().split("}")[0]
-                    location = line.split(" from ")[-1].split(" ")[0]
-                    source_file = location.split(":")[0]
-                    try:
-                        source_line = location.split(":")[1]
-                    except IndexError:
-                        source_line = "-1"
-                    current_type = {
-                        'type': 'typedef',
-                        'name': name,
-                        'source': {
-                            'source_file': source_file,
-                            'source_line': source_line
-                        }
+                }
+                hashkey = current_type['source']['source_file'] + current_type[
+                    'source']['source_line']
+                self.all_types[hashkey] = current_type
+                self._add_source_file(source_file)
+        if "- Elem " in line:
+            # Ensure we have a strcuct
+            if self.current_struct is not None:
+                elem_name = line.split("{")[-1].strip().split(" ")[0]
+                location = line.split("from")[-1].strip().split(" ")[0]
+                source_file = location.split(":")[0]
+                try:
+                    source_line = location.split(":")[1]
+                except IndexError:
+                    source_line = "-1"
+
+                self.current_struct['elements'].append({
+                    'name': elem_name,
+                    'source': {
+                        'source_file': source_file,
+                        'source_line': source_line,
                     }
-                    hashkey = current_type['source'][
-                        'source_file'] + current_type['source']['source_line']
-                    all_types[hashkey] = current_type
-                    # Add the file to all files in project
-                    if source_file not in all_files_in_debug_info:
-                        all_files_in_debug_info[source_file] = {
-                            'source_file': source_file,
-                            'language': 'N/A'
-                        }
-            if "- Elem " in line:
-                # Ensure we have a strcuct
-                if current_struct is not None:
-                    elem_name = line.split("{")[-1].strip().split(" ")[0]
-                    location = line.split("from")[-1].strip().split(" ")[0]
-                    source_file = location.split(":")[0]
-                    try:
-                        source_line = location.split(":")[1]
-                    except IndexError:
-                        source_line = "-1"
-
-                    current_struct['elements'].append({
-                        'name': elem_name,
-                        'source': {
-                            'source_file': source_file,
-                            'source_line': source_line,
-                        }
-                    })
-                    # Add the file to all files in project
-                    if source_file not in all_files_in_debug_info:
-                        all_files_in_debug_info[source_file] = {
-                            'source_file': source_file,
-                            'language': 'N/A'
-                        }
+                })
+                self._add_source_file(source_file)
 
 
-def extract_all_functions_in_debug_info(content, all_functions_in_debug,
-                                        all_files_in_debug_info):
+class _FunctionCollector:
+    """Collects the functions defined in a debug file, with their source
+    location, return type and argument types."""
     function_identifier = "## Functions defined in module"
-    read_functions = False
-    current_function = None
     global_variable_identifier = "## Global variables in module"
-    logger.info("Extracting functions")
 
+    def __init__(self, all_functions_in_debug, all_files_in_debug_info):
+        self.all_functions_in_debug = all_functions_in_debug
+        self.all_files_in_debug_info = all_files_in_debug_info
+        self.current_function = None
+        self.read_functions = False
+
+    def _add_current_function(self):
+        current_function = self.current_function
+        # Adjust args such that arg0 is set to the return type
+        current_args = current_function.get('args', [])
+        if len(current_args) > 0:
+            return_type = current_args[0]
+            current_args = current_args[1:]
+            current_function['args'] = current_args
+            current_function['return_type'] = return_type
+
+        try:
+            hashkey = current_function['source'][
+                'source_file'] + current_function['source']['source_line']
+        except KeyError:
+            hashkey = None
+
+        if hashkey is not None:
+            self.all_functions_in_debug[hashkey] = current_function
+        else:
+            # Something went wrong, abandon.
+            self.current_function = None
+
+    def feed(self, line):
+        if self.function_identifier in line:
+            self.read_functions = True
+        if self.global_variable_identifier in line:
+            if self.current_function is not None:
+                self._add_current_function()
+            self.read_functions = False
+        if not self.read_functions:
+            return
+
+        if line.startswith("Subprogram: "):
+            if self.current_function is not None:
+                self._add_current_function()
+            self.current_function = dict()
+            function_name = " ".join(line.split(" ")[1:])
+            self.current_function['name'] = function_name
+        current_function = self.current_function
+        if ' from ' in line and ":" in line and "- Operand" not in line and "Elem " not in line:
+            location = line.split(" from ")[-1]
+            source_file = location.split(":")[0].strip()
+            try:
+                source_line = line.split(":")[-1].strip()
+                if len(source_line.split(" ")) > 0:
+                    source_line = source_line.split(" ")[0]
+            except IndexError:
+                source_line = "-1"
+            current_function['source'] = {
+                'source_file': source_file,
+                'source_line': source_line,
+            }
+            # Add the file to all files in project
+            if source_file not in self.all_files_in_debug_info:
+                self.all_files_in_debug_info[source_file] = _new_file_entry(
+                    source_file)
+        if ' - Operand' in line:
+
+            # Decipher type
+            current_args = current_function.get('args', [])
+            if "Name: {" not in line:
+                l1 = line.replace("Operand Type:",
+                                  "").replace("Type: ", "").replace("-", "")
+                pointer_count = 0
+                const_count = 0
+                for arg_type in l1.split(","):
+                    if "DW_TAG_pointer_type" in arg_type:
+                        pointer_count += 1
+                    if "DW_TAG_const_type" in arg_type:
+                        const_count += 1
+                base_type = l1.split(",")[-1].strip()
+                end_type = ""
+                if const_count > 0:
+                    end_type += "const "
+                end_type += base_type
+                if pointer_count > 0:
+                    end_type += " "
+                    end_type += "*" * pointer_count
+
+                current_args.append(end_type)
+            elif "Name: " in line:
+                current_args.append(line.split("{")[-1].split("}")[0].strip())
+            else:
+                current_args.append(line)
+            current_function['args'] = current_args
+
+
+def _feed_lines(content, collector):
     for line in content.split("\n"):
-        if function_identifier in line:
-            read_functions = True
-        if global_variable_identifier in line:
-            if current_function is not None:
-                # Adjust args such that arg0 is set to the return type
-                current_args = current_function.get('args', [])
-                if len(current_args) > 0:
-                    return_type = current_args[0]
-                    current_args = current_args[1:]
-                    current_function['args'] = current_args
-                    current_function['return_type'] = return_type
+        collector.feed(line)
 
-                try:
-                    hashkey = current_function['source'][
-                        'source_file'] + current_function['source'][
-                            'source_line']
-                except KeyError:
-                    hashkey = None
-
-                if hashkey is not None:
-                    # print("Actually adding 1: %s"%(current_function['name']))
-                    all_functions_in_debug[hashkey] = current_function
-                else:
-                    # Something went wrong, abandon.
-                    current_function = None
-            read_functions = False
-
-        if read_functions:
-            if line.startswith("Subprogram: "):
-                # print("Subprogram line: %s"%(line))
-                if current_function is not None:
-                    # Adjust args such that arg0 is set to the return type
-                    current_args = current_function.get('args', [])
-                    if len(current_args) > 0:
-                        return_type = current_args[0]
-                        current_args = current_args[1:]
-                        current_function['args'] = current_args
-                        current_function['return_type'] = return_type
-                    try:
-                        hashkey = current_function['source'][
-                            'source_file'] + current_function['source'][
-                                'source_line']
-                    except KeyError:
-                        hashkey = None
-
-                    if hashkey is not None:
-                        # print(
-                        #  "Actually adding 2: %s :: to %s"%(current_function['name'], hashkey)
-                        # )
-                        all_functions_in_debug[hashkey] = current_function
-                    else:
-                        # Something went wrong, abandon.
-                        current_function = None
-                current_function = dict()
-                function_name = " ".join(line.split(" ")[1:])
-                # print("Adding function: %s"%(function_name))
-                current_function['name'] = function_name
-            if ' from ' in line and ":" in line and "- Operand" not in line and "Elem " not in line:
-                location = line.split(" from ")[-1]
-                source_file = location.split(":")[0].strip()
-                try:
-                    source_line = line.split(":")[-1].strip()
-                    if len(source_line.split(" ")) > 0:
-                        source_line = source_line.split(" ")[0]
-                except IndexError:
-                    source_line = "-1"
-                current_function['source'] = {
-                    'source_file': source_file,
-                    'source_line': source_line,
-                }
-                # Add the file to all files in project
-                if source_file not in all_files_in_debug_info:
-                    all_files_in_debug_info[source_file] = {
-                        'source_file': source_file,
-                        'language': 'N/A'
-                    }
-            if ' - Operand' in line:
-
-                # Decipher type
-                current_args = current_function.get('args', [])
-                if "Name: {" not in line:
-                    l1 = line.replace("Operand Type:",
-                                      "").replace("Type: ",
-                                                  "").replace("-", "")
-                    pointer_count = 0
-                    const_count = 0
-                    for arg_type in l1.split(","):
-                        if "DW_TAG_pointer_type" in arg_type:
-                            pointer_count += 1
-                        if "DW_TAG_const_type" in arg_type:
-                            const_count += 1
-                    base_type = l1.split(",")[-1].strip()
-                    end_type = ""
-                    if const_count > 0:
-                        end_type += "const "
-                    end_type += base_type
-                    if pointer_count > 0:
-                        end_type += " "
-                        end_type += "*" * pointer_count
-
-                    current_args.append(end_type)
-                elif "Name: " in line:
-                    current_args.append(
-                        line.split("{")[-1].split("}")[0].strip())
-                else:
-                    current_args.append(line)
-                current_function['args'] = current_args
 
+def extract_all_compile_units(content, all_files_in_debug_info):
+    _feed_lines(content, _CompileUnitCollector(all_files_in_debug_info))
 
-def load_debug_report(debug_files):
-    all_files_in_debug_info = dict()
+
+def extract_global_variables(content, global_variables, source_files):
+    _feed_lines(content,
+                _GlobalVariableCollector(global_variables, source_files))
+
+
+def extract_types(content, all_types, all_files_in_debug_info):
+    _feed_lines(content, _TypeCollector(all_types, all_files_in_debug_info))
+
+
+def extract_all_functions_in_debug_info(content, all_functions_in_debug,
+                                        all_files_in_debug_info):
+    logger.info("Extracting functions")
+    _feed_lines(
+        content,
+        _FunctionCollector(all_functions_in_debug, all_files_in_debug_info))
+
+
+def parse_debug_file(debug_file):
+    """Parses a .debug_info file in a single pass over its lines, feeding
+    the compile unit, function, global variable and type collectors at the
+    same time.
+
+    Returns the functions, global variables and types of the file, and the
+    source files found by each of the collectors, in the order the
+    collectors would have found them if run one after the other.
+    """
+    compile_unit_files = dict()
+    function_files = dict()
+    global_variable_files = dict()
+    type_files = dict()
     all_functions_in_debug = dict()
     all_global_variables = dict()
     all_types = dict()
+    feeds = [
+        collector.feed for collector in
+        (_CompileUnitCollector(compile_unit_files),
+         _FunctionCollector(all_functions_in_debug, function_files),
+         _GlobalVariableCollector(all_global_variables, global_variable_files),
+         _TypeCollector(all_types, type_files))
+    ]
+
+    logger.info("Extracting debug information from %s", debug_file)
+    with open(debug_file, 'r') as debug_f:
+        for line in debug_f:
+            if line.endswith("\n"):
+                line = line[:-1]
+            for feed in feeds:
+                feed(line)
+
+    return {
+        'files': [
+            compile_unit_files, function_files, global_variable_files,
+            type_files
+        ],
+        'functions':
+        all_functions_in_debug,
+        'global_variables':
+        all_global_variables,
+        'types':
+        all_types,
+    }
+
+
+def _get_worker_count(jobs):
+    # Place this import here because it makes it easier to run this module
+    # as a main module. Debug information only comes from C/C++ targets.
+    from fuzz_introspector import data_loader
+    return data_loader.get_worker_count('c-cpp', jobs)
+
 
-    # Extract all of the details
-    for debug_file in debug_files:
-        with open(debug_file, 'r') as debug_f:
-            content = debug_f.read()
+def _parse_debug_files(debug_files, parallelise, jobs=None):
+    """Parses the debug files, in a process pool if there are several of
+    them and we are not in a worker process already."""
+    max_workers = min(len(debug_files), _get_worker_count(jobs))
+    if (not parallelise or max_workers <= 1
+            or multiprocessing.parent_process() is not None):
+        return [parse_debug_file(debug_file) for debug_file in debug_files]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers) as executor:
+        return list(executor.map(parse_debug_file, debug_files))
 
-            extract_all_compile_units(content, all_files_in_debug_info)
-            extract_all_functions_in_debug_info(content,
-                                                all_functions_in_debug,
-                                                all_files_in_debug_info)
-            extract_global_variables(content, all_global_variables,
-                                     all_files_in_debug_info)
-            extract_types(content, all_types, all_files_in_debug_info)
+
+def load_debug_report(debug_files, parallelise=True, jobs=None):
+    all_files_in_debug_info = dict()
+    all_functions_in_debug = dict()
+    all_global_variables = dict()
+    all_types = dict()
+
+    # Merge the details of each file in order. Compile units always set the
+    # language of a file, the other collectors only add unknown files.
+    for file_report in _parse_debug_files(debug_files, parallelise, jobs):
+        compile_unit_files, *other_files = file_report['files']
+        all_files_in_debug_info.update(compile_unit_files)
+        for source_files in other_files:
+            for source_file, file_dict in source_files.items():
+                if source_file not in all_files_in_debug_info:
+                    all_files_in_debug_info[source_file] = file_dict
+        all_functions_in_debug.update(file_report['functions'])
+        all_global_variables.update(file_report['global_variables'])
+        all_types.update(file_report['types'])
 
     report_dict = {
         'all_files_in_project': list(all_files_in_debug_info.values()),
@@ -331,7 +426,139 @@ def dump_debug_report(report_dict, out_dir):
         debug_dump.write(json.dumps(report_dict))
 
 
-def load_debug_all_yaml_files(debug_all_types_files):
+def _debug_yaml_cache_path(yaml_file):
+    """Path of the sidecar cache for a debug yaml file. The file is hidden so
+    it does not match any of the data file patterns."""
+    dirname, basename = os.path.split(yaml_file)
+    return os.path.join(dirname, f'.{basename}{DEBUG_YAML_CACHE_SUFFIX}')
+
+
+def _debug_yaml_cache_enabled():
+    return os.environ.get('FI_DISABLE_DEBUG_YAML_CACHE', '') == ''
+
+
+def _compact_debug_records(elems):
+    """Converts the records of a debug yaml file to rows of values. The keys
+    of the first record are used as the fields of all rows, records with
+    other keys are kept as they are. Equal strings are shared, which keeps
+    the rows small in memory and in the pickled cache."""
+    if not elems:
+        return (), []
+    fields = tuple(elems[0])
+    strings = dict()
+    rows = []
+    for elem in elems:
+        if tuple(elem) != fields:
+            rows.append(elem)
+            continue
+        row = []
+        for value in elem.values():
+            if isinstance(value, str):
+                value = strings.setdefault(value, value)
+            row.append(value)
+        rows.append(tuple(row))
+    return fields, rows
+
+
+def _debug_record(fields, row):
+    if isinstance(row, dict):
+        return row
+    return dict(zip(fields, row))
+
+
+def _read_debug_yaml_cache(cache_file, digest):
+    """Reads a sidecar cache, returns None if it is missing, stale or
+    corrupt."""
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        logger.info('Ignoring corrupt debug yaml cache %s: %s', cache_file,
+                    str(e))
+        return None
+    if (not isinstance(cached, dict)
+            or cached.get('version') != DEBUG_YAML_CACHE_VERSION
+            or cached.get('digest') != digest):
+        logger.info('Ignoring stale debug yaml cache %s', cache_file)
+        return None
+    return cached['fields'], cached['rows']
+
+
+def _write_debug_yaml_cache(cache_file, digest, fields, rows):
+    """Writes a sidecar cache. Failures are not fatal, e.g. if the data
+    folder is read-only."""
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                {
+                    'version': DEBUG_YAML_CACHE_VERSION,
+                    'digest': digest,
+                    'fields': fields,
+                    'rows': rows,
+                },
+                f,
+                protocol=5)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.info('Could not write debug yaml cache %s: %s', cache_file,
+                    str(e))
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def read_debug_yaml_file(yaml_file):
+    """Reads a debug_all_types or debug_all_functions file as (fields, rows),
+    see _compact_debug_records. A sidecar cache keyed by the hash of the yaml
+    content is used when available. It is only written when the analysis is
+    allowed to dump files, and can be disabled with the
+    FI_DISABLE_DEBUG_YAML_CACHE environment variable."""
+    use_cache = _debug_yaml_cache_enabled()
+    if use_cache:
+        # Place this import here because it makes it easier to run this
+        # module as a main module.
+        from fuzz_introspector import constants
+        from fuzz_introspector import utils
+    cache_file = _debug_yaml_cache_path(yaml_file)
+    digest = ''
+    if use_cache and os.path.isfile(cache_file):
+        digest = utils.file_sha256(yaml_file)
+        cached = _read_debug_yaml_cache(cache_file, digest)
+        if cached is not None:
+            logger.info('Loaded %s from debug yaml cache', yaml_file)
+            return cached
+
+    with open(yaml_file, 'r') as yaml_f:
+        elems = yaml.load(yaml_f, Loader=_SafeLoader)
+    fields, rows = _compact_debug_records(elems)
+    del elems
+
+    if use_cache and constants.should_dump_files:
+        digest = digest or utils.file_sha256(yaml_file)
+        _write_debug_yaml_cache(cache_file, digest, fields, rows)
+    return fields, rows
+
+
+def _read_debug_yaml_files(debug_yaml_files, parallelise, jobs=None):
+    """Reads the debug yaml files, in a process pool if there are several of
+    them and we are not in a worker process already."""
+    max_workers = min(len(debug_yaml_files),
+                      _get_worker_count(jobs) if parallelise else 1)
+    if (not parallelise or max_workers <= 1
+            or multiprocessing.parent_process() is not None):
+        return [read_debug_yaml_file(f) for f in debug_yaml_files]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers) as executor:
+        return list(executor.map(read_debug_yaml_file, debug_yaml_files))
+
+
+def load_debug_all_yaml_files(debug_all_types_files,
+                              parallelise=True,
+                              jobs=None):
     elem_list = []
     try:
         yaml.SafeLoader = yaml.CSafeLoader  # type: ignore[assignment, misc]
@@ -339,13 +566,123 @@ def load_debug_all_yaml_files(debug_all_types_files):
     except Exception:
         logger.info("Could not set the CSafeLoader as base loader")
 
-    for filename in debug_all_types_files:
-        with open(filename, 'r') as yaml_f:
-            file_list = yaml.safe_load(yaml_f.read())
-            elem_list += file_list
+    for fields, rows in _read_debug_yaml_files(debug_all_types_files,
+                                               parallelise, jobs):
+        elem_list += [_debug_record(fields, row) for row in rows]
     return elem_list
 
 
+class DebugTypeTable(collections.abc.Mapping):
+    """Debug types of a set of debug_all_types files, indexed by address.
+
+    The table behaves as a dict from the integer address of each type to its
+    record: when several records have the same address the last one wins,
+    and the addresses are iterated in the order they first appear. The
+    records are kept as the compact rows of read_debug_yaml_file and are
+    only converted to dicts when accessed, and the addresses are held in a
+    sorted numpy array.
+    """
+
+    def __init__(self, debug_yaml_files, parallelise=True, jobs=None):
+        self._fields = []
+        self._rows = []
+        row_files = []
+        addrs = []
+        for file_idx, (fields, rows) in enumerate(
+                _read_debug_yaml_files(debug_yaml_files, parallelise, jobs)):
+            self._fields.append(fields)
+            addr_idx = fields.index('addr') if 'addr' in fields else -1
+            for row in rows:
+                if isinstance(row, dict) or addr_idx < 0:
+                    addrs.append(int(_debug_record(fields, row)['addr']))
+                else:
+                    addrs.append(int(row[addr_idx]))
+                self._rows.append(row)
+            row_files.extend([file_idx] * len(rows))
+        self._row_files = row_files
+
+        # Group the records by address. The sort is stable, so the last
+        # record of each group is the last one in file order.
+        addr_array = np.array(addrs, dtype=np.uint64)
+        order = np.argsort(addr_array, kind='stable')
+        sorted_addrs = addr_array[order]
+        new_addr = sorted_addrs[1:] != sorted_addrs[:-1]
+        first = np.flatnonzero(np.concatenate(([True], new_addr)))
+        last = np.flatnonzero(np.concatenate((new_addr, [True])))
+        if len(sorted_addrs) == 0:
+            first = last = first[:0]
+        self._addrs = sorted_addrs[last]
+        self._addr_rows = order[last]
+        self._key_order = np.argsort(order[first], kind='stable')
+
+    def _record(self, row_idx):
+        return _debug_record(self._fields[self._row_files[row_idx]],
+                             self._rows[row_idx])
+
+    def _find(self, addr):
+        try:
+            addr = int(addr)
+        except (TypeError, ValueError):
+            return -1
+        if addr < 0 or addr >= 1 << 64:
+            return -1
+        key = np.uint64(addr)
+        idx = int(np.searchsorted(self._addrs, key))
+        if idx == len(self._addrs) or self._addrs[idx] != key:
+            return -1
+        return idx
+
+    def __getitem__(self, addr):
+        idx = self._find(addr)
+        if idx < 0:
+            raise KeyError(addr)
+        return self._record(int(self._addr_rows[idx]))
+
+    def get(self, addr, default=None):
+        """Returns the record of the type at `addr`."""
+        idx = self._find(addr)
+        if idx < 0:
+            return default
+        return self._record(int(self._addr_rows[idx]))
+
+    def __contains__(self, addr):
+        return self._find(addr) >= 0
+
+    def __len__(self):
+        return len(self._addrs)
+
+    def __iter__(self):
+        yield from self._addrs[self._key_order].tolist()
+
+    def items(self):
+        """Yields each address with its record, in the order of iteration."""
+        addrs = self._addrs[self._key_order].tolist()
+        addr_rows = self._addr_rows[self._key_order].tolist()
+        for addr, row_idx in zip(addrs, addr_rows):
+            yield addr, self._record(row_idx)
+
+    def records(self):
+        """Yields all records, in file order."""
+        for row_idx in range(len(self._rows)):
+            yield self._record(row_idx)
+
+    def rename_types(self, old_name, new_name):
+        """Renames all types named `old_name`."""
+        name_indexes = [
+            fields.index('name') if 'name' in fields else -1
+            for fields in self._fields
+        ]
+        for row_idx, row in enumerate(self._rows):
+            if isinstance(row, dict):
+                if row.get('name') == old_name:
+                    row['name'] = new_name
+                continue
+            name_idx = name_indexes[self._row_files[row_idx]]
+            if name_idx >= 0 and row[name_idx] == old_name:
+                self._rows[row_idx] = (row[:name_idx] + (new_name, ) +
+                                       row[name_idx + 1:])
+
+
 def extract_func_sig_friendly_type_tags(target_type, debug_type_dictionary):
     """Recursively iterates atomic type elements to construct a friendly
     string representing the type."""
@@ -390,20 +727,108 @@ def extract_func_sig_friendly_type_tags(target_type, debug_type_dictionary):
     return tags
 
 
-def extract_debugged_function_signature(dfunc, debug_type_dictionary):
+class FriendlyTypeResolver:
+    """Memoized version of extract_func_sig_friendly_type_tags.
+
+    The tags of an address are its own tags followed by the tags of its base
+    type, so each address is resolved once and the chains of the addresses
+    sharing a base type reuse its result. The tags are returned as interned
+    tuples. Addresses on a cycle of base types are resolved together, as the
+    point where the loop is detected depends on where the walk starts.
+    """
+
+    def __init__(self, debug_type_dictionary):
+        self.debug_type_dictionary = debug_type_dictionary
+        self._tags = {0: ('void', )}
+        self._interned = dict()
+
+    def _intern(self, tags):
+        return self._interned.setdefault(tags, tags)
+
+    def _own_tags(self, debug_type):
+        if 'array' in debug_type['tag']:
+            return (debug_type['tag'],
+                    'ARRAY-SIZE: %d' % (debug_type['const_size']))
+        return (debug_type['tag'], )
+
+    def _final_tag(self, debug_type):
+        """Returns the tag ending the chain at this type, if any."""
+        name = debug_type.get("name", "")
+        if name != "":
+            return name
+        base_type_string = debug_type.get("base_type_string", "")
+        if base_type_string != "":
+            return base_type_string
+        return None
+
+    def tags(self, addr):
+        """Returns the friendly tags of the type at `addr`."""
+        addr = int(addr)
+        tags = self._tags.get(addr)
+        if tags is not None:
+            return tags
+
+        # Walk the base types until a resolved address, the end of the chain
+        # or a cycle, then resolve the walked addresses backwards.
+        path = []
+        path_types = []
+        path_index = dict()
+        while True:
+            tags = self._tags.get(addr)
+            if tags is not None:
+                break
+            if addr in path_index:
+                tags = self._resolve_cycle(path[path_index[addr]:],
+                                           path_types[path_index[addr]:])
+                del path[path_index[addr]:]
+                del path_types[path_index[addr]:]
+                break
+            debug_type = self.debug_type_dictionary.get(addr, None)
+            if debug_type is None:
+                tags = self._intern(("N/A", ))
+                self._tags[addr] = tags
+                break
+            final_tag = self._final_tag(debug_type)
+            if final_tag is not None:
+                tags = self._intern(self._own_tags(debug_type) + (final_tag, ))
+                self._tags[addr] = tags
+                break
+            path_index[addr] = len(path)
+            path.append(addr)
+            path_types.append(debug_type)
+            addr = int(debug_type.get('base_type_addr', ''))
+
+        for path_addr, debug_type in zip(reversed(path), reversed(path_types)):
+            tags = self._intern(self._own_tags(debug_type) + tags)
+            self._tags[path_addr] = tags
+        return tags
+
+    def _resolve_cycle(self, cycle, cycle_types):
+        """Resolves the addresses of a cycle, returns the tags of the first
+        one."""
+        own_tags = [self._own_tags(debug_type) for debug_type in cycle_types]
+        for idx, addr in enumerate(cycle):
+            tags = sum(own_tags[idx:] + own_tags[:idx],
+                       ()) + ("Infinite loop", )
+            self._tags[addr] = self._intern(tags)
+        return self._tags[cycle[0]]
+
+
+def extract_debugged_function_signature(dfunc,
+                                        debug_type_dictionary,
+                                        resolver=None):
     """Extract the raw types used by a function."""
+    if resolver is None:
+        resolver = FriendlyTypeResolver(debug_type_dictionary)
     try:
-        return_type = extract_func_sig_friendly_type_tags(
-            dfunc['type_arguments'][0], debug_type_dictionary)
+        return_type = list(resolver.tags(dfunc['type_arguments'][0]))
     except IndexError:
         return_type = 'N/A'
     params = []
 
     if len(dfunc['type_arguments']) > 1:
         for i in range(1, len(dfunc['type_arguments'])):
-            params.append(
-                extract_func_sig_friendly_type_tags(dfunc['type_arguments'][i],
-                                                    debug_type_dictionary))
+            params.append(list(resolver.tags(dfunc['type_arguments'][i])))
 
     source_file = dfunc['file_location'].split(":")[0]
     try:
@@ -463,15 +888,16 @@ def is_enumeration(param_list):
     return False
 
 
-def create_friendly_debug_types(debug_type_dictionary,
-                                out_dir,
-                                dump_files=True):
-    """Create an address-indexed json dictionary. The goal is to use this for
-    fast iteration over types using e.g. recursive lookups."""
-    friendly_name_sig = dict()
-    logging.info("Have to create for %d addresses" %
-                 (len(debug_type_dictionary)))
-    idx = 0
+def _iter_friendly_debug_types(debug_type_dictionary, resolver):
+    """Yields the address and friendly information of each debug type."""
+    string_types = dict()
+
+    def string_type(friendly_type):
+        type_str = string_types.get(friendly_type)
+        if type_str is None:
+            type_str = convert_param_list_to_str_v2(friendly_type)
+            string_types[friendly_type] = type_str
+        return type_str
 
     addr_members = dict()
     for elem_addr, elem_val in debug_type_dictionary.items():
@@ -483,19 +909,17 @@ def create_friendly_debug_types(debug_type_dictionary,
                 'elem_name':
                 elem_val['name'],
                 'elem_friendly_type':
-                convert_param_list_to_str_v2(
-                    extract_func_sig_friendly_type_tags(
-                        elem_val['base_type_addr'], debug_type_dictionary))
+                string_type(resolver.tags(elem_val['base_type_addr']))
             }
             current_members.append(elem_dict)
             addr_members[int(elem_val['scope'])] = current_members
 
-    for addr in debug_type_dictionary:
+    idx = 0
+    for addr, debug_type in debug_type_dictionary.items():
         idx += 1
         if idx % 2500 == 0:
             logging.info("Idx: %d" % (idx))
-        friendly_type = extract_func_sig_friendly_type_tags(
-            addr, debug_type_dictionary)
+        friendly_type = resolver.tags(addr)
 
         # is this a struct?
         # Collect elements
@@ -503,23 +927,55 @@ def create_friendly_debug_types(debug_type_dictionary,
         if is_struct(friendly_type):
             structure_elems = addr_members.get(int(addr), [])
 
-        friendly_name_sig[addr] = {
-            'raw_debug_info': debug_type_dictionary[addr],
+        yield addr, {
+            'raw_debug_info': debug_type,
             'friendly-info': {
                 'raw-types': friendly_type,
-                'string_type': convert_param_list_to_str_v2(friendly_type),
+                'string_type': string_type(friendly_type),
                 'is-struct': is_struct(friendly_type),
                 'struct-elems': structure_elems,
                 'is-enum': is_enumeration(friendly_type),
-                'enum-elems':
-                debug_type_dictionary[addr].get('enum_elems', [])
+                'enum-elems': debug_type.get('enum_elems', [])
             }
         }
 
-    if dump_files:
-        with open(os.path.join(out_dir, "all-friendly-debug-types.json"),
-                  "w") as f:
-            json.dump(friendly_name_sig, f)
+
+def create_friendly_debug_types(debug_type_dictionary,
+                                out_dir,
+                                dump_files=True,
+                                resolver=None):
+    """Create an address-indexed json dictionary. The goal is to use this for
+    fast iteration over types using e.g. recursive lookups. The dictionary
+    is written one type at a time, in the same format as json.dump."""
+    logging.info("Have to create for %d addresses" %
+                 (len(debug_type_dictionary)))
+    if not dump_files:
+        return
+    if resolver is None:
+        resolver = FriendlyTypeResolver(debug_type_dictionary)
+
+    with open(os.path.join(out_dir, "all-friendly-debug-types.json"),
+              "w") as f:
+        separator = '{'
+        for addr, friendly_info in _iter_friendly_debug_types(
+                debug_type_dictionary, resolver):
+            f.write(separator)
+            f.write(json.dumps(str(addr)))
+            f.write(': ')
+            f.write(json.dumps(friendly_info))
+            separator = ', '
+        f.write('{}' if separator == '{' else '}')
+
+
+def index_debug_types(all_debug_types):
+    """Returns the debug types indexed by address, either a DebugTypeTable
+    or a list of debug type dicts."""
+    if isinstance(all_debug_types, DebugTypeTable):
+        return all_debug_types
+    debug_type_dictionary = dict()
+    for debug_type in all_debug_types:
+        debug_type_dictionary[int(debug_type['addr'])] = debug_type
+    return debug_type_dictionary
 
 
 def correlate_debugged_function_to_debug_types(all_debug_types,
@@ -532,21 +988,21 @@ def correlate_debugged_function_to_debug_types(all_debug_types,
     # Index debug types by address. We need to do a lot of look ups when
     # refining data types where the address is the key, so a fast
     # look-up mechanism is useful here.
-    debug_type_dictionary = dict()
-    for debug_type in all_debug_types:
-        debug_type_dictionary[int(debug_type['addr'])] = debug_type
+    debug_type_dictionary = index_debug_types(all_debug_types)
 
     # Create json file with addresses as indexes for type information.
     # This can be used to lookup types fast.
+    resolver = FriendlyTypeResolver(debug_type_dictionary)
     logger.info("Creating dictionary")
     create_friendly_debug_types(debug_type_dictionary,
                                 out_dir,
-                                dump_files=dump_files)
+                                dump_files=dump_files,
+                                resolver=resolver)
     logger.info("Finished creating dictionary")
 
     for dfunc in all_debug_functions:
         func_signature_elems, source_location = extract_debugged_function_signature(
-            dfunc, debug_type_dictionary)
+            dfunc, debug_type_dictionary, resolver)
 
         dfunc['func_signature_elems'] = func_signature_elems
         dfunc['source'] = source_location
@@ -675,9 +1131,7 @@ def create_syzkaller_description_for_type(addr, debug_type_dictionary):
 
 
 def syzkaller_get_struct_type_elems(typename, all_debug_types):
-    debug_type_dictionary = dict()
-    for debug_type in all_debug_types:
-        debug_type_dictionary[int(debug_type['addr'])] = debug_type
+    debug_type_dictionary = index_debug_types(all_debug_types)
 
     for debug_addr, debug_type in debug_type_dictionary.items():
         if debug_type['name'] == typename:
@@ -695,9 +1149,7 @@ def syzkaller_get_type_implementation(typename, all_debug_types):
     # Index debug types by address. We need to do a lot of look ups when
     # refining data types where the address is the key, so a fast
     # look-up mechanism is useful here.
-    debug_type_dictionary = dict()
-    for debug_type in all_debug_types:
-        debug_type_dictionary[int(debug_type['addr'])] = debug_type
+    debug_type_dictionary = index_debug_types(all_debug_types)
 
     for debug_addr, debug_type in debug_type_dictionary.items():
         if debug_type['name'] == typename:
@@ -715,5 +1167,9 @@ if __name__ in "__main__":
     type_debug_files = [sys.argv[1]]
     typename = sys.argv[2]
 
-    all_types = load_debug_all_yaml_files(type_debug_files)
+    # The yaml cache and the process pool need the fuzz_introspector
+    # package, which is not importable when running this module as a main
+    # module.
+    os.environ['FI_DISABLE_DEBUG_YAML_CACHE'] = '1'
+    all_types = load_debug_all_yaml_files(type_debug_files, parallelise=False)
     syzkaller_get_type_implementation(typename, all_types)
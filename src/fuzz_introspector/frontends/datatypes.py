@@ -17,23 +17,49 @@
 
 # pylint: disable=unnecessary-pass, unused-argument
 
-from typing import Any, Optional, Generic, TypeVar
+from typing import Any, Optional, Generic, Iterable, Iterator, TextIO, TypeVar
 
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Node, Parser
 import tree_sitter_cpp
 import tree_sitter_go
 import tree_sitter_java
 import tree_sitter_rust
 
+import bisect
+import concurrent.futures
 import copy
+import functools
+import hashlib
+import inspect
+import io
+import itertools
 import json
 import logging
+import multiprocessing
+import os
+import pickle
 import yaml
 
+from fuzz_introspector import constants
+
 logger = logging.getLogger(name=__name__)
 
+FRONTEND_CACHE_VERSION = 1
+FRONTEND_CACHE_SUFFIX = '.srccache'
+
 T = TypeVar('T', bound='SourceCodeFile')
 
+_SafeDumper: Any = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+class _HeaderDumper(_SafeDumper):
+    """Safe dumper for the report header, which never emits anchors. The
+    function table is dumped separately and appended to the header, so
+    anchors of the two could otherwise collide."""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
 
 class SourceCodeFile():
     """Class for holding file-specific information."""
@@ -61,6 +87,8 @@ class SourceCodeFile():
         self.parser = Parser(self.tree_sitter_lang)
         self.full_type_defs: list[dict[str, Any]] = []
         self.macro_blocks: list[dict[str, Any]] = []
+        # Content and root of the fragments parsed in separate trees
+        self.fragments: list[tuple[bytes, Node]] = []
 
         if source_content:
             self.source_content = source_content
@@ -79,6 +107,13 @@ class SourceCodeFile():
         the root node."""
         self.root = self.parser.parse(self.source_content).root_node
 
+    def parse_fragment(self, content: bytes) -> Node:
+        """Parses a fragment of the source, e.g. the tokens of a macro, in
+        a separate tree and returns its root node."""
+        root = self.parser.parse(content).root_node
+        self.fragments.append((content, root))
+        return root
+
     def language_specific_process(self):
         """Dummy function to perform some specific processes in subclasses."""
         pass
@@ -92,6 +127,385 @@ class SourceCodeFile():
         return False
 
 
+def get_worker_count(jobs: Optional[int] = None) -> int:
+    """Number of worker processes to use for processing source files. All
+    cores are used if jobs is not given."""
+    if jobs is not None and jobs > 0:
+        return jobs
+    return os.cpu_count() or 1
+
+
+def load_source_files(
+    source_cls: type[T],
+    language: str,
+    source_files: list[str],
+    entrypoint: str = '',
+    jobs: Optional[int] = 1,
+    skip_errors: tuple[type[Exception], ...] = ()
+) -> list[T]:
+    """Creates the source code objects of the given files, in the order of
+    the files. With more than one job the files are parsed and processed in
+    a pool of processes, which send back the processed objects without
+    their trees. Files failing with one of `skip_errors` are left out.
+
+    If FI_FRONTEND_CACHE_DIR is set, processed files are also stored in
+    that folder, keyed by their content and the frontend version, and only
+    files that changed since a previous run are processed again.
+    """
+    results: list[Optional[T]] = [None] * len(source_files)
+    to_process = list(range(len(source_files)))
+    cache_files: dict[int, str] = {}
+
+    cache_dir = _frontend_cache_dir()
+    if cache_dir:
+        to_process = []
+        fingerprint = _frontend_fingerprint(inspect.getfile(source_cls))
+        for idx, source_file in enumerate(source_files):
+            with open(source_file, 'rb') as f:
+                source_content = f.read()
+            cache_files[idx] = _frontend_cache_path(cache_dir, fingerprint,
+                                                    language, source_file,
+                                                    entrypoint, source_content)
+            cached = _read_frontend_cache(cache_files[idx])
+            if cached is None:
+                to_process.append(idx)
+            elif cached['summary'] is not None:
+                results[idx] = _load_source_file_summary(
+                    language, [source_content] + cached['fragments'],
+                    cached['summary'])
+        logger.info('Found %d of %d source files in the frontend cache',
+                    len(source_files) - len(to_process), len(source_files))
+
+    worker_count = min(get_worker_count(jobs), len(to_process))
+    if worker_count <= 1 or multiprocessing.parent_process() is not None:
+        for idx in to_process:
+            try:
+                source_code = source_cls(language, source_files[idx],
+                                         entrypoint)
+            except skip_errors:
+                source_code = None
+            if idx in cache_files:
+                summary = None
+                if source_code is not None:
+                    summary = _summarise_source_file(source_code)
+                _write_frontend_cache(cache_files[idx], summary)
+            results[idx] = source_code
+        return [result for result in results if result is not None]
+
+    logger.info('Processing %d source files with %d workers', len(to_process),
+                worker_count)
+    chunksize = max(1, len(to_process) // (worker_count * 8))
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=worker_count) as executor:
+        for idx, summary in zip(
+                to_process,
+                executor.map(_process_source_file,
+                             itertools.repeat(source_cls),
+                             itertools.repeat(language),
+                             [source_files[idx] for idx in to_process],
+                             itertools.repeat(entrypoint),
+                             itertools.repeat(skip_errors),
+                             chunksize=chunksize)):
+            if idx in cache_files:
+                _write_frontend_cache(cache_files[idx], summary)
+            if summary is not None:
+                results[idx] = _load_source_file_summary(language, *summary)
+    return [result for result in results if result is not None]
+
+
+def _process_source_file(
+    source_cls: type[T], language: str, source_file: str, entrypoint: str,
+    skip_errors: tuple[type[Exception], ...]
+) -> Optional[tuple[list[bytes], bytes]]:
+    """Worker of load_source_files. Returns the summary of the processed
+    source file, or None if the file is skipped."""
+    try:
+        source_code = source_cls(language, source_file, entrypoint)
+    except skip_errors:
+        return None
+    return _summarise_source_file(source_code)
+
+
+def _summarise_source_file(
+        source_code: SourceCodeFile) -> tuple[list[bytes], bytes]:
+    """Returns the content of the trees of a source code object, i.e. the
+    source content followed by the fragments, and the object pickled
+    without its trees."""
+    buf = io.BytesIO()
+    _SourceFilePickler(buf, source_code).dump(source_code)
+    tree_contents = [source_code.source_content]
+    tree_contents.extend(content for content, _ in source_code.fragments)
+    return tree_contents, buf.getvalue()
+
+
+def _load_source_file_summary(language: str, tree_contents: list[bytes],
+                              summary: bytes) -> Any:
+    """Loads a source code object from its summary."""
+    return _SourceFileUnpickler(io.BytesIO(summary), language,
+                                tree_contents).load()
+
+
+def _frontend_cache_dir() -> str:
+    """Directory holding processed source files across runs. The cache is
+    only used if FI_FRONTEND_CACHE_DIR is set."""
+    return os.environ.get('FI_FRONTEND_CACHE_DIR', '')
+
+
+@functools.lru_cache(maxsize=None)
+def _frontend_fingerprint(frontend_file: str) -> str:
+    """Version of the frontend in `frontend_file`, which changes with the
+    cache format and the code of the frontend."""
+    digest = hashlib.sha256(str(FRONTEND_CACHE_VERSION).encode())
+    for module_file in sorted({__file__, frontend_file}):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _frontend_cache_path(cache_dir: str, fingerprint: str, language: str,
+                         source_file: str, entrypoint: str,
+                         source_content: bytes) -> str:
+    digest = hashlib.sha256()
+    for key in [fingerprint, language, source_file, entrypoint]:
+        digest.update(key.encode())
+        digest.update(b'\0')
+    digest.update(source_content)
+    return os.path.join(cache_dir,
+                        f'{digest.hexdigest()}{FRONTEND_CACHE_SUFFIX}')
+
+
+def _read_frontend_cache(cache_file: str) -> Optional[dict[str, Any]]:
+    """Reads a cached source file, returns None if the cache file is
+    missing, stale or corrupt. The summary of a skipped file is None."""
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        logger.info('Ignoring corrupt frontend cache %s: %s', cache_file,
+                    str(e))
+        return None
+    if (not isinstance(cached, dict)
+            or cached.get('version') != FRONTEND_CACHE_VERSION):
+        logger.info('Ignoring stale frontend cache %s', cache_file)
+        return None
+    return cached
+
+
+def _write_frontend_cache(
+        cache_file: str, summary: Optional[tuple[list[bytes], bytes]]) -> None:
+    """Writes the summary of a source file, without its content which is
+    part of the cache key. Failures are not fatal."""
+    cached: dict[str, Any] = {
+        'version': FRONTEND_CACHE_VERSION,
+        'fragments': [],
+        'summary': None,
+    }
+    if summary is not None:
+        cached['fragments'] = summary[0][1:]
+        cached['summary'] = summary[1]
+
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cached, f, protocol=5)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.info('Could not write frontend cache %s: %s', cache_file,
+                    str(e))
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+class _SourceFilePickler(pickle.Pickler):
+    """Pickles a source code object without its tree-sitter objects. Nodes
+    are replaced by the index of their tree and their path of child indexes
+    from the root, which is stable for a given content."""
+
+    def __init__(self, file: io.BytesIO, source_code: SourceCodeFile):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.source_code = source_code
+        self.node_paths: dict[Node, tuple[int, ...]] = {
+            source_code.root: (0, )
+        }
+        for tree_idx, (_, root) in enumerate(source_code.fragments, 1):
+            self.node_paths[root] = (tree_idx, )
+        self.child_indexes: dict[Node, dict[Node, int]] = {}
+
+    def persistent_id(self, obj: Any) -> Any:
+        if isinstance(obj, Node):
+            return ('node', self._node_path(obj))
+        if isinstance(obj, Parser):
+            return ('parser', )
+        if isinstance(obj, Language):
+            return ('language', )
+        if obj is self.source_code.source_content:
+            return ('content', )
+        return None
+
+    def _node_path(self, node: Node) -> tuple[int, ...]:
+        path = self.node_paths.get(node)
+        if path is not None:
+            return path
+
+        # Walk up to the closest node with a known path.
+        ancestors = []
+        while path is None:
+            ancestors.append(node)
+            parent = node.parent
+            if parent is None:
+                raise pickle.PicklingError('Node outside of the tree of '
+                                           f'{self.source_code.source_file}')
+            node = parent
+            path = self.node_paths.get(node)
+
+        for ancestor in reversed(ancestors):
+            child_indexes = self.child_indexes.get(node)
+            if child_indexes is None:
+                child_indexes = {
+                    child: idx
+                    for idx, child in enumerate(node.children)
+                }
+                self.child_indexes[node] = child_indexes
+            path = path + (child_indexes[ancestor], )
+            self.node_paths[ancestor] = path
+            node = ancestor
+        return path
+
+
+class _SourceFileUnpickler(pickle.Unpickler):
+    """Loads a source code object pickled by _SourceFilePickler, resolving
+    its nodes in the trees parsed again from the source content and the
+    fragments."""
+
+    def __init__(self, file: io.BytesIO, language: str,
+                 tree_contents: list[bytes]):
+        super().__init__(file)
+        self.tree_sitter_lang = SourceCodeFile.LANGUAGE.get(
+            language, SourceCodeFile.LANGUAGE['cpp'])
+        self.parser = Parser(self.tree_sitter_lang)
+        self.source_content = tree_contents[0]
+        self.nodes: dict[tuple[int, ...], Node] = {}
+        for tree_idx, content in enumerate(tree_contents):
+            self.nodes[(tree_idx, )] = self.parser.parse(content).root_node
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid[0] == 'node':
+            return self._resolve_node(pid[1])
+        if pid[0] == 'parser':
+            return self.parser
+        if pid[0] == 'language':
+            return self.tree_sitter_lang
+        if pid[0] == 'content':
+            return self.source_content
+        raise pickle.UnpicklingError(f'Unknown persistent id {pid}')
+
+    def _resolve_node(self, path: tuple[int, ...]) -> Node:
+        node = self.nodes.get(path)
+        if node is not None:
+            return node
+
+        depth = len(path)
+        while path[:depth] not in self.nodes:
+            depth -= 1
+        node = self.nodes[path[:depth]]
+        for idx in range(depth, len(path)):
+            child = node.child(path[idx])
+            if child is None:
+                raise pickle.UnpicklingError('Invalid node path')
+            node = child
+            self.nodes[path[:idx + 1]] = node
+        return node
+
+
+class CallgraphIndex():
+    """Index of the calls between the functions of a project, built once
+    from the `base_callsites` of the functions. The functions must have
+    their callsites extracted before the index is built."""
+
+    def __init__(self, functions: list[Any]):
+        self.functions = functions
+        self.function_count = len(functions)
+        # Function of each name, the last one wins as in a dict comprehension.
+        self.functions_by_name: dict[str, Any] = {}
+        # Functions calling each name, once per callsite.
+        self.callsite_callers: dict[str, list[Any]] = {}
+        # Positions in `functions` of the functions calling each name.
+        self.caller_positions: dict[str, list[int]] = {}
+        for position, func in enumerate(functions):
+            self.functions_by_name[func.name] = func
+            callees = set()
+            for callsite in func.base_callsites:
+                self.callsite_callers.setdefault(callsite[0], []).append(func)
+                if callsite[0] not in callees:
+                    callees.add(callsite[0])
+                    self.caller_positions.setdefault(callsite[0],
+                                                     []).append(position)
+
+        # Reversed names sorted, so all names with a given suffix are
+        # consecutive, along with the name order to find the first of them.
+        self._callee_suffixes = SuffixTable(list(self.caller_positions))
+        self._name_suffixes = SuffixTable(list(self.functions_by_name))
+
+    def get_callers(self, name: str) -> list[Any]:
+        """Functions calling `name`, once per callsite."""
+        return list(self.callsite_callers.get(name, []))
+
+    def count_callers(self, name: str) -> int:
+        """Number of functions calling `name`."""
+        return len(self.caller_positions.get(name, []))
+
+    def count_callers_by_suffix(self, suffix: str) -> int:
+        """Number of functions calling any name ending with `suffix`."""
+        callees = self._callee_suffixes.names_with_suffix(suffix)
+        if len(callees) == 1:
+            return self.count_callers(callees[0])
+        positions: set[int] = set()
+        for callee in callees:
+            positions.update(self.caller_positions[callee])
+        return len(positions)
+
+    def find_function_by_suffix(self, suffix: str) -> Optional[Any]:
+        """First function, in project order of the names, whose name ends
+        with `suffix`."""
+        names = self._name_suffixes.names_with_suffix(suffix)
+        if not names:
+            return None
+        return self.functions_by_name[names[0]]
+
+
+class SuffixTable():
+    """Finds the names that end with a given suffix."""
+
+    def __init__(self, names: list[str]):
+        reversed_names = sorted(
+            (name[::-1], order) for order, name in enumerate(names))
+        self.names = names
+        self.reversed_names = [name for name, _ in reversed_names]
+        self.orders = [order for _, order in reversed_names]
+
+    def names_with_suffix(self, suffix: str) -> list[str]:
+        """Names ending with `suffix`, in their original order."""
+        prefix = suffix[::-1]
+        start = bisect.bisect_left(self.reversed_names, prefix)
+        end = start
+        while (end < len(self.reversed_names)
+               and self.reversed_names[end].startswith(prefix)):
+            end += 1
+        return [self.names[order] for order in sorted(self.orders[start:end])]
+
+
+# A call to add to a calltree, as the source file the call is made from, the
+# source code of the callee if already known, the callee, the line of the
+# call and any language specific properties of the call.
+CalltreeCall = tuple[str, Optional[SourceCodeFile], Optional[str], int,
+                     Optional[dict[str, Any]]]
+
+
 class Project(Generic[T]):
     """Wrapper for doing analysis of a collection of source files."""
 
@@ -99,6 +513,28 @@ class Project(Generic[T]):
         self.report: dict[str, Any] = {}
         self.source_code_files = source_code_files
         self.all_functions: list[Any] = []
+        self.callgraph_index: Optional[CallgraphIndex] = None
+        self.function_table_yaml: Optional[tuple[Any, str, str]] = None
+
+    def build_callgraph_index(self,
+                              functions: Optional[list[Any]] = None
+                              ) -> CallgraphIndex:
+        """Builds the callgraph index of the given functions, or of
+        `all_functions` by default. Must be called again once callsites
+        have been extracted or changed."""
+        if functions is None:
+            functions = self.all_functions
+        self.callgraph_index = CallgraphIndex(functions)
+        return self.callgraph_index
+
+    def get_callgraph_index(self) -> CallgraphIndex:
+        """Gets the callgraph index of `all_functions`, building it if
+        needed."""
+        index = self.callgraph_index
+        if (index is None or index.functions is not self.all_functions
+                or index.function_count != len(self.all_functions)):
+            index = self.build_callgraph_index()
+        return index
 
     def generate_report(self,
                         entry_function: str = '',
@@ -161,8 +597,11 @@ class Project(Generic[T]):
         logger.info('Generating report')
         self.generate_report(entry_function, harness_name, harness_source)
         logger.info('Report generated')
-        new_report = copy.deepcopy(self.report)
-        new_report['Fuzzer filename'] = harness_source
+        report_header = {
+            key: value
+            for key, value in self.report.items() if key != 'All functions'
+        }
+        report_header['Fuzzer filename'] = harness_source
 
         logger.info('Dumping project-wide logic.')
         try:
@@ -173,10 +612,106 @@ class Project(Generic[T]):
             pass
 
         if dump_output:
+            function_table = self.report.get('All functions')
+            table_yaml = ''
+            if function_table is not None:
+                table_yaml, table_digest = self.dump_function_table(
+                    function_table)
+                report_header[
+                    constants.FUNCTION_TABLE_DIGEST_KEY] = table_digest
             with open(report_name, 'w', encoding='utf-8') as f:
-                f.write(yaml.safe_dump(new_report))
+                f.write(yaml.dump(report_header, Dumper=_HeaderDumper))
+                f.write(table_yaml)
         logger.info('Dumped')
 
+    def dump_function_table(self, function_table: Any) -> tuple[str, str]:
+        """Serialises the 'All functions' table of the report and returns it
+        with its sha256 digest. The table does not depend on the harness, so
+        the text is kept and reused for as long as the report holds the same
+        list of elements."""
+        elements = function_table.get('Elements')
+        cached = self.function_table_yaml
+        if cached is not None and cached[0] is elements:
+            return cached[1], cached[2]
+
+        table_yaml = yaml.safe_dump({'All functions': function_table})
+        table_digest = hashlib.sha256(table_yaml.encode('utf-8')).hexdigest()
+        self.function_table_yaml = (elements, table_yaml, table_digest)
+        return table_yaml, table_digest
+
+    def resolve_calltree_call(
+        self, call: CalltreeCall
+    ) -> Optional[tuple[str, str, Optional[Iterable[CalltreeCall]]]]:
+        """Resolves a call of the calltree. Returns None if the call is not
+        part of the calltree, otherwise the name to print for it, the name
+        used to track visited functions and the calls made by the callee, or
+        None if the callee cannot be expanded."""
+        # Dummy function for subclasses
+        return None
+
+    def iter_calltree(self,
+                      source_file: str = '',
+                      source_code: Optional[SourceCodeFile] = None,
+                      function: Optional[str] = None,
+                      visited_functions: Optional[set[str]] = None,
+                      depth: int = 0,
+                      line_number: int = -1,
+                      other_props: Optional[dict[str, Any]] = None,
+                      max_depth: Optional[int] = None,
+                      max_nodes: Optional[int] = None) -> Iterator[str]:
+        """Yields the lines of the calltree from a given function, in the
+        format of the .data files. Each function is expanded the first time
+        it is reached only. The walk uses an explicit stack, so deep call
+        chains are fine. Functions at `max_depth` are not expanded, and the
+        calltree stops after `max_nodes` lines."""
+        if not visited_functions:
+            visited_functions = set()
+
+        root: CalltreeCall = (source_file, source_code, function, line_number,
+                              other_props)
+        stack: list[tuple[int,
+                          Iterator[CalltreeCall]]] = [(depth, iter([root]))]
+        node_count = 0
+        while stack:
+            call_depth, calls = stack[-1]
+            call = next(calls, None)
+            if call is None:
+                stack.pop()
+                continue
+
+            resolved = self.resolve_calltree_call(call)
+            if resolved is None:
+                continue
+            if max_nodes is not None and node_count >= max_nodes:
+                logger.info('Calltree truncated at %d nodes', max_nodes)
+                return
+            node_count += 1
+
+            func_name, visit_name, callees = resolved
+            yield f'{"  " * call_depth}{func_name} {call[0]} {call[3]}\n'
+
+            if (callees is None or visit_name in visited_functions
+                    or (max_depth is not None and call_depth >= max_depth)):
+                continue
+            visited_functions.add(visit_name)
+            stack.append((call_depth + 1, iter(callees)))
+
+    def write_calltree(self,
+                       stream: TextIO,
+                       source_file: str = '',
+                       source_code: Optional[SourceCodeFile] = None,
+                       function: Optional[str] = None,
+                       max_depth: Optional[int] = None,
+                       max_nodes: Optional[int] = None) -> None:
+        """Writes the calltree from a given function to `stream` as it is
+        walked, so the calltree is never held in memory."""
+        stream.writelines(
+            self.iter_calltree(source_file,
+                               source_code,
+                               function,
+                               max_depth=max_depth,
+                               max_nodes=max_nodes))
+
     def extract_calltree(self,
                          source_file: str = '',
                          source_code: Optional[SourceCodeFile] = None,
@@ -186,8 +721,10 @@ class Project(Generic[T]):
                          line_number: int = -1,
                          other_props: Optional[dict[str, Any]] = None) -> str:
         """Extracts calltree string of a calltree so that FI core can use it."""
-        # Dummy function for subclasses
-        return ''
+        return ''.join(
+            self.iter_calltree(source_file, source_code, function,
+                               visited_functions, depth, line_number,
+                               other_props))
 
     def get_reachable_functions(
             self,
@@ -211,25 +748,15 @@ class Project(Generic[T]):
     def get_cross_references(self, src_func: Any) -> list[Any]:
         """Gets list of functions that reference src_func"""
         # TODO specify type after generalisation of FunctionDefinition
-        xrefs = []
-        for func in self.all_functions:
-            if func.sig == src_func:
-                continue
-
-            for callsite in func.base_callsites:
-                if callsite[0] == src_func.name:
-                    xrefs.append(func)
-
-        return xrefs
+        return [
+            func
+            for func in self.get_callgraph_index().get_callers(src_func.name)
+            if func.sig != src_func
+        ]
 
     def get_cross_references_by_name(self, function_name) -> list[Any]:
         """Get cross reference functions by a target function name."""
-        xrefs = []
-        for func in self.all_functions:
-            for callsite in func.base_callsites:
-                if callsite[0] == function_name:
-                    xrefs.append(func)
-        return xrefs
+        return self.get_callgraph_index().get_callers(function_name)
 
     def find_function_by_name(self, target_function_name, only_exact_match):
         """Helper function to find the matching function."""
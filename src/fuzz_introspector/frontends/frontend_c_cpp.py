@@ -15,7 +15,7 @@
 ################################################################################
 """Tree-sitter frontend for c or cpp projects."""
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from tree_sitter import Language, Node
 
@@ -23,12 +23,17 @@ import os
 import copy
 import logging
 
-from fuzz_introspector.frontends.datatypes import SourceCodeFile, Project
+from fuzz_introspector.frontends.datatypes import (CalltreeCall,
+                                                   SourceCodeFile, Project,
+                                                   SuffixTable,
+                                                   load_source_files)
 
 logger = logging.getLogger(name=__name__)
 
 # For caching function nodes to increase processing speed
 _function_node_cache: dict[tuple[str, str, bool], 'FunctionDefinition'] = {}
+# Name indexes of the function lists given to get_function_node
+_function_name_indexes: dict[int, '_FunctionNameIndex'] = {}
 
 
 class CppSourceCodeFile(SourceCodeFile):
@@ -1071,6 +1076,18 @@ class CppProject(Project[CppSourceCodeFile]):
     def __init__(self, source_code_files: list[CppSourceCodeFile]):
         super().__init__(source_code_files)
         self.internal_func_list: list[dict[str, Any]] = []
+        self.symbol_table: Optional[_FunctionSymbolTable] = None
+
+    def get_symbol_table(self) -> '_FunctionSymbolTable':
+        """Gets the symbol table of the functions defined in the source
+        files, rebuilding it when source files have been added."""
+        table = self.symbol_table
+        if (table is None
+                or table.source_code_files is not self.source_code_files
+                or table.file_count != len(self.source_code_files)):
+            table = _FunctionSymbolTable(self.source_code_files)
+            self.symbol_table = table
+        return table
 
     def get_function_from_name(self, function_name):
         for func in self.all_functions:
@@ -1116,18 +1133,21 @@ class CppProject(Project[CppSourceCodeFile]):
 
         # Process all project functions
         if not self.internal_func_list:
+            # Extracting callsites of functions, all of them are needed to
+            # calculate the uses and depth of any function.
+            for func in self.all_functions:
+                logger.debug('Extracing callsites of %s', func.name)
+                func.extract_callsites(self)
+            logger.debug('Done extracting callsites')
+            self.build_callgraph_index()
+
             func_list = []
             for func in self.all_functions:
                 logger.debug('Iterating %s', func.name)
-
-                # Extracting callsites of functions
-                logger.debug('Extracing callsites')
-                func.extract_callsites(self)
                 callsites = func.base_callsites
                 reached = set()
                 for cs_dst, _ in callsites:
                     reached.add(cs_dst)
-                logger.debug('Done extracting callsites')
 
                 # Calculating function uses
                 logger.debug('Calculating function uses')
@@ -1170,98 +1190,57 @@ class CppProject(Project[CppSourceCodeFile]):
 
                 logger.debug('Done')
                 func_list.append(func_dict)
-            self.internal_func_list = copy.deepcopy(func_list)
+            self.internal_func_list = func_list
         else:
-            func_list = copy.deepcopy(self.internal_func_list)
+            # The function list does not depend on the harness and is not
+            # modified once generated, so all harness reports share it.
+            func_list = self.internal_func_list
 
         if func_list:
             self.report['All functions'] = {}
             self.report['All functions']['Elements'] = func_list
-        self.report['included-header-files'] = list(included_header_files)
+        self.report['included-header-files'] = sorted(included_header_files)
 
         self.report['Fuzzing method'] = 'LLVMFuzzerTestOneInput'
         self.report['Fuzzer filename'] = harness_source
-        _function_node_cache.clear()
-
-    def extract_calltree(self,
-                         source_file: str = '',
-                         source_code: Optional[SourceCodeFile] = None,
-                         function: Optional[str] = None,
-                         visited_functions: Optional[set[str]] = None,
-                         depth: int = 0,
-                         line_number: int = -1,
-                         other_props: Optional[dict[str, Any]] = None) -> str:
-        """Extracts calltree string of a calltree so that FI core can use it."""
-        # pylint: disable=unused-argument
-
-        # Create calltree from a given function
-        # Find the function in the source code
-        logger.debug('Extracting calltree for %s', str(function))
-        if not visited_functions:
-            visited_functions = set()
+        clear_function_node_cache()
 
+    def resolve_calltree_call(
+        self, call: CalltreeCall
+    ) -> Optional[tuple[str, str, Optional[Iterable[CalltreeCall]]]]:
+        """Resolves a call of the calltree to the function it reaches."""
+        _, source_code, function, _, _ = call
         if not function:
             logger.debug('No function')
-            return ''
+            return None
 
         if not source_code:
             result = self._find_source_with_func_def(function)
             if result:
                 source_code = result[0]
 
-        func_node = None
-        if function:
-            if source_code and isinstance(source_code, CppSourceCodeFile):
-                logger.debug('Using source code var to extract node')
-                func_node = source_code.get_function_node(function)
-            else:
-                logger.debug('Extracting node using lookup table.')
-                func_node = get_function_node(function, self.all_functions)
-
-            if func_node:
-                logger.debug('Found function node: %s', func_node.name)
-                func_name = func_node.name
-            else:
-                logger.debug('Found no function node')
-                func_name = function
+        if source_code and isinstance(source_code, CppSourceCodeFile):
+            logger.debug('Using source code var to extract node')
+            func_node = source_code.get_function_node(function)
         else:
-            logger.debug('Could not find function')
-            return ''
-
-        line_to_print = '  ' * depth
-        line_to_print += func_name
-        line_to_print += ' '
-        line_to_print += source_file
+            logger.debug('Extracting node using lookup table.')
+            func_node = get_function_node(function, self.all_functions)
 
-        line_to_print += ' '
-        line_to_print += str(line_number)
+        if not func_node:
+            logger.debug('Found no function node')
+            return function, function, None
+        logger.debug('Found function node: %s', func_node.name)
 
-        line_to_print += '\n'
-        if func_node and not source_code:
+        if not source_code:
             source_code = func_node.parent_source
+        if not source_code:
+            logger.debug('Not source code')
+            return func_node.name, function, None
 
-        if function in visited_functions or not func_node or not source_code:
-            if function in visited_functions:
-                logger.debug('Function in visited ')
-            if not func_node:
-                logger.debug('Not func_node')
-            if not source_code:
-                logger.debug('Not source code')
-            logger.debug('Function visited or no function node')
-            return line_to_print
-
-        visited_functions.add(function)
-        logger.debug('Iterating %s callsites', len(func_node.base_callsites))
-        for cs, line in func_node.base_callsites:
-            logger.debug('Callsite: %s', cs)
-            line_to_print += self.extract_calltree(
-                source_file=source_code.source_file,
-                function=cs,
-                visited_functions=visited_functions,
-                depth=depth + 1,
-                line_number=line)
-        logger.debug('Done')
-        return line_to_print
+        callee_source_file = source_code.source_file
+        return func_node.name, function, (
+            (callee_source_file, None, cs, line, None)
+            for cs, line in func_node.base_callsites)
 
     def get_reachable_functions(
             self,
@@ -1317,22 +1296,7 @@ class CppProject(Project[CppSourceCodeFile]):
 
     def _calculate_function_uses(self, target_name: str) -> int:
         """Calculate how many functions called the target function."""
-        func_use_count = 0
-
-        for source_file in self.source_code_files:
-            for function in source_file.func_defs:
-                found = False
-                for callsite in function.base_callsites:
-                    if callsite[0] == target_name:
-                        found = True
-                        break
-                    if callsite[0].endswith(target_name):
-                        found = True
-                        break
-                if found:
-                    func_use_count += 1
-
-        return func_use_count
+        return self.get_callgraph_index().count_callers_by_suffix(target_name)
 
     def _calculate_function_depth(self,
                                   target_function: FunctionDefinition) -> int:
@@ -1347,7 +1311,7 @@ class CppProject(Project[CppSourceCodeFile]):
                 return 0
 
             depth = 0
-            visited.append(function.name)
+            visited.add(function.name)
             for callsite in callsites:
                 target = self._find_source_with_func_def(callsite[0])
                 if target and target[1].name in visited:
@@ -1357,11 +1321,11 @@ class CppProject(Project[CppSourceCodeFile]):
                                 _recursive_function_depth(target[1]) + 1)
                     function.depth = depth
                 else:
-                    visited.append(callsite[0])
+                    visited.add(callsite[0])
 
             return depth
 
-        visited: list[str] = []
+        visited: set[str] = set()
         func_depth = _recursive_function_depth(target_function)
 
         return func_depth
@@ -1370,56 +1334,128 @@ class CppProject(Project[CppSourceCodeFile]):
             self, name: str
     ) -> Optional[tuple[CppSourceCodeFile, FunctionDefinition]]:
         """Finds the source code with a given function."""
+        return self.get_symbol_table().find_source_with_func_def(name)
 
-        return_func = None
-        source_codes_with_target = []
-        for source_code in self.source_code_files:
-            func = source_code.get_function_node(name, exact=True)
-            if func:
-                return_func = func
-                source_codes_with_target.append(source_code)
 
-        if len(source_codes_with_target) == 1 and return_func:
-            # We hav have, in this case it's trivial.
-            return (source_codes_with_target[0], return_func)
+class _FunctionSymbolTable():
+    """Functions defined in a list of source files, keyed by their name
+    qualified with the namespace or class and by their unqualified name.
+    Only the first function of each source file is kept for a name, which
+    is the one CppSourceCodeFile.get_function_node returns."""
 
-        return_func = None
-        source_codes_with_target = []
-        for source_code in self.source_code_files:
-            func = source_code.get_function_node(name, exact=False)
-            if func:
-                return_func = func
-                source_codes_with_target.append(source_code)
-
-        if len(source_codes_with_target) == 1 and return_func:
-            # We hav have, in this case it's trivial.
-            return (source_codes_with_target[0], return_func)
+    def __init__(self, source_code_files: list[CppSourceCodeFile]):
+        self.source_code_files = source_code_files
+        self.file_count = len(source_code_files)
+        self.qualified: dict[str, list[tuple[int, FunctionDefinition]]] = {}
+        self.unqualified: dict[str, list[tuple[int, FunctionDefinition]]] = {}
+        for file_idx, source_code in enumerate(source_code_files):
+            for func in source_code.func_defs:
+                if func.namespace_or_class:
+                    qualified_name = func.namespace_or_class + '::' + func.name
+                else:
+                    qualified_name = func.name
+                self._add(self.qualified, qualified_name, file_idx, func)
+                self._add(self.unqualified, func.name, file_idx, func)
+        self._resolved: dict[str, Optional[tuple[CppSourceCodeFile,
+                                                 FunctionDefinition]]] = {}
+
+    @staticmethod
+    def _add(table: dict[str, list[tuple[int, FunctionDefinition]]], name: str,
+             file_idx: int, func: FunctionDefinition) -> None:
+        entries = table.setdefault(name, [])
+        if not entries or entries[-1][0] != file_idx:
+            entries.append((file_idx, func))
+
+    def find_source_with_func_def(
+            self, name: str
+    ) -> Optional[tuple[CppSourceCodeFile, FunctionDefinition]]:
+        """Finds the source file and the function of a given name, if a
+        single source file defines it. An exact match of the qualified name
+        is tried first, then also matches of the unqualified name."""
+        if name in self._resolved:
+            return self._resolved[name]
+
+        result = None
+        exact_matches = self.qualified.get(name, [])
+        if len(exact_matches) == 1:
+            result = exact_matches[0]
+        else:
+            # Match of each source file in the order of priority of
+            # CppSourceCodeFile.get_function_node.
+            file_matches: dict[int, FunctionDefinition] = {}
+            for matches in (exact_matches, self.unqualified.get(name, []),
+                            self.unqualified.get(name.split('::')[-1], [])):
+                for file_idx, func in matches:
+                    file_matches.setdefault(file_idx, func)
+                if len(file_matches) > 1:
+                    break
+            if len(file_matches) == 1:
+                result = next(iter(file_matches.items()))
 
         # TODO Handle multiple match (matching the namespace and class also
+        resolved = None
+        if result:
+            resolved = (self.source_code_files[result[0]], result[1])
+        self._resolved[name] = resolved
+        return resolved
+
+
+class _FunctionNameIndex():
+    """Index of the names of a function list. Each name maps to its first
+    function in the list, so lookups give the same function as a scan."""
+
+    def __init__(self, functions: list[FunctionDefinition]):
+        self.functions = functions
+        self.function_count = len(functions)
+        self.first_by_name: dict[str, FunctionDefinition] = {}
+        for func in functions:
+            self.first_by_name.setdefault(func.name, func)
+        self._suffixes = SuffixTable(list(self.first_by_name))
+
+    def find_function_by_suffix(self,
+                                suffix: str) -> Optional[FunctionDefinition]:
+        """First function in the list whose name ends with `suffix`."""
+        names = self._suffixes.names_with_suffix(suffix)
+        if not names:
+            return None
+        return self.first_by_name[names[0]]
 
-        return None
 
+def _get_function_name_index(
+        function_list: list[FunctionDefinition]) -> _FunctionNameIndex:
+    """Gets the name index of a function list, building it if needed."""
+    index = _function_name_indexes.get(id(function_list))
+    if (index is None or index.functions is not function_list
+            or index.function_count != len(function_list)):
+        index = _FunctionNameIndex(function_list)
+        _function_name_indexes[id(function_list)] = index
+    return index
 
-def load_treesitter_trees(source_files: list[str],
-                          is_log: bool = True) -> CppProject:
-    """Creates treesitter trees for all files in a given list of
-    source files."""
-    results = []
 
-    for code_file in source_files:
-        if not os.path.isfile(code_file):
-            continue
+def clear_function_node_cache() -> None:
+    """Clears the cached function lookups of get_function_node."""
+    _function_node_cache.clear()
+    _function_name_indexes.clear()
 
-        try:
-            source_cls = CppSourceCodeFile('c++', code_file)
-        except RecursionError:
-            continue
 
-        if is_log:
+def load_treesitter_trees(source_files: list[str],
+                          is_log: bool = True,
+                          jobs: Optional[int] = 1) -> CppProject:
+    """Creates treesitter trees for all files in a given list of
+    source files, using `jobs` worker processes."""
+    source_files = [
+        code_file for code_file in source_files if os.path.isfile(code_file)
+    ]
+    results = load_source_files(CppSourceCodeFile,
+                                'c++',
+                                source_files,
+                                jobs=jobs,
+                                skip_errors=(RecursionError, ))
+
+    if is_log:
+        for source_cls in results:
             if source_cls.has_libfuzzer_harness():
-                logger.info('harness: %s', code_file)
-
-        results.append(source_cls)
+                logger.info('harness: %s', source_cls.source_file)
 
     return CppProject(results)
 
@@ -1443,19 +1479,20 @@ def get_function_node(target_name: str,
         return _function_node_cache[cache_key]
 
     logger.debug('Finding match for %s', target_name)
-    for function in function_list:
-        if target_name == function.name:
-            logger.debug('Found exact match')
-            _function_node_cache[cache_key] = function
-            return function
+    index = _get_function_name_index(function_list)
+    function = index.first_by_name.get(target_name)
+    if function:
+        logger.debug('Found exact match')
+        _function_node_cache[cache_key] = function
+        return function
 
     if namespace:
         logger.debug('Finding function within namespace %s', namespace)
-        for function in function_list:
-            if namespace + '::' + target_name == function.name:
-                logger.debug('Found namespace match')
-                _function_node_cache[cache_key] = function
-                return function
+        function = index.first_by_name.get(namespace + '::' + target_name)
+        if function:
+            logger.debug('Found namespace match')
+            _function_node_cache[cache_key] = function
+            return function
 
     # Exact match
     # if target_name in function_map:
@@ -1479,11 +1516,11 @@ def get_function_node(target_name: str,
 
     for count in range(len(name_split)):
         logger.debug('Testing %s', '::'.join(name_split[count:]))
-        for func in function_list:
-            if func.name.endswith('::'.join(name_split[count:])):
-                logger.debug('Found match: %s', func.name)
-                _function_node_cache[cache_key] = func
-                return func
+        func = index.find_function_by_suffix('::'.join(name_split[count:]))
+        if func:
+            logger.debug('Found match: %s', func.name)
+            _function_node_cache[cache_key] = func
+            return func
 
     logger.debug('Found no matching function node')
     return None
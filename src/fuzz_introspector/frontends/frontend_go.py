@@ -15,13 +15,16 @@
 ################################################################################
 """Fuzz Introspector Light frontend for Go"""
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from tree_sitter import Language, Node
 
 import logging
 
-from fuzz_introspector.frontends.datatypes import Project, SourceCodeFile
+from fuzz_introspector.frontends.datatypes import (CallgraphIndex,
+                                                   CalltreeCall, Project,
+                                                   SourceCodeFile,
+                                                   load_source_files)
 
 logger = logging.getLogger(name=__name__)
 
@@ -183,6 +186,22 @@ class GoProject(Project[GoSourceCodeFile]):
         if entry_function:
             report['Fuzzing method'] = entry_function
 
+        # Extract callsites of all functions, as they are all needed to
+        # calculate the uses and depth of any function.
+        for source_code in self.source_code_files:
+            for func_def in source_code.functions + source_code.methods:
+                func_def.extract_local_variable_type(
+                    self.functions_methods_map)
+                # Need a second pass because the processing may out of order
+                # That could affect some local variable types that are
+                # relying on other variables
+                func_def.extract_local_variable_type(
+                    self.functions_methods_map)
+
+                func_def.extract_callsites(self.functions_methods_map)
+        callgraph_index = self.build_callgraph_index(
+            list(self.functions_methods_map.values()))
+
         # Find all functions
         function_list: list[dict[str, Any]] = []
         for source_code in self.source_code_files:
@@ -195,15 +214,6 @@ class GoProject(Project[GoSourceCodeFile]):
 
             functions_methods = source_code.functions + source_code.methods
             for func_def in functions_methods:
-                func_def.extract_local_variable_type(
-                    self.functions_methods_map)
-                # Need a second pass because the processing may out of order
-                # That could affect some local variable types that are
-                # relying on other variables
-                func_def.extract_local_variable_type(
-                    self.functions_methods_map)
-
-                func_def.extract_callsites(self.functions_methods_map)
                 func_dict: dict[str, Any] = {}
                 func_dict['functionName'] = func_def.name
                 func_dict['functionSourceFile'] = source_code.source_file
@@ -224,9 +234,9 @@ class GoProject(Project[GoSourceCodeFile]):
                 func_dict['BranchProfiles'] = []
                 func_dict['Callsites'] = func_def.detailed_callsites
                 func_dict['functionUses'] = func_def.get_function_uses(
-                    list(self.functions_methods_map.values()))
+                    callgraph_index)
                 func_dict['functionDepth'] = func_def.get_function_depth(
-                    list(self.functions_methods_map.values()))
+                    callgraph_index)
                 func_dict['constantsTouched'] = []
                 func_dict['BBCount'] = 0
                 func_dict['signature'] = func_def.sig
@@ -247,58 +257,31 @@ class GoProject(Project[GoSourceCodeFile]):
 
         self.report = report
 
-    def extract_calltree(self,
-                         source_file: str = '',
-                         source_code: Optional[SourceCodeFile] = None,
-                         function: Optional[str] = None,
-                         visited_functions: Optional[set[str]] = None,
-                         depth: int = 0,
-                         line_number: int = -1,
-                         other_props: Optional[dict[str, Any]] = None) -> str:
-        """Extracts calltree string of a calltree so that FI core can use it."""
-        # pylint: disable=unused-argument
-        if not visited_functions:
-            visited_functions = set()
-
+    def resolve_calltree_call(
+        self, call: CalltreeCall
+    ) -> Optional[tuple[str, str, Optional[Iterable[CalltreeCall]]]]:
+        """Resolves a call of the calltree to the function it reaches."""
+        _, source_code, function, _, _ = call
         if not function:
             if not source_code:
-                return ''
+                return None
             function = source_code.get_entry_function_name()
 
         if not function:
-            return ''
-
-        line_to_print = '  ' * depth
-        line_to_print += function
-        line_to_print += ' '
-        line_to_print += source_file
+            return None
 
         if not source_code or not isinstance(source_code, GoSourceCodeFile):
             source_code = self.find_source_with_func_def(function)
-
-        line_to_print += ' '
-        line_to_print += str(line_number)
-
-        line_to_print += '\n'
         if not source_code:
-            return line_to_print
+            return function, function, None
 
         func = source_code.get_function_node(function)
         if not func:
-            return line_to_print
-
-        if function in visited_functions:
-            return line_to_print
+            return function, function, None
 
-        visited_functions.add(function)
-        for cs, line in func.base_callsites:
-            line_to_print += self.extract_calltree(
-                source_code.source_file,
-                function=cs,
-                visited_functions=visited_functions,
-                depth=depth + 1,
-                line_number=line)
-        return line_to_print
+        callee_source_file = source_code.source_file
+        return function, function, ((callee_source_file, None, cs, line, None)
+                                    for cs, line in func.base_callsites)
 
     def get_reachable_functions(
             self,
@@ -394,37 +377,28 @@ class FunctionMethod():
 
         return ''
 
-    def get_function_uses(self,
-                          all_funcs_meths: list['FunctionMethod']) -> int:
+    def get_function_uses(self, callgraph_index: CallgraphIndex) -> int:
         """Calculate how many function called this function."""
         if not self.function_uses:
-            for func in all_funcs_meths:
-                found = False
-                for callsite in func.base_callsites:
-                    if callsite[0] == self.name:
-                        found = True
-                        break
-                if found:
-                    self.function_uses += 1
+            self.function_uses = callgraph_index.count_callers(self.name)
 
         return self.function_uses
 
-    def get_function_depth(self,
-                           all_funcs_meths: list['FunctionMethod']) -> int:
+    def get_function_depth(self, callgraph_index: CallgraphIndex) -> int:
         """Calculate function depth of this function."""
 
         if self.function_depth:
             return self.function_depth
 
-        visited: list[str] = []
-        func_meth_dict = {f.name: f for f in all_funcs_meths}
+        visited: set[str] = set()
+        func_meth_dict = callgraph_index.functions_by_name
 
         def _recursive_function_depth(func_meth: FunctionMethod) -> int:
             callsites = func_meth.base_callsites
             if len(callsites) == 0:
                 return 0
 
-            visited.append(func_meth.name)
+            visited.add(func_meth.name)
             depth = 0
             for callsite in callsites:
                 target = func_meth_dict.get(callsite[0])
@@ -433,7 +407,7 @@ class FunctionMethod():
                 elif target:
                     depth = max(depth, _recursive_function_depth(target) + 1)
                 else:
-                    visited.append(callsite[0])
+                    visited.add(callsite[0])
 
             return depth
 
@@ -806,17 +780,19 @@ class FunctionMethod():
 
 
 def load_treesitter_trees(source_files: list[str],
-                          is_log: bool = True) -> GoProject:
-    """Creates treesitter trees for all files in a given list of source
-    files."""
-    results = []
-
-    for code_file in source_files:
-        source_cls = GoSourceCodeFile('go', code_file)
-        if is_log:
+                          is_log: bool = True,
+                          jobs: Optional[int] = 1) -> GoProject:
+    """Creates treesitter trees for all files in a given list of
+    source files, using `jobs` worker processes."""
+    results = load_source_files(GoSourceCodeFile,
+                                'go',
+                                source_files,
+                                jobs=jobs)
+
+    if is_log:
+        for source_cls in results:
             if source_cls.has_libfuzzer_harness():
-                logger.info('harness: %s', code_file)
-        results.append(source_cls)
+                logger.info('harness: %s', source_cls.source_file)
 
     return GoProject(results)
 
@@ -15,13 +15,16 @@
 ################################################################################
 """Fuzz Introspector Light frontend for Java"""
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from tree_sitter import Language, Node
 
 import logging
 
-from fuzz_introspector.frontends.datatypes import Project, SourceCodeFile
+from fuzz_introspector.frontends.datatypes import (CallgraphIndex,
+                                                   CalltreeCall, Project,
+                                                   SourceCodeFile,
+                                                   load_source_files)
 
 logger = logging.getLogger(name=__name__)
 
@@ -1116,6 +1119,7 @@ class JvmProject(Project[JvmSourceCodeFile]):
         # Extract callsites of methods
         for method in project_methods:
             method.extract_callsites(all_classes)
+        self.build_callgraph_index(project_methods)
 
         # Process all project methods
         method_list = []
@@ -1204,17 +1208,15 @@ class JvmProject(Project[JvmSourceCodeFile]):
     def calculate_method_uses(self, target_name: str,
                               all_methods: list[JavaMethod]) -> int:
         """Calculate how many method called the target method."""
-        method_use_count = 0
-        for method in all_methods:
-            found = False
-            for callsite in method.base_callsites:
-                if callsite[0] == target_name:
-                    found = True
-                    break
-            if found:
-                method_use_count += 1
+        return self._get_method_index(all_methods).count_callers(target_name)
 
-        return method_use_count
+    def _get_method_index(self,
+                          all_methods: list[JavaMethod]) -> CallgraphIndex:
+        """Gets the callgraph index of the given methods."""
+        index = self.callgraph_index
+        if index is None or index.functions is not all_methods:
+            index = self.build_callgraph_index(all_methods)
+        return index
 
     def calculate_method_depth(self, target_method: JavaMethod,
                                all_methods: list[JavaMethod]) -> int:
@@ -1226,7 +1228,7 @@ class JvmProject(Project[JvmSourceCodeFile]):
                 return 0
 
             depth = 0
-            visited.append(method.name)
+            visited.add(method.name)
             for callsite in callsites:
                 target = method_dict.get(callsite[0])
                 if callsite[0] in visited:
@@ -1234,28 +1236,21 @@ class JvmProject(Project[JvmSourceCodeFile]):
                 elif target:
                     depth = max(depth, _recursive_method_depth(target) + 1)
                 else:
-                    visited.append(callsite[0])
+                    visited.add(callsite[0])
 
             return depth
 
-        visited: list[str] = []
-        method_dict = {method.name: method for method in all_methods}
+        visited: set[str] = set()
+        method_dict = self._get_method_index(all_methods).functions_by_name
         method_depth = _recursive_method_depth(target_method)
 
         return method_depth
 
-    def extract_calltree(self,
-                         source_file: str = '',
-                         source_code: Optional[SourceCodeFile] = None,
-                         function: Optional[str] = None,
-                         visited_functions: Optional[set[str]] = None,
-                         depth: int = 0,
-                         line_number: int = -1,
-                         other_props: Optional[dict[str, Any]] = None) -> str:
-        """Extracts calltree string of a calltree so that FI core can use it."""
-        if not visited_functions:
-            visited_functions = set()
-
+    def resolve_calltree_call(
+        self, call: CalltreeCall
+    ) -> Optional[tuple[str, str, Optional[Iterable[CalltreeCall]]]]:
+        """Resolves a call of the calltree to the method it reaches."""
+        _, source_code, function, _, _ = call
         if function and '].' not in function:
             function = None
 
@@ -1269,38 +1264,19 @@ class JvmProject(Project[JvmSourceCodeFile]):
                 function = source_code.get_entry_method_name(True)
 
         if not function:
-            return ''
-
-        line_to_print = '  ' * depth
-        line_to_print += function
-        line_to_print += ' '
-        line_to_print += source_file
-        line_to_print += ' '
-        line_to_print += str(line_number)
-        line_to_print += '\n'
+            return None
 
         if not source_code or not isinstance(source_code, JvmSourceCodeFile):
-            return line_to_print
+            return function, function, None
 
         function_node = source_code.get_method_node(function)
         if not function_node:
-            return line_to_print
-
-        callsites = function_node.base_callsites
+            return function, function, None
 
-        if function in visited_functions:
-            return line_to_print
-
-        visited_functions.add(function)
-        for cs, line in callsites:
-            line_to_print += self.extract_calltree(
-                source_code.source_file,
-                function=cs,
-                visited_functions=visited_functions,
-                depth=depth + 1,
-                line_number=line)
-
-        return line_to_print
+        callee_source_file = source_code.source_file
+        return function, function, (
+            (callee_source_file, None, cs, line, None)
+            for cs, line in function_node.base_callsites)
 
     def get_source_codes_with_harnesses(self) -> list[JvmSourceCodeFile]:
         return super().get_source_codes_with_harnesses()
@@ -1352,17 +1328,20 @@ class JvmProject(Project[JvmSourceCodeFile]):
 
 def load_treesitter_trees(source_files: list[str],
                           entrypoint: str,
-                          is_log: bool = True) -> JvmProject:
+                          is_log: bool = True,
+                          jobs: Optional[int] = 1) -> JvmProject:
     """Creates treesitter trees for all files in a given list of
-    source files."""
-    results = []
-
-    for code_file in source_files:
-        source_cls = JvmSourceCodeFile('jvm', code_file, entrypoint)
-        if is_log:
+    source files, using `jobs` worker processes."""
+    results = load_source_files(JvmSourceCodeFile,
+                                'jvm',
+                                source_files,
+                                entrypoint=entrypoint,
+                                jobs=jobs)
+
+    if is_log:
+        for source_cls in results:
             if source_cls.has_libfuzzer_harness():
-                logger.info('harness: %s', code_file)
-        results.append(source_cls)
+                logger.info('harness: %s', source_cls.source_file)
 
     return JvmProject(results)
 
@@ -15,7 +15,7 @@
 ################################################################################
 """Fuzz Introspector Light frontend for Rust"""
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from tree_sitter import Language, Node
 
@@ -354,8 +354,8 @@ class RustFunction():
                                                          errors='ignore')
                         if content.startswith('{'):
                             cbytes = content.encode('utf-8')
-                            root = self.parent_source.parser.parse(cbytes)
-                            self.fuzzing_token_tree = root.root_node
+                            self.fuzzing_token_tree = (
+                                self.parent_source.parse_fragment(cbytes))
 
             elif child.type == 'macro_rule':
                 token_tree = child.child_by_field_name('right')
@@ -364,8 +364,8 @@ class RustFunction():
                                                      errors='ignore')
                     if content.startswith('{'):
                         cbytes = content.encode('utf-8')
-                        root = self.parent_source.parser.parse(cbytes)
-                        self.fuzzing_token_tree = root.root_node
+                        self.fuzzing_token_tree = (
+                            self.parent_source.parse_fragment(cbytes))
 
     def _process_variables(self):
         """Process variable declaration and store them for reference."""
@@ -626,6 +626,7 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
 
     def __init__(self, source_code_files: list[RustSourceCodeFile]):
         super().__init__(source_code_files)
+        self.all_functions_dict: dict[str, RustFunction] = {}
 
     def generate_report(self,
                         entry_function: str = '',
@@ -670,7 +671,9 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
         self.all_functions = list(self.all_functions_dict.values())
         for func in self.all_functions:
             func.extract_callsites(self.all_functions_dict)
+        self.build_callgraph_index()
 
+        for func in self.all_functions:
             func_dict: dict[str, Any] = {}
             func_dict['functionName'] = func.name
             func_dict['functionSourceFile'] = func.parent_source.source_file
@@ -740,20 +743,10 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
     def calculate_function_uses(self, target_name: str,
                                 all_functions: list[RustFunction]) -> int:
         """Calculate how many functions called the target function."""
-        func_use_count = 0
-        for function in all_functions:
-            found = False
-            for callsite in function.base_callsites:
-                if callsite[0] == target_name:
-                    found = True
-                    break
-                if callsite[0].endswith(target_name):
-                    found = True
-                    break
-            if found:
-                func_use_count += 1
-
-        return func_use_count
+        index = self.callgraph_index
+        if index is None or index.functions is not all_functions:
+            index = datatypes.CallgraphIndex(all_functions)
+        return index.count_callers_by_suffix(target_name)
 
     def calculate_function_depth(
             self, target_function: RustFunction,
@@ -766,33 +759,34 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
                 return 0
 
             depth = 0
-            visited.append(function.name)
+            visited.add(function.name)
             for callsite in callsites:
-                target = get_function_node(callsite[0], all_functions, True)
+                target = get_function_node(callsite[0], all_functions, True,
+                                           index)
                 if target and target.name in visited:
                     depth = max(depth, 1)
                 elif target:
                     depth = max(depth, _recursive_function_depth(target) + 1)
                 else:
-                    visited.append(callsite[0])
+                    visited.add(callsite[0])
 
             return depth
 
-        visited: list[str] = []
+        # The index can only be used if it holds the same functions.
+        index = self.callgraph_index
+        if (index is None or all_functions is not self.all_functions_dict
+                or index.functions is not self.all_functions):
+            index = None
+        visited: set[str] = set()
         func_depth = _recursive_function_depth(target_function)
 
         return func_depth
 
-    def extract_calltree(self,
-                         source_file: str = '',
-                         source_code: Optional[
-                             datatypes.SourceCodeFile] = None,
-                         function: Optional[str] = None,
-                         visited_functions: Optional[set[str]] = None,
-                         depth: int = 0,
-                         line_number: int = -1,
-                         other_props: Optional[dict[str, Any]] = None) -> str:
-        """Extracts calltree string of a calltree so that FI core can use it."""
+    def resolve_calltree_call(
+        self, call: datatypes.CalltreeCall
+    ) -> Optional[tuple[str, str, Optional[Iterable[datatypes.CalltreeCall]]]]:
+        """Resolves a call of the calltree to the function it reaches."""
+        _, source_code, function, _, other_props = call
         func_node = None
 
         if other_props:
@@ -800,64 +794,42 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
         else:
             is_macro = False
 
-        if not visited_functions:
-            visited_functions = set()
-
         if not source_code and function:
             source_code = self._find_source_with_function(function)
 
         if not function and source_code:
             if not isinstance(source_code, RustSourceCodeFile):
-                return ''
+                return None
 
             func_node = source_code.get_entry_function()
             if func_node:
                 function = func_node.name
 
-        if function:
-            if not func_node:
-                func_node = get_function_node(function,
-                                              self.all_functions_dict)
+        if not function:
+            return None
 
-            if func_node and not is_macro:
-                func_name = func_node.name
-                if function.count('::') > func_name.count('::'):
-                    func_name = function
-            else:
-                func_node = None
+        if not func_node:
+            func_node = get_function_node(function, self.all_functions_dict)
+
+        if func_node and not is_macro:
+            func_name = func_node.name
+            if function.count('::') > func_name.count('::'):
                 func_name = function
         else:
-            return ''
-
-        line_to_print = '  ' * depth
-        line_to_print += func_name
-        line_to_print += ' '
-        line_to_print += source_file
-        line_to_print += ' '
-        line_to_print += str(line_number)
-        line_to_print += '\n'
-
-        if (function in visited_functions or not func_node or not source_code
-                or not function):
-            return line_to_print
-
-        callsites = func_node.base_callsites
-        visited_functions.add(function)
+            func_node = None
+            func_name = function
 
-        for cs, line in callsites:
-            is_macro = bool(func_node and func_node.is_macro
-                            and func_node.name != 'fuzz_target')
-            other_props = {}
-            other_props['is_macro'] = is_macro
-            line_to_print += self.extract_calltree(
-                source_code.source_file,
-                function=cs,
-                visited_functions=visited_functions,
-                depth=depth + 1,
-                line_number=line,
-                other_props=other_props)
+        if not func_node or not source_code:
+            return func_name, function, None
 
-        return line_to_print
+        callee_props = {
+            'is_macro':
+            bool(func_node.is_macro and func_node.name != 'fuzz_target')
+        }
+        callee_source_file = source_code.source_file
+        return func_name, function, ((callee_source_file, None, cs, line,
+                                      callee_props)
+                                     for cs, line in func_node.base_callsites)
 
     def get_reachable_functions(
             self,
@@ -910,17 +882,19 @@ class RustProject(datatypes.Project[RustSourceCodeFile]):
 
 
 def load_treesitter_trees(source_files: list[str],
-                          is_log: bool = True) -> RustProject:
+                          is_log: bool = True,
+                          jobs: Optional[int] = 1) -> RustProject:
     """Creates treesitter trees for all files in a given list of
-    source files."""
-    results = []
-
-    for code_file in source_files:
-        source_cls = RustSourceCodeFile('rust', code_file)
-        if is_log:
+    source files, using `jobs` worker processes."""
+    results = datatypes.load_source_files(RustSourceCodeFile,
+                                          'rust',
+                                          source_files,
+                                          jobs=jobs)
+
+    if is_log:
+        for source_cls in results:
             if source_cls.has_libfuzzer_harness():
-                logger.info('harness: %s', code_file)
-        results.append(source_cls)
+                logger.info('harness: %s', source_cls.source_file)
 
     return RustProject(results)
 
@@ -933,10 +907,15 @@ def analyse_source_code(source_content: str) -> RustSourceCodeFile:
     return source_code
 
 
-def get_function_node(target_name: str,
-                      function_map: dict[str, RustFunction],
-                      one_layer_only: bool = False) -> Optional[RustFunction]:
-    """Helper to retrieve the RustFunction object of a function."""
+def get_function_node(
+    target_name: str,
+    function_map: dict[str, RustFunction],
+    one_layer_only: bool = False,
+    callgraph_index: Optional[datatypes.CallgraphIndex] = None
+) -> Optional[RustFunction]:
+    """Helper to retrieve the RustFunction object of a function. If given,
+    the callgraph index of the functions in function_map is used for the
+    suffix matching."""
 
     # Exact match
     if target_name in function_map:
@@ -949,8 +928,14 @@ def get_function_node(target_name: str,
     else:
         name_split = target_name.split('::')
     for count in range(len(name_split)):
+        suffix = '::'.join(name_split[count:])
+        if callgraph_index is not None:
+            match = callgraph_index.find_function_by_suffix(suffix)
+            if match is not None:
+                return match
+            continue
         for func_name, func in function_map.items():
-            if func_name.endswith('::'.join(name_split[count:])):
+            if func_name.endswith(suffix):
                 return func
 
     return None
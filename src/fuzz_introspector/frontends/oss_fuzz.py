@@ -56,15 +56,29 @@ def capture_source_files_in_tree(directory_tree: str,
     return language_files
 
 
-def analyse_folder(
-        language: str = '',
-        directory: str = '',
-        entrypoint: str = '',
-        out='',
-        module_only=False,
-        dump_output=True,
-        files_to_include: Optional[list[str]] = None) -> tuple[Project, Any]:
-    """Runs a full frontend analysis on a given directory"""
+def _get_calltree_limit(env_var: str) -> Optional[int]:
+    """Reads an optional limit on the size of the calltrees from the
+    environment, e.g. FI_CALLTREE_MAX_DEPTH or FI_CALLTREE_MAX_NODES."""
+    limit = os.environ.get(env_var, '')
+    if not limit:
+        return None
+    try:
+        return int(limit)
+    except ValueError:
+        logger.warning('Ignoring invalid %s: %s', env_var, limit)
+        return None
+
+
+def analyse_folder(language: str = '',
+                   directory: str = '',
+                   entrypoint: str = '',
+                   out='',
+                   module_only=False,
+                   dump_output=True,
+                   files_to_include: Optional[list[str]] = None,
+                   jobs: Optional[int] = 1) -> tuple[Project, Any]:
+    """Runs a full frontend analysis on a given directory. Source files
+    are processed by `jobs` worker processes, or one per core if None."""
 
     if not files_to_include:
         files_to_include = []
@@ -86,21 +100,23 @@ def analyse_folder(
         if not project.get_source_codes_with_harnesses():
             module_only = True
 
-        project = frontend_c_cpp.load_treesitter_trees(source_files)
+        project = frontend_c_cpp.load_treesitter_trees(source_files, jobs=jobs)
     elif language == constants.LANGUAGES.GO:
         logger.info('Going Go route')
         logger.info('Loading tree-sitter trees and create base project')
-        project = frontend_go.load_treesitter_trees(source_files)
+        project = frontend_go.load_treesitter_trees(source_files, jobs=jobs)
     elif language == constants.LANGUAGES.JAVA:
         logger.info('Going JVM route')
         logger.info('Loading tree-sitter trees and create base project')
         if not entrypoint:
             entrypoint = 'fuzzerTestOneInput'
-        project = frontend_jvm.load_treesitter_trees(source_files, entrypoint)
+        project = frontend_jvm.load_treesitter_trees(source_files,
+                                                     entrypoint,
+                                                     jobs=jobs)
     elif language == constants.LANGUAGES.RUST:
         logger.info('Going Rust route')
         logger.info('Loading tree-sitter trees and create base project')
-        project = frontend_rust.load_treesitter_trees(source_files)
+        project = frontend_rust.load_treesitter_trees(source_files, jobs=jobs)
     else:
         logger.error('Unsupported language: %s', language)
         return Project([]), []
@@ -161,14 +177,19 @@ def analyse_folder(
                                   dump_output=dump_output)
 
         # Calltree
-        logger.info('Extracting calltree for %s', harness_name)
-        calltree = project.extract_calltree(harness.source_file, harness,
-                                            entry_function)
-        logger.info('Calltree extracted')
         if dump_output:
+            logger.info('Extracting calltree for %s', harness_name)
             target = os.path.join(out, f'fuzzerLogFile-{harness_name}.data')
             with open(target, 'w', encoding='utf-8') as f:
-                f.write(f'Call tree\n{calltree}')
+                f.write('Call tree\n')
+                project.write_calltree(
+                    f,
+                    harness.source_file,
+                    harness,
+                    entry_function,
+                    max_depth=_get_calltree_limit('FI_CALLTREE_MAX_DEPTH'),
+                    max_nodes=_get_calltree_limit('FI_CALLTREE_MAX_NODES'))
+            logger.info('Calltree extracted')
 
         for textcov in textcov_reports:
             cov_name = textcov.replace('.covreport', '')
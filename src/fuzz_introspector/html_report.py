@@ -57,13 +57,73 @@ def create_overview_table(
     return html_string
 
 
+# Keys of the rows of the all functions table in the HTML report, in order.
+# The json report has the same keys first, followed by the raw function
+# details, so both share a single dictionary per function.
+ALL_FUNCTION_TABLE_ROW_KEYS = (
+    'Func name',
+    'func_url',
+    'Functions filename',
+    'Args',
+    'Function call depth',
+    'Reached by Fuzzers',
+    'Runtime reached by Fuzzers',
+    'Combined reached by Fuzzers',
+    'collapsible_id',
+    'Fuzzers runtime hit',
+    'Func lines hit %',
+    'I Count',
+    'BB Count',
+    'Cyclomatic complexity',
+    'Functions reached',
+    'Reached by functions',
+    'Accumulated cyclomatic complexity',
+    'Undiscovered complexity',
+    'asserts',
+)
+
+
+class AllFunctionsTableRows:
+    """Rows of the all functions table, as shown in the HTML report.
+
+    The rows are views of the json report rows. Only the values that are
+    HTML-formatted in the table are kept for each row, and the remaining
+    values are read from the json report row when the rows are iterated.
+    The function signature is kept as well when a row has one, as it may be
+    replaced in the json report once debug information is correlated.
+    """
+
+    def __init__(self, report_rows: List[Dict[str, Any]]) -> None:
+        self.report_rows = report_rows
+        self.html_values: List[Dict[str, Any]] = []
+
+    def append(self, html_values: Dict[str, Any]) -> None:
+        """Adds the HTML values of the last row of the json report."""
+        self.html_values.append(html_values)
+
+    def __len__(self) -> int:
+        return len(self.html_values)
+
+    def __iter__(self) -> typing.Iterator[Dict[str, Any]]:
+        for report_row, html_values in zip(self.report_rows, self.html_values):
+            row_element = {
+                key:
+                html_values[key] if key in html_values else report_row[key]
+                for key in ALL_FUNCTION_TABLE_ROW_KEYS
+            }
+            if 'function_signature' in html_values:
+                row_element['function_signature'] = html_values[
+                    'function_signature']
+            yield row_element
+
+
 def create_all_function_table(
     tables: List[str],
     proj_profile: project_profile.MergedProjectProfile,
     coverage_url: str,
     basefolder: str,
     table_id: Optional[str] = None
-) -> Tuple[str, List[typing.Dict[str, Any]], List[typing.Dict[str, Any]]]:
+) -> Tuple[str, AllFunctionsTableRows, List[typing.Dict[str, Any]]]:
     """Table for all functions in the project. Contains many details about each
         function"""
     random_suffix = '_' + ''.join(
@@ -80,8 +140,8 @@ def create_all_function_table(
     # an array in development to replace html generation in python.
     # this will be stored as a json object and will be used to populate
     # the table in the frontend
-    table_rows_json_html = []
-    table_rows_json_report = []
+    table_rows_json_report: List[Dict[str, Any]] = []
+    table_rows_json_html = AllFunctionsTableRows(table_rows_json_report)
 
     for fd_k, fd in proj_profile.get_all_functions_with_source().items():
         if proj_profile.target_lang == "rust":
@@ -131,15 +191,24 @@ def create_all_function_table(
         else:
             args_row = "0"
 
-        row_element = {
+        # The json report has raw text where the table has HTML-formatted
+        # text. Those values are kept on the side for the HTML table.
+        html_values = {
             "Func name": func_name_row,
-            "func_url": func_cov_url,
-            "Functions filename": fd.function_source_file,
             "Args": args_row,
-            "Function call depth": fd.function_depth,
             "Reached by Fuzzers": reached_by_fuzzers_row,
             "Runtime reached by Fuzzers": reached_by_fuzzers_runtime_row,
             "Combined reached by Fuzzers": reached_by_fuzzers_combined_row,
+        }
+        row_element = {
+            "Func name": demangled_func_name,
+            "func_url": func_cov_url,
+            "Functions filename": fd.function_source_file,
+            "Args": fd.arg_types,
+            "Function call depth": fd.function_depth,
+            "Reached by Fuzzers": fd.reached_by_fuzzers,
+            "Runtime reached by Fuzzers": fd.reached_by_fuzzers_runtime,
+            "Combined reached by Fuzzers": fd.reached_by_fuzzers_combined,
             "collapsible_id": collapsible_id,
             "Fuzzers runtime hit": func_hit_at_runtime_row,
             "Func lines hit %": "%.5s" % (str(hit_percentage)) + "%",
@@ -157,31 +226,22 @@ def create_all_function_table(
         # Add function signature if exist
         if fd.signature:
             row_element['function_signature'] = fd.signature
-
-        table_rows_json_html.append(row_element)
-
-        # Add the entry to json list.
-        # Overwrite some fields to have raw text and not HTML-formatted text.
-        json_copy = row_element.copy()
-        json_copy['Func name'] = demangled_func_name
-        json_copy['Args'] = fd.arg_types
-        json_copy['ArgNames'] = fd.arg_names
-        json_copy['Reached by Fuzzers'] = fd.reached_by_fuzzers
-        json_copy['Runtime reached by Fuzzers'] = fd.reached_by_fuzzers_runtime
-        json_copy[
-            'Combined reached by Fuzzers'] = fd.reached_by_fuzzers_combined
-        json_copy['return_type'] = fd.return_type
-        json_copy['raw-function-name'] = fd.raw_function_name
-        json_copy['callsites'] = fd.callsite
-        json_copy['source_line_begin'] = fd.function_linenumber
-        json_copy['source_line_end'] = fd.function_line_number_end
-        json_copy['is_accessible'] = fd.is_accessible
-        json_copy['is_jvm_library'] = fd.is_jvm_library
-        json_copy['is_enum_class'] = fd.is_enum
-        json_copy['is_static'] = fd.is_static
-        json_copy['need_close'] = fd.need_close
-        json_copy['exceptions'] = fd.exceptions
-        table_rows_json_report.append(json_copy)
+            html_values['function_signature'] = fd.signature
+
+        row_element['ArgNames'] = fd.arg_names
+        row_element['return_type'] = fd.return_type
+        row_element['raw-function-name'] = fd.raw_function_name
+        row_element['callsites'] = fd.callsite
+        row_element['source_line_begin'] = fd.function_linenumber
+        row_element['source_line_end'] = fd.function_line_number_end
+        row_element['is_accessible'] = fd.is_accessible
+        row_element['is_jvm_library'] = fd.is_jvm_library
+        row_element['is_enum_class'] = fd.is_enum
+        row_element['is_static'] = fd.is_static
+        row_element['need_close'] = fd.need_close
+        row_element['exceptions'] = fd.exceptions
+        table_rows_json_report.append(row_element)
+        table_rows_json_html.append(html_values)
 
     logger.info("Assembled a total of %d entries" %
                 (len(table_rows_json_report)))
@@ -536,10 +596,10 @@ def write_content_to_html_files(html_full_doc, all_functions_json_html,
 
     :param html_full_doc: content of the main fuzz_report.html file
 
-    :param all_functions_json_html: dictionary in json format for all functions
-      in the all functions table. These will be written ot a javascript file
-      that is then loaded dynamically in the browser to reduce overhead of
-      loading it all by way of hte .html file.
+    :param all_functions_json_html: rows of the all functions table. These
+      will be written ot a javascript file that is then loaded dynamically in
+      the browser to reduce overhead of loading it all by way of hte .html
+      file. The rows are written one at a time.
 
     :param fuzzer_table_data: data for tables for each fuzzer, in the detailed
       fuzzer section. To be written in a javascript file that is loaded
@@ -552,16 +612,16 @@ def write_content_to_html_files(html_full_doc, all_functions_json_html,
         report_file.write(html_helpers.prettify_html(html_full_doc))
 
     # Dump function data to the relevant javascript file.
-    with open(os.path.join(out_dir, constants.ALL_FUNCTION_JS),
-              'w') as all_function_file:
-        all_function_file.write("var all_functions_table_data = ")
-        all_function_file.write(json.dumps(all_functions_json_html))
+    json_report.write_json_records(all_functions_json_html,
+                                   os.path.join(out_dir,
+                                                constants.ALL_FUNCTION_JS),
+                                   prefix="var all_functions_table_data = ")
 
     # Dump table data to relevant javascript file.
-    with open(os.path.join(out_dir, constants.FUZZER_TABLE_JS),
-              'w') as js_file_fd:
-        js_file_fd.write("var fuzzer_table_data = ")
-        js_file_fd.write(json.dumps(fuzzer_table_data))
+    json_report.write_json_stream(fuzzer_table_data,
+                                  os.path.join(out_dir,
+                                               constants.FUZZER_TABLE_JS),
+                                  prefix="var fuzzer_table_data = ")
 
     # Copy all of the styling into the directory.
     styling.copy_style_files(out_dir)
@@ -723,8 +783,8 @@ def get_body_script_tags(all_functions_json, fuzzer_table_data) -> str:
             html_script_tags += '</script>\n'
 
         html_script_tags += '<script>\n'
-        html_script_tags += 'var all_functions_table_data = %s' % (
-            json.dumps(all_functions_json))
+        html_script_tags += 'var all_functions_table_data = %s' % (json.dumps(
+            list(all_functions_json)))
         html_script_tags += '</script>\n'
 
         html_script_tags += '<script>\n'
@@ -842,9 +902,11 @@ def create_html_report(introspection_proj: analysis.IntrospectionProject,
 
     # Correlate debug info to introspector functions
     analysis.correlate_introspection_functions_to_debug_info(
-        all_functions_json_report, introspection_proj.debug_all_functions,
+        all_functions_json_report,
+        introspection_proj.debug_all_functions,
         introspection_proj.proj_profile.target_lang,
-        introspection_proj.debug_report)
+        introspection_proj.debug_report,
+        jobs=introspection_proj.jobs)
 
     all_test_files = analysis.extract_test_information(
         introspection_proj.debug_report,
@@ -15,13 +15,164 @@
 import os
 import json
 import logging
+import itertools
+import contextlib
 
-from typing import (Any, Dict)
+from typing import (Any, Dict, Iterable, Iterator, Optional)
 
 from fuzz_introspector import constants
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ModuleNotFoundError:
+    _HAS_ORJSON = False
+
 logger = logging.getLogger(name=__name__)
 
+# Size of the chunks of encoded json gathered before writing them out.
+JSON_WRITE_CHUNK_SIZE = 1 << 20
+
+
+def _write_json_chunks(chunks: Iterable[str], path: str) -> None:
+    """Writes the encoded json `chunks` to `path`. The chunks are gathered
+    and written in large blocks as they are produced, so very large reports
+    are never held in memory as one string. The file is written to a
+    temporary file first and renamed, so readers never see a partial report.
+    """
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            pending = []
+            pending_size = 0
+            for chunk in chunks:
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= JSON_WRITE_CHUNK_SIZE:
+                    f.write(''.join(pending))
+                    pending = []
+                    pending_size = 0
+            f.write(''.join(pending))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_stream(obj: Any, path: str, prefix: str = '') -> None:
+    """Writes `obj` as json to `path`, in the same format as json.dump,
+    preceded by `prefix`."""
+    _write_json_chunks(
+        itertools.chain((prefix, ),
+                        json.JSONEncoder().iterencode(obj)), path)
+
+
+def _encode_json_record(record: Any) -> str:
+    """Encodes a single record, with orjson if it is installed. orjson
+    rejects some values the json module accepts, e.g. integers larger than
+    64 bits, and does not escape non-ASCII characters. Those records are
+    encoded by the json module instead, so the reports stay ASCII."""
+    if _HAS_ORJSON:
+        try:
+            encoded = orjson.dumps(record)
+        except TypeError:
+            encoded = b''
+        if encoded and encoded.isascii():
+            return encoded.decode('ascii')
+    return json.dumps(record)
+
+
+def _iter_json_record_chunks(records: Iterable[Any],
+                             prefix: str) -> Iterator[str]:
+    yield prefix
+    yield '['
+    separator = ''
+    for record in records:
+        yield separator
+        yield _encode_json_record(record)
+        separator = ', '
+    yield ']'
+
+
+def write_json_records(records: Iterable[Any],
+                       path: str,
+                       prefix: str = '') -> None:
+    """Writes the records as a json list to `path`, preceded by `prefix`.
+    The records are consumed and encoded one at a time, so they can be
+    produced by a generator instead of being collected in a list first."""
+    _write_json_chunks(_iter_json_record_chunks(records, prefix), path)
+
+
+class JsonReportBuilder:
+    """Collects the json reports of a run in memory, and writes each of them
+    once when flushed. The reports already on disk are read once, the first
+    time they are changed, so keys from previous runs are kept as when
+    updating the files directly."""
+
+    def __init__(self, out_dir: str) -> None:
+        self.out_dir = out_dir
+        self.pid = os.getpid()
+        self.summary: Optional[Dict[Any, Any]] = None
+        self.branch_blockers: Optional[Dict[Any, Any]] = None
+
+    def get_summary(self) -> Dict[Any, Any]:
+        if self.summary is None:
+            self.summary = _get_summary_dict(self.out_dir)
+        return self.summary
+
+    def get_branch_blockers(self) -> Dict[Any, Any]:
+        if self.branch_blockers is None:
+            self.branch_blockers = _get_branch_blockers_dict(self.out_dir)
+        return self.branch_blockers
+
+    def flush(self) -> None:
+        """Writes the reports that were changed since the last flush."""
+        if self.summary is not None and constants.should_dump_files:
+            write_json_stream(
+                self.summary, os.path.join(self.out_dir,
+                                           constants.SUMMARY_FILE))
+        if self.branch_blockers is not None:
+            write_json_stream(
+                self.branch_blockers,
+                os.path.join(self.out_dir, constants.BRANCH_BLOCKERS_FILE))
+        self.summary = None
+        self.branch_blockers = None
+
+
+# Builders of the runs in progress, by output directory.
+_report_builders: Dict[str, JsonReportBuilder] = dict()
+
+
+@contextlib.contextmanager
+def batched_reports(out_dir: str) -> Iterator[JsonReportBuilder]:
+    """Collects the json reports written to `out_dir` in memory, and writes
+    them when leaving the context."""
+    key = os.path.abspath(out_dir)
+    if key in _report_builders:
+        yield _report_builders[key]
+        return
+
+    builder = JsonReportBuilder(out_dir)
+    _report_builders[key] = builder
+    try:
+        yield builder
+    finally:
+        del _report_builders[key]
+        builder.flush()
+
+
+def _get_report_builder(out_dir: str) -> Optional[JsonReportBuilder]:
+    """Returns the builder collecting the reports of `out_dir`. Worker
+    processes write to disk directly, as the builder of their parent is not
+    shared with them."""
+    builder = _report_builders.get(os.path.abspath(out_dir))
+    if builder is None or builder.pid != os.getpid():
+        return None
+    return builder
+
 
 def _get_summary_dict(out_dir) -> Dict[Any, Any]:
     """Returns the current json report on disk as a dictionary."""
@@ -47,6 +198,24 @@ def _overwrite_report_with_dict(new_dict: Dict[Any, Any], out_dir) -> None:
         json.dump(dict(new_dict), report_fd)
 
 
+def _update_summary(out_dir, section: str, key: str, value: Any) -> None:
+    """Sets `key` of a section of the summary, in the builder collecting the
+    reports of `out_dir` if any, otherwise in the report on disk."""
+    builder = _get_report_builder(out_dir)
+    if builder is not None:
+        contents = builder.get_summary()
+    else:
+        contents = _get_summary_dict(out_dir)
+
+    # Update the report accordingly
+    if section not in contents:
+        contents[section] = dict()
+    contents[section][key] = value
+
+    if builder is None:
+        _overwrite_report_with_dict(contents, out_dir)
+
+
 def add_analysis_dict_to_json_report(analysis_name: str,
                                      dict_to_add: Dict[Any,
                                                        Any], out_dir) -> None:
@@ -55,12 +224,7 @@ def add_analysis_dict_to_json_report(analysis_name: str,
     Will overwrite the existing key/value pair for the analysis if it already
     exists as an analysis in the report.
     """
-    contents = _get_summary_dict(out_dir)
-    if 'analyses' not in contents:
-        contents['analyses'] = {}
-    contents['analyses'][analysis_name] = dict_to_add
-
-    _overwrite_report_with_dict(contents, out_dir)
+    _update_summary(out_dir, 'analyses', analysis_name, dict_to_add)
 
 
 def add_analysis_json_str_as_dict_to_report(analysis_name: str, json_str: str,
@@ -80,14 +244,7 @@ def add_fuzzer_key_value_to_report(fuzzer_name: str, key: str, value: Any,
     Will overwrite the existing key/value pair under the fuzzer if it already
     exists in the report.
     """
-    contents = _get_summary_dict(out_dir)
-
-    # Update the report accordingly
-    if fuzzer_name not in contents:
-        contents[fuzzer_name] = dict()
-    contents[fuzzer_name][key] = value
-
-    _overwrite_report_with_dict(contents, out_dir)
+    _update_summary(out_dir, fuzzer_name, key, value)
 
 
 def add_project_key_value_to_report(key: str, value: Any, out_dir) -> None:
@@ -96,19 +253,12 @@ def add_project_key_value_to_report(key: str, value: Any, out_dir) -> None:
     Will overwrite the existing key/value pair if the key already exists in
     the report.
     """
-    contents = _get_summary_dict(out_dir)
-
-    # Update the report accordingly
-    if constants.JSON_REPORT_KEY_PROJECT not in contents:
-        contents[constants.JSON_REPORT_KEY_PROJECT] = dict()
-    contents[constants.JSON_REPORT_KEY_PROJECT][key] = value
-
-    _overwrite_report_with_dict(contents, out_dir)
+    _update_summary(out_dir, constants.JSON_REPORT_KEY_PROJECT, key, value)
 
 
 def create_all_fi_functions_json(functions_dict, out_dir) -> None:
-    with open(os.path.join(out_dir, constants.ALL_FUNCTIONS_JSON), 'w') as f:
-        json.dump(functions_dict, f)
+    write_json_records(functions_dict,
+                       os.path.join(out_dir, constants.ALL_FUNCTIONS_JSON))
 
 
 def create_all_jvm_constructor_json(functions_dict, out_dir) -> None:
@@ -117,9 +267,8 @@ def create_all_jvm_constructor_json(functions_dict, out_dir) -> None:
         json.dump(functions_dict, f)
 
 
-def add_branch_blocker_key_value_to_report(profile_identifier, key,
-                                           branch_blockers_list, out_dir):
-    """Returns the current json report on disk as a dictionary."""
+def _get_branch_blockers_dict(out_dir) -> Dict[Any, Any]:
+    """Returns the current branch blockers report on disk as a dictionary."""
     if not os.path.isfile(os.path.join(out_dir,
                                        constants.BRANCH_BLOCKERS_FILE)):
         existing_contents = dict()
@@ -127,7 +276,19 @@ def add_branch_blocker_key_value_to_report(profile_identifier, key,
         with open(os.path.join(out_dir, constants.BRANCH_BLOCKERS_FILE),
                   "r") as report_fd:
             existing_contents = json.load(report_fd)
+    return existing_contents
+
+
+def add_branch_blocker_key_value_to_report(profile_identifier, key,
+                                           branch_blockers_list, out_dir):
+    """Sets the branch blockers of a fuzzer in the branch blockers report."""
+    builder = _get_report_builder(out_dir)
+    if builder is not None:
+        builder.get_branch_blockers(
+        )[profile_identifier] = branch_blockers_list
+        return
 
+    existing_contents = _get_branch_blockers_dict(out_dir)
     existing_contents[profile_identifier] = branch_blockers_list
     with open(os.path.join(out_dir, constants.BRANCH_BLOCKERS_FILE),
               'w') as branch_fd:
@@ -0,0 +1,174 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Reachability analysis of call graphs using bitsets"""
+
+import logging
+
+from typing import (
+    Dict,
+    List,
+)
+
+import numpy as np
+
+logger = logging.getLogger(name=__name__)
+
+
+class ReachabilityGraph:
+    """Transitive reachability and call depth of a call graph.
+
+    Function names are interned to integer IDs and the strongly connected
+    components of the graph are computed once. Reachability is then
+    propagated in reverse topological order of the components, storing the
+    set of functions reached by each function as a bitset in a Python int.
+    Callees that have no outgoing edges of their own, e.g. external
+    functions, are part of the graph as leaves.
+    """
+
+    def __init__(self, call_graph: Dict[str, List[str]]) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = dict()
+        for func_name in call_graph:
+            self._intern(func_name)
+        edges: List[List[int]] = [[] for _ in self.names]
+        for func_name, callees in call_graph.items():
+            func_edges = edges[self.ids[func_name]]
+            for callee in callees:
+                callee_id = self._intern(callee)
+                if callee_id == len(edges):
+                    edges.append([])
+                func_edges.append(callee_id)
+
+        self.reached: List[int] = [0] * len(self.names)
+        self.depth: List[int] = [0] * len(self.names)
+        self._propagate(edges)
+
+    def _intern(self, func_name: str) -> int:
+        func_id = self.ids.get(func_name)
+        if func_id is None:
+            func_id = len(self.names)
+            self.ids[func_name] = func_id
+            self.names.append(func_name)
+        return func_id
+
+    def _propagate(self, edges: List[List[int]]) -> None:
+        """Computes the bitsets and depths of all functions. Tarjan's
+        algorithm emits the components in reverse topological order, so the
+        components called by a given component are always done first."""
+        for component in _strongly_connected_components(edges):
+            if len(component) == 1:
+                func_id = component[0]
+                reached = 0
+                depth = 0
+                recursive = False
+                for callee in edges[func_id]:
+                    if callee == func_id:
+                        reached |= 1 << callee
+                        recursive = True
+                        continue
+                    reached |= self.reached[callee] | (1 << callee)
+                    depth = max(depth, self.depth[callee] + 1)
+                self.reached[func_id] = reached
+                self.depth[func_id] = depth + 1 if recursive else depth
+                continue
+
+            # All functions in a cycle reach each other and everything any
+            # of them reaches. The cycle itself adds one to the depth.
+            members = set(component)
+            reached = 0
+            depth = 0
+            for func_id in component:
+                reached |= 1 << func_id
+                for callee in edges[func_id]:
+                    if callee in members:
+                        continue
+                    reached |= self.reached[callee] | (1 << callee)
+                    depth = max(depth, self.depth[callee] + 1)
+            for func_id in component:
+                self.reached[func_id] = reached
+                self.depth[func_id] = depth + 1
+
+    def names_of(self, mask: int) -> List[str]:
+        """Names of the functions set in a bitset, in ID order."""
+        if mask == 0:
+            return []
+        mask_bytes = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        bits = np.unpackbits(np.frombuffer(mask_bytes, dtype=np.uint8),
+                             bitorder='little')
+        return [self.names[func_id] for func_id in np.flatnonzero(bits)]
+
+    def reached_names(self, func_name: str) -> List[str]:
+        """Names of all functions transitively reached by `func_name`."""
+        func_id = self.ids.get(func_name)
+        if func_id is None:
+            return []
+        return self.names_of(self.reached[func_id])
+
+    def function_depth(self, func_name: str) -> int:
+        """Length of the longest call chain from `func_name`, where each
+        cycle on the chain counts as a single call."""
+        func_id = self.ids.get(func_name)
+        if func_id is None:
+            return 0
+        return self.depth[func_id]
+
+
+def _strongly_connected_components(edges: List[List[int]]) -> List[List[int]]:
+    """Iterative version of Tarjan's algorithm. Returns the components in
+    reverse topological order."""
+    index = [-1] * len(edges)
+    lowlink = [0] * len(edges)
+    on_stack = [False] * len(edges)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    next_index = 0
+
+    for root in range(len(edges)):
+        if index[root] != -1:
+            continue
+        index[root] = lowlink[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            node, edge_idx = work[-1]
+            node_edges = edges[node]
+            if edge_idx < len(node_edges):
+                work[-1] = (node, edge_idx + 1)
+                callee = node_edges[edge_idx]
+                if index[callee] == -1:
+                    index[callee] = lowlink[callee] = next_index
+                    next_index += 1
+                    stack.append(callee)
+                    on_stack[callee] = True
+                    work.append((callee, 0))
+                elif on_stack[callee]:
+                    lowlink[node] = min(lowlink[node], index[callee])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
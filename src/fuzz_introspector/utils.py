@@ -14,6 +14,7 @@
 """ Utility functions """
 
 import cxxfilt
+import hashlib
 import rust_demangler
 import logging
 import json
@@ -93,31 +94,27 @@ def data_file_read_yaml(filename: str) -> Optional[dict[Any, Any]]:
     except Exception:
         logger.info('Could not set CSafeLoader as base loader')
 
+    # The LLVM frontend may put multiple docs in the same yaml file, see
+    # commit 737ba72, so read all documents in a single pass.
     try:
         with open(filename, 'r') as stream:
-            data_dict: dict[Any, Any] = yaml.safe_load(stream)
-            logger.info('Loaded single yaml module')
-            return data_dict
-    except Exception:
-        # YAML library does not completely wrap exceptions, so unless
-        # we catch all exceptions here we might end up in a crashing state.
-        # This likely fails as the LLVM frontend now is putting multiple docs in
-        # same yaml file. See commit 737ba72.
-        pass
-
-    # Try loading multiple yaml files in the fuzz introspector format
-    # We need this because we have different formats for each language.
-    logger.info('Trying to load multiple file formats together.')
-    try:
-        with open(filename, 'r') as yaml_f:
-            data = yaml_f.read()
-            docs = yaml.safe_load_all(data)
+            docs = list(yaml.safe_load_all(stream))
     except Exception as e:
         # YAML library does not completely wrap exceptions, so unless
         # we catch all exceptions here we might end up in a crashing state.
         logger.info('Failed loading YAML: %s', str(e))
         return None
 
+    if not docs:
+        return None
+    if len(docs) == 1:
+        logger.info('Loaded single yaml module')
+        data_dict: dict[Any, Any] = docs[0]
+        return data_dict
+
+    # Merge multiple yaml files in the fuzz introspector format
+    # We need this because we have different formats for each language.
+    logger.info('Merging multiple yaml documents together.')
     content = {}
     try:
         for doc in docs:
@@ -144,6 +141,15 @@ def data_file_read_yaml(filename: str) -> Optional[dict[Any, Any]]:
     return content
 
 
+def file_sha256(filename: str) -> str:
+    """Returns the hex sha256 digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def demangle_cpp_func(funcname: str) -> str:
     try:
         demangled: str = cxxfilt.demangle(funcname.replace(' ', ''))
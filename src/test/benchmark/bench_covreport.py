@@ -0,0 +1,128 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the LLVM .covreport parser on synthetic coverage reports"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../../")
+
+from fuzz_introspector import code_coverage  # noqa: E402
+
+HITCOUNTS = ['0', '1', '12', '4.68k', '9.36k', '5.99M', '1.20G', '']
+
+
+def synthetic_function(rand: random.Random, idx: int) -> str:
+    """Generates the coverage of a single function in the llvm-cov show
+    format, with source lines, macro expansions, branches and switches."""
+    lines = [f'_ZN9benchmark8functionEi{idx}:']
+    line_number = rand.randint(1, 10000)
+    for _ in range(rand.randint(5, 60)):
+        line_number += 1
+        hits = rand.choice(HITCOUNTS)
+        kind = rand.random()
+        if kind < 0.05:
+            lines.append(f'{line_number:>6}|{hits:>7}|  switch (state) {{')
+            lines.append('  ------------------')
+            lines.append(f'  |  Branch ({line_number}:11): '
+                         f'[True: {rand.choice(HITCOUNTS[:-1])}, False: 0]')
+            lines.append('  ------------------')
+            for _ in range(rand.randint(1, 4)):
+                line_number += 1
+                lines.append(f'{line_number:>6}|{hits:>7}|  case {idx}:')
+                lines.append('  ------------------')
+                lines.append(
+                    f'  |  Branch ({line_number}:3): '
+                    f'[True: {rand.choice(HITCOUNTS[:-1])}, False: 12]')
+                lines.append('  ------------------')
+        elif kind < 0.15:
+            lines.append(f'{line_number:>6}|{hits:>7}|  if (size < {idx}) '
+                         'return -1;')
+            lines.append('  ------------------')
+            lines.append(
+                f'  |  Branch ({line_number}:7): '
+                f'[True: {rand.choice(HITCOUNTS[:-1])}, False: 4.68k]')
+            lines.append('  ------------------')
+        elif kind < 0.20:
+            lines.append(f'{line_number:>6}|{hits:>7}|  CHECK(ptr);')
+            lines.append('  ------------------')
+            lines.append('  |  |   39|      0|#define CHECK(x) assert(x)')
+            lines.append('  ------------------')
+        elif kind < 0.22:
+            lines.append(f'{line_number:>6}|{hits:>7}|  // lowercase comment')
+        else:
+            lines.append(f'{line_number:>6}|{hits:>7}|  value = '
+                         f'compute(value, {idx});')
+    lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def write_synthetic_covreport(path: str, size_mb: int, seed: int = 0) -> int:
+    """Writes a synthetic covreport of roughly size_mb megabytes. Returns
+    the number of bytes written."""
+    rand = random.Random(seed)
+    target_size = size_mb * 1024 * 1024
+    written = 0
+    idx = 0
+    with open(path, 'w') as f:
+        while written < target_size:
+            chunk = ''.join(
+                synthetic_function(rand, idx + i) for i in range(1000))
+            idx += 1000
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb',
+                        type=int,
+                        default=2048,
+                        help='Size of each synthetic report in MB.')
+    parser.add_argument('--reports',
+                        type=int,
+                        default=1,
+                        help='Number of reports to generate and parse.')
+    parser.add_argument('--work-dir',
+                        type=str,
+                        default=None,
+                        help='Folder for the synthetic reports.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+        total_bytes = 0
+        for idx in range(args.reports):
+            report_path = os.path.join(work_dir, f'fuzzer{idx}.covreport')
+            total_bytes += write_synthetic_covreport(report_path,
+                                                     args.size_mb,
+                                                     seed=idx)
+
+        start = time.perf_counter()
+        cov_profile = code_coverage.load_llvm_coverage(work_dir)
+        elapsed = time.perf_counter() - start
+
+    total_mb = total_bytes / (1024 * 1024)
+    print(f'Parsed {args.reports} report(s), {total_mb:.1f} MB, '
+          f'{len(cov_profile.covmap)} functions and '
+          f'{len(cov_profile.branch_cov_map)} branches in {elapsed:.2f}s: '
+          f'{total_mb / elapsed:.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark the calltree blocker detection on synthetic calltrees"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../../")
+
+from fuzz_introspector import analysis  # noqa: E402
+
+
+def synthetic_calltree(node_count: int, red_ratio: float, seed: int = 0):
+    """Generates the preorder arrays of a calltree, where subtrees are left
+    without coverage with the given probability."""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([-2, -1, 0, 1, 1], size=node_count)
+    steps[0] = 0
+    depths = np.zeros(node_count, dtype=np.int64)
+    depth = 0
+    hit_zero = np.zeros(node_count, dtype=bool)
+    red_depth = -1
+    reds = rng.random(node_count) < red_ratio
+    for idx, step in enumerate(steps.tolist()):
+        depth = max(1, depth + step) if idx > 0 else 0
+        depths[idx] = depth
+        if red_depth != -1 and depth <= red_depth:
+            red_depth = -1
+        if red_depth == -1 and reds[idx]:
+            red_depth = depth
+        hit_zero[idx] = red_depth != -1
+    complexities = rng.integers(0, 50, size=node_count, dtype=np.int64)
+    return hit_zero, depths, complexities
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--min-exponent',
+                        type=int,
+                        default=4,
+                        help='Smallest calltree has 10^min-exponent nodes.')
+    parser.add_argument('--max-exponent',
+                        type=int,
+                        default=7,
+                        help='Largest calltree has 10^max-exponent nodes.')
+    parser.add_argument('--red-ratio',
+                        type=float,
+                        default=0.01,
+                        help='Probability of a subtree without coverage.')
+    args = parser.parse_args()
+
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        node_count = 10**exponent
+        hit_zero, depths, complexities = synthetic_calltree(
+            node_count, args.red_ratio)
+        start = time.perf_counter()
+        forward_reds, _, skipped = analysis.calltree_forward_reds(
+            hit_zero, depths, complexities)
+        elapsed = time.perf_counter() - start
+        print(f'{node_count:>10} nodes, {int(hit_zero.sum()):>10} red, '
+              f'{int((~skipped).sum()):>10} blockers: {elapsed:.3f}s, '
+              f'{elapsed / node_count * 1e9:.1f} ns/node')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers shared by the fuzzer profile tests"""
+
+
+def function_elem(name,
+                  reached=(),
+                  complexity=None,
+                  linenumber=None,
+                  source_file='/src/lib.c',
+                  branches=(),
+                  **fields):
+    """Returns a function element of the "All functions" section of a
+    fuzzer profile. Other keys of the element are set by `fields`."""
+    elem = {
+        "functionName": name,
+        "functionsReached": list(reached),
+        "functionSourceFile": source_file,
+        "linkageType": None,
+        "functionLinenumber": linenumber,
+        "returnType": None,
+        "argCount": None,
+        "argTypes": None,
+        "argNames": None,
+        "BBCount": None,
+        "ICount": None,
+        "EdgeCount": None,
+        "CyclomaticComplexity": complexity,
+        "functionUses": None,
+        "functionDepth": None,
+        "constantsTouched": None,
+        "BranchProfiles": list(branches),
+        "Callsites": []
+    }
+    elem.update(fields)
+    return elem
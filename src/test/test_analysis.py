@@ -0,0 +1,358 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test analysis.py"""
+
+import os
+import concurrent.futures
+import multiprocessing
+import sys
+import json
+import random
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import analysis  # noqa: E402
+from fuzz_introspector import cfg_load  # noqa: E402
+from fuzz_introspector import code_coverage  # noqa: E402
+from fuzz_introspector import constants  # noqa: E402
+from fuzz_introspector.datatypes import fuzzer_profile  # noqa: E402
+from fuzz_introspector.datatypes import project_profile  # noqa: E402
+from fuzz_introspector.exceptions import DataLoaderError  # noqa: E402
+import profile_helpers  # noqa: E402
+
+
+def test_correlate_debug_functions_to_headers(tmpdir):
+    """Headers are matched on `name(` as in the header content"""
+    headers = {
+        'parse.h': 'int parse(const char *data);\nint parse_all (void);\n',
+        'util.hpp': 'void xparse(int);\ntemplate<> int get<int>(int);\n',
+        'notes.txt': 'parse(',
+    }
+    for filename, content in headers.items():
+        with open(os.path.join(tmpdir, filename), 'w') as f:
+            f.write(content)
+    with open(os.path.join(tmpdir, 'binary.h'), 'wb') as f:
+        f.write(b'\xff\xfeparse(')
+    report_dict = {
+        'all_files_in_project': [{
+            'source_file': os.path.join(tmpdir, filename)
+        } for filename in list(headers) + ['binary.h', 'missing.h']]
+    }
+
+    debug_functions = [{
+        'name': name,
+        'source': {
+            'source_file': '/src/lib.c'
+        }
+    } for name in ['parse', 'parse_all', 'get<int>', 'missing']]
+    analysis.correlate_introspection_functions_to_debug_info([],
+                                                             debug_functions,
+                                                             'c-cpp',
+                                                             report_dict)
+
+    possible_headers = [
+        sorted(
+            os.path.basename(header)
+            for header in debug_function['possible-header-files'])
+        for debug_function in debug_functions
+    ]
+    assert possible_headers == [['parse.h', 'util.hpp'], [], ['util.hpp'], []]
+
+    header_index = analysis.HeaderFunctionIndex(
+        [os.path.join(tmpdir, 'parse.h'),
+         os.path.join(tmpdir, 'util.hpp')],
+        parallelise=False)
+    assert header_index.find('arse') == header_index.find('parse')
+    assert header_index.find('parse_') == set()
+
+
+def test_header_function_index_jobs(tmpdir, monkeypatch):
+    """The header pool is bounded by --jobs"""
+    header_files = []
+    for idx in range(3):
+        header_file = os.path.join(tmpdir, f'header{idx}.h')
+        with open(header_file, 'w') as f:
+            f.write(f'int parse{idx}(void);\n')
+        header_files.append(header_file)
+
+    pool_sizes = []
+
+    class ProcessPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+
+        def __init__(self, max_workers):
+            pool_sizes.append(max_workers)
+            super().__init__(max_workers)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor',
+                        ProcessPoolExecutor)
+    expected = analysis.HeaderFunctionIndex(header_files,
+                                            parallelise=False).headers_by_name
+    for jobs in [2, 1]:
+        header_index = analysis.HeaderFunctionIndex(header_files, jobs=jobs)
+        assert header_index.headers_by_name == expected
+    assert pool_sizes == [2]
+
+
+def _forward_reds_loop(hitcounts, depths, complexities):
+    """Reads forward from every node, as the overlay used to."""
+    result = []
+    prev_end = -1
+    for idx1 in range(len(hitcounts)):
+        if hitcounts[idx1] == 0 and (
+            (idx1 > 0 and depths[idx1 - 1] <= depths[idx1])
+                or idx1 < prev_end):
+            result.append((0, 'none'))
+            continue
+        idx2 = idx1 + 1
+        largest_blocked = ''
+        largest_count = 0
+        while idx2 < len(hitcounts) and hitcounts[idx2] == 0:
+            if complexities[idx2] > largest_count:
+                largest_count = complexities[idx2]
+                largest_blocked = idx2
+            idx2 += 1
+        prev_end = idx2 - 1
+        result.append((idx2 - idx1 - 1, largest_blocked))
+    return result
+
+
+def test_calltree_forward_reds():
+    """The suffix scan matches reading forward from every node"""
+    rand = random.Random(21)
+    for _ in range(500):
+        node_count = rand.randint(0, 40)
+        hitcounts = [rand.choice([0, 0, 0, 1, 200]) for _ in range(node_count)]
+        depths = [rand.randint(0, 4) for _ in range(node_count)]
+        complexities = [
+            rand.choice([0, 1, 3, 3, 10]) for _ in range(node_count)
+        ]
+        forward_reds, largest_blocked, skipped = (
+            analysis.calltree_forward_reds(
+                np.array(hitcounts) == 0, np.array(depths, dtype=np.int64),
+                np.array(complexities, dtype=np.int64)))
+        result = [(forward_red, 'none' if node_skipped else
+                   (blocked_idx if blocked_idx >= 0 else ''))
+                  for forward_red, blocked_idx, node_skipped in zip(
+                      forward_reds.tolist(), largest_blocked.tolist(),
+                      skipped.tolist())]
+        assert result == _forward_reds_loop(hitcounts, depths, complexities)
+
+
+CALLTREE = """Call tree
+LLVMFuzzerTestOneInput /src/{name}.c linenumber=-1
+  parse /src/lib.c linenumber=3
+    read /src/lib.c linenumber=12
+    unused /src/lib.c linenumber=14
+      read /src/lib.c linenumber=31
+"""
+
+
+def _overlay_profiles(tmpdir):
+    profiles = []
+    for name, read_hits in [('fuzz1', 5), ('fuzz2', 0)]:
+        parse_branches = [{
+            'Branch String':
+            'lib.c:11,7',
+            'Branch Sides': [{
+                'BranchSide': 'lib.c:12,5',
+                'BranchSideFuncs': ['read']
+            }, {
+                'BranchSide': 'lib.c:14,5',
+                'BranchSideFuncs': ['unused']
+            }]
+        }]
+        elems = [
+            profile_helpers.function_elem("LLVMFuzzerTestOneInput", ["parse"],
+                                          1, 1),
+            profile_helpers.function_elem("parse", ["read", "unused"],
+                                          2,
+                                          10,
+                                          branches=parse_branches),
+            profile_helpers.function_elem("read", [], 3, 20),
+            profile_helpers.function_elem("unused", ["read"], 4, 30),
+        ]
+        profile = fuzzer_profile.FuzzerProfile(
+            os.path.join(tmpdir, f"fuzzerLogFile-{name}.data"), {
+                "Fuzzer filename": f"/src/{name}.c",
+                "All functions": {
+                    "Elements": elems
+                }
+            },
+            "c-cpp",
+            cfg_content=CALLTREE.format(name=name))
+        profile.binary_executable = f"/out/{name}"
+        profile.accummulate_profile(str(tmpdir), None, None, None)
+        coverage = code_coverage.CoverageProfile()
+        coverage.set_type('function')
+        coverage.covmap = {
+            'LLVMFuzzerTestOneInput': [(1, 5), (3, 5)],
+            'parse': [(10, 5), (11, 5), (12, read_hits), (14, 0)],
+        }
+        if read_hits:
+            coverage.covmap['read'] = [(20, read_hits)]
+        coverage.branch_cov_map = {'parse:11,7': [read_hits + 1, 0]}
+        profile.coverage = coverage
+        profiles.append(profile)
+    proj_profile = project_profile.MergedProjectProfile(profiles, "c-cpp")
+    return profiles, proj_profile
+
+
+def _overlay_results(profiles, proj_profile, out_dir):
+    nodes = []
+    for profile in profiles:
+        for node in cfg_load.extract_all_callsites(
+                profile.fuzzer_callsite_calltree):
+            nodes.append(
+                tuple(
+                    getattr(node, attr)
+                    for attr in analysis._OVERLAY_NODE_ATTRS))
+    sides = [
+        (side.reachable_complexity, side.not_covered_complexity) for side in
+        proj_profile.all_functions['parse'].branch_profiles['lib.c:11,7'].sides
+    ]
+    blockers = [[vars(blk) for blk in profile.branch_blockers]
+                for profile in profiles]
+    with open(os.path.join(out_dir, constants.BRANCH_BLOCKERS_FILE)) as f:
+        return nodes, sides, blockers, json.load(f)
+
+
+def test_overlay_all_calltrees_with_coverage(tmpdir):
+    """Overlaying in worker processes matches overlaying serially"""
+    start_method = multiprocessing.get_start_method(allow_none=True)
+    results = []
+    for parallelise in [False, True]:
+        out_dir = os.path.join(tmpdir, f'out-{parallelise}')
+        os.mkdir(out_dir)
+        profiles, proj_profile = _overlay_profiles(tmpdir)
+        analysis.overlay_all_calltrees_with_coverage(profiles,
+                                                     proj_profile,
+                                                     '/covreport',
+                                                     str(tmpdir),
+                                                     out_dir,
+                                                     parallelise,
+                                                     jobs=2)
+        results.append(_overlay_results(profiles, proj_profile, out_dir))
+    assert results[0] == results[1]
+    # The pool does not pin the default start method of the process.
+    assert multiprocessing.get_start_method(allow_none=True) == start_method
+
+    nodes, sides, blockers, report = results[0]
+    assert [node[1] for node in nodes] == [200, 5, 5, 0, 0, 200, 5, 0, 0, 0]
+    assert [node[6] for node in nodes] == [0, 0, 2, 0, 0, 0, 3, 0, 0, 0]
+    assert [node[7]
+            for node in nodes[5:]] == ['', 'unused', 'none', 'none', 'none']
+    # The branch sides are left as computed for the last fuzzer.
+    assert sides == [(3, 3), (7, 7)]
+    assert [len(fuzzer_blockers) for fuzzer_blockers in blockers] == [1, 1]
+    assert list(report) == ['fuzz1', 'fuzz2']
+
+
+class _HitFunctions:
+    """Coverage stub hitting a fixed set of functions."""
+
+    def __init__(self, hit_funcs):
+        self.hit_funcs = hit_funcs
+
+    def is_func_hit(self, funcname):
+        return funcname in self.hit_funcs
+
+
+def _branch_complexities_loop(all_functions, coverage):
+    """Recomputes every side from scratch, as the overlay used to."""
+    result = []
+    for func in all_functions.values():
+        for branch in func.branch_profiles.values():
+            for side_idx, side in enumerate(branch.sides):
+                unique_funcs = branch.get_side_unique_reachable_funcnames(
+                    side_idx)
+                complexities = [0, 0, 0, 0]
+                for fn in side.funcs:
+                    if fn not in all_functions:
+                        continue
+                    comp = all_functions[fn].total_cyclomatic_complexity
+                    hit = coverage.is_func_hit(fn)
+                    complexities[0] += comp
+                    complexities[1] += comp if fn in unique_funcs else 0
+                    complexities[2] += 0 if hit else comp
+                    complexities[3] += comp if (fn in unique_funcs
+                                                and not hit) else 0
+                result.append(tuple(complexities))
+    return result
+
+
+def test_branch_complexity_table():
+    """Side complexities match recomputing them for every fuzzer"""
+    rand = random.Random(23)
+    names = [f'func{idx}' for idx in range(12)]
+    elems = []
+    for name in names:
+        branches = [{
+            'Branch String':
+            f'/src/lib.c:{idx},1',
+            'Branch Sides': [{
+                'BranchSide':
+                f'lib.c:{idx + side},1',
+                'BranchSideFuncs':
+                rand.choices(names + ['external'], k=rand.randint(0, 5))
+            } for side in range(rand.randint(1, 3))]
+        } for idx in range(rand.randint(0, 3))]
+        elems.append(
+            profile_helpers.function_elem(name, [],
+                                          rand.randint(0, 20),
+                                          1,
+                                          branches=branches))
+    data_dict_yaml = {
+        "Fuzzer filename": "/src/fuzz.c",
+        "All functions": {
+            "Elements": elems
+        }
+    }
+    profile = fuzzer_profile.FuzzerProfile('/tmp/fuzzerLogFile-fuzz.data',
+                                           data_dict_yaml,
+                                           "c-cpp",
+                                           cfg_content="")
+    all_functions = profile.all_class_functions
+    for func in all_functions.values():
+        func.total_cyclomatic_complexity = rand.randint(0, 50)
+
+    branch_table = analysis.BranchComplexityTable(all_functions)
+    for _ in range(5):
+        coverage = _HitFunctions(set(rand.sample(names, rand.randint(0, 12))))
+        analysis.update_branch_complexities(all_functions, coverage,
+                                            branch_table)
+        assert [
+            (side.reachable_complexity, side.unique_reachable_complexity,
+             side.not_covered_complexity, side.unique_not_covered_complexity)
+            for side in branch_table.sides
+        ] == _branch_complexities_loop(all_functions, coverage)
+
+
+def test_load_data_files_clears_coverage_cache(tmpdir, monkeypatch):
+    """Covreports parsed for loading the profiles are not kept afterwards"""
+
+    def preload_llvm_coverage(target_dir, is_rust=False, parallelise=True):
+        cache_key = (target_dir, 0, 0, is_rust)
+        code_coverage._llvm_coverage_cache[cache_key] = ({}, {})
+
+    monkeypatch.setattr(code_coverage, 'preload_llvm_coverage',
+                        preload_llvm_coverage)
+    introspection_proj = analysis.IntrospectionProject('c-cpp', str(tmpdir),
+                                                       '')
+    with pytest.raises(DataLoaderError):
+        introspection_proj.load_data_files(parallelise=False,
+                                           correlation_file='')
+    assert not code_coverage._llvm_coverage_cache
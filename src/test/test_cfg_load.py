@@ -70,3 +70,29 @@ def test_cfg_nodes(tmpdir, sample_cfg1):
     assert all_callsites[3].depth == 2
     assert all_callsites[4].depth == 2
     assert all_callsites[5].depth == 2
+
+
+def test_cfg_preorder(tmpdir, sample_cfg1):
+    cfg = _load_cfg(sample_cfg1)
+    all_callsites = cfg_load.extract_all_callsites(cfg)
+    assert all_callsites == cfg.preorder
+    assert all_callsites is not cfg.preorder
+    assert all_callsites == list(cfg_load.iter_callsites(cfg))
+
+    # Extracting a subtree walks the tree.
+    subtree = cfg_load.extract_all_callsites(all_callsites[1])
+    assert subtree == all_callsites[1:]
+    assert all(node.parent_calltree_callsite is all_callsites[1]
+               for node in subtree[1:])
+
+
+def test_cfg_deep_tree():
+    depth = sys.getrecursionlimit() + 100
+    cfg_str = "Call tree\n" + "\n".join(
+        " " * (2 * idx) + f"func{idx} /src/lib.c linenumber={idx}"
+        for idx in range(depth))
+    cfg = _load_cfg(cfg_str)
+    all_callsites = cfg_load.extract_all_callsites(cfg)
+    assert len(all_callsites) == depth
+    assert all_callsites[-1].depth == depth - 1
+    assert list(cfg_load.iter_callsites(cfg)) == all_callsites
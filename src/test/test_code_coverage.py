@@ -16,6 +16,8 @@
 
 import os
 import sys
+import pickle
+import random
 import pytest
 
 sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
@@ -92,6 +94,129 @@ def test_load_llvm_coverage():
         [3260, 36000000, 3260, 3510000, 1570000])
 
 
+def test_load_llvm_coverage_multiple_reports(tmpdir):
+    """Reports parsed in worker processes are merged like serial ones."""
+    with open(os.path.join(TEST_DATA_PATH, 'sample_cov.covreport'), 'rb') as f:
+        content = f.read()
+    for name in ['fuzz1', 'fuzz2']:
+        with open(os.path.join(tmpdir, f'{name}.covreport'), 'wb') as f:
+            f.write(content)
+
+    code_coverage.clear_llvm_coverage_cache()
+    serial = code_coverage.load_llvm_coverage(str(tmpdir), parallelise=False)
+    code_coverage.clear_llvm_coverage_cache()
+    parallel = code_coverage.load_llvm_coverage(str(tmpdir))
+    assert len(parallel.coverage_files) == 2
+    assert parallel.covmap == serial.covmap
+    assert parallel.branch_cov_map == serial.branch_cov_map
+
+    single = code_coverage.load_llvm_coverage(TEST_DATA_PATH, 'sample_cov')
+    assert serial.covmap == single.covmap
+
+
+def test_load_llvm_coverage_cache(tmpdir, monkeypatch):
+    """Reports are parsed once per run, and once across runs on disk."""
+    with open(os.path.join(TEST_DATA_PATH, 'sample_cov.covreport'), 'rb') as f:
+        content = f.read()
+    for name in ['fuzz1', 'fuzz2']:
+        with open(os.path.join(tmpdir, f'{name}.covreport'), 'wb') as f:
+            f.write(content)
+
+    parsed = []
+    parse_report = code_coverage.parse_llvm_coverage_report
+
+    def counting_parse(profile_file, is_rust=False):
+        parsed.append(os.path.basename(profile_file))
+        return parse_report(profile_file, is_rust)
+
+    monkeypatch.setattr(code_coverage, 'parse_llvm_coverage_report', counting_parse)
+    monkeypatch.setenv('FI_COVERAGE_CACHE_DIR', os.path.join(tmpdir, 'cache'))
+    code_coverage.clear_llvm_coverage_cache()
+
+    code_coverage.preload_llvm_coverage(str(tmpdir), parallelise=False)
+    first = code_coverage.load_llvm_coverage(str(tmpdir), 'unknown', parallelise=False)
+    code_coverage.load_llvm_coverage(str(tmpdir), 'fuzz1', parallelise=False)
+    # Both reports have the same content, the second one hits the disk cache.
+    assert len(parsed) == 1
+
+    # A new run loads the reports from disk.
+    code_coverage.clear_llvm_coverage_cache()
+    second = code_coverage.load_llvm_coverage(str(tmpdir), 'unknown', parallelise=False)
+    assert len(parsed) == 1
+    assert second.covmap == first.covmap
+    assert second.branch_cov_map == first.branch_cov_map
+
+    # Changed reports are parsed again.
+    with open(os.path.join(tmpdir, 'fuzz2.covreport'), 'ab') as f:
+        f.write(b'\n')
+    code_coverage.load_llvm_coverage(str(tmpdir), 'fuzz2', parallelise=False)
+    assert len(parsed) == 2 and parsed[-1] == 'fuzz2.covreport'
+    code_coverage.clear_llvm_coverage_cache()
+
+
+def test_coverage_profile_line_lookups():
+    """Line lookups match the covmap entries of a function."""
+    cp = code_coverage.CoverageProfile()
+    cp.set_type("function")
+    cp.covmap['parse'] = [(10, 5), (11, 0), (12, 3), (12, 0), (13, -1)]
+    cp.covmap['crate::module::func'] = [(1, 2)]
+
+    assert cp.get_line_hitcount('parse', 10) == 5
+    assert cp.get_line_hitcount('parse', 11) == 0
+    assert cp.get_line_hitcount('parse', 12) == 3
+    assert cp.get_line_hitcount('parse', 13) == 0
+    assert cp.get_line_hitcount('parse', 99) == 0
+    assert cp.get_line_hitcount('unknown', 10) == 0
+    assert cp.is_func_lineno_hit('parse', 12)
+    assert cp.is_func_lineno_hit('parse', 13)
+    assert not cp.is_func_lineno_hit('parse', 11)
+    assert cp.get_hit_summary('parse') == (5, 2)
+    assert cp.get_hit_summary('unknown') == (None, None)
+
+    # Functions with missing crate resolve to the full key.
+    assert cp.get_func_key('module::func') == 'crate::module::func'
+    assert cp.get_line_hitcount('other::func', 1) == 2
+
+    # Updated and added entries are picked up.
+    cp.covmap['parse'] = [(10, 0)]
+    assert cp.get_line_hitcount('parse', 10) == 0
+    assert cp.get_func_key('new') is None
+    cp.covmap['new'] = [(1, 1)]
+    assert cp.get_func_key('new') == 'new'
+
+    # The lookup indices are not pickled.
+    copy = pickle.loads(pickle.dumps(cp))
+    assert '_line_hits' not in copy.__getstate__()
+    assert copy.get_line_hitcount('new', 1) == 1
+
+
+def test_coverage_profile_rust_keys():
+    """Rust key lookups match a linear scan of the covmap."""
+    rand = random.Random(4321)
+    parts = ['a', 'b', 'ab', 'ba', 'fuzz', 'z']
+    cp = code_coverage.CoverageProfile()
+    for _ in range(300):
+        name = '::'.join(rand.choice(parts) for _ in range(rand.randint(1, 4)))
+        cp.covmap[name] = []
+    for _ in range(300):
+        name = '::'.join(rand.choice(parts) for _ in range(rand.randint(1, 5)))
+        expected = code_coverage.utils.locate_rust_fuzz_key(name, cp.covmap)
+        assert cp._locate_rust_fuzz_key(name) == expected
+
+
+def test_iter_buffer_lines(tmpdir):
+    """Lines are kept intact across chunk boundaries."""
+    lines = [b'a' * length for length in [0, 3, 17, 1, 40, 2]]
+    path = os.path.join(tmpdir, 'lines.txt')
+    with open(path, 'wb') as f:
+        f.write(b'\n'.join(lines))
+    with open(path, 'rb') as f:
+        buf = code_coverage.mmap.mmap(f.fileno(), 0, access=code_coverage.mmap.ACCESS_READ)
+        for chunk_size in [1, 5, 16, 1 << 20]:
+            assert list(code_coverage._iter_buffer_lines(buf, chunk_size)) == lines
+        buf.close()
+
+
 def write_coverage_file(tmpdir, coverage_file):
     # Write the coverage_file
     path = os.path.join(tmpdir, "jacoco.xml")
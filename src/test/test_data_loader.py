@@ -0,0 +1,368 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test data_loader.py"""
+
+import os
+import multiprocessing
+import sys
+import yaml
+import pytest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import code_coverage  # noqa: E402
+from fuzz_introspector import constants  # noqa: E402
+from fuzz_introspector import data_loader  # noqa: E402
+from fuzz_introspector import utils  # noqa: E402
+from fuzz_introspector.frontends import datatypes  # noqa: E402
+import profile_helpers  # noqa: E402
+
+
+def _func_elem(name, source_file='/src/fuzz.c'):
+    return profile_helpers.function_elem(name, ['target_func'],
+                                         3,
+                                         10,
+                                         source_file,
+                                         linkageType='',
+                                         functionLinenumberEnd=20,
+                                         returnType='int',
+                                         argCount=1,
+                                         argTypes=['char *'],
+                                         argNames=['data'],
+                                         BBCount=3,
+                                         ICount=12,
+                                         EdgeCount=4,
+                                         functionUses=1,
+                                         functionDepth=2,
+                                         constantsTouched=['0x41', 7],
+                                         signature=f'int {name}(char *data)')
+
+
+@pytest.fixture
+def frontend_yaml_dict():
+    return {
+        'Fuzzer filename': '/src/fuzz.c',
+        'Fuzzing method': 'LLVMFuzzerTestOneInput',
+        'All functions': {
+            'Elements': [
+                _func_elem('LLVMFuzzerTestOneInput'),
+                _func_elem('target_func', '/src/lib.c')
+            ]
+        }
+    }
+
+
+def test_stream_frontend_yaml(tmpdir, frontend_yaml_dict):
+    """Streaming loader gives the same data as the safe loader"""
+    yaml_file = os.path.join(tmpdir, 'fuzzerLogFile-fuzz.data.yaml')
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.safe_dump(frontend_yaml_dict))
+
+    data_dict, functions = data_loader.stream_frontend_yaml(yaml_file)
+    assert data_dict is not None
+    assert functions is not None
+    assert data_dict['Fuzzer filename'] == '/src/fuzz.c'
+    assert data_dict['Fuzzing method'] == 'LLVMFuzzerTestOneInput'
+
+    expected = utils.data_file_read_yaml(yaml_file)
+    assert expected is not None
+    assert len(functions) == len(expected['All functions']['Elements'])
+    for func, elem in zip(functions, expected['All functions']['Elements']):
+        assert func.raw_function_name == elem['functionName']
+        assert func.function_source_file == elem['functionSourceFile']
+        assert func.constants_touched == elem['constantsTouched']
+        assert func.functions_reached == elem['functionsReached']
+
+
+def test_stream_frontend_yaml_multiple_docs(tmpdir, frontend_yaml_dict):
+    """Function elements of multiple documents are merged"""
+    second_doc = {
+        'All functions': {
+            'Elements': [_func_elem('other_func', '/src/other.c')]
+        }
+    }
+    yaml_file = os.path.join(tmpdir, 'fuzzerLogFile-fuzz.data.yaml')
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.safe_dump_all([frontend_yaml_dict, second_doc]))
+
+    data_dict, functions = data_loader.stream_frontend_yaml(yaml_file)
+    assert data_dict is not None
+    assert functions is not None
+    assert data_dict['Fuzzer filename'] == '/src/fuzz.c'
+    assert [func.raw_function_name for func in functions] == [
+        'LLVMFuzzerTestOneInput', 'target_func', 'other_func'
+    ]
+
+
+def test_stream_frontend_yaml_invalid(tmpdir):
+    """Invalid yaml is not fatal"""
+    yaml_file = os.path.join(tmpdir, 'fuzzerLogFile-fuzz.data.yaml')
+    with open(yaml_file, 'w') as f:
+        f.write('All functions: [\n')
+
+    assert data_loader.stream_frontend_yaml(yaml_file) == (None, None)
+
+
+def test_read_frontend_yaml_cache(tmpdir, frontend_yaml_dict):
+    """The sidecar cache is used until the yaml content changes"""
+    yaml_file = os.path.join(tmpdir, 'fuzzerLogFile-fuzz.data.yaml')
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.safe_dump(frontend_yaml_dict))
+
+    data_dict, functions = data_loader.read_frontend_yaml(yaml_file)
+    cache_file = data_loader._profile_cache_path(yaml_file)
+    assert os.path.isfile(cache_file)
+    assert functions is not None and len(functions) == 2
+
+    cached_dict, cached_functions = data_loader.read_frontend_yaml(yaml_file)
+    assert cached_dict == data_dict
+    assert cached_functions is not None
+    assert [func.function_name for func in cached_functions
+            ] == [func.function_name for func in functions]
+
+    # Changing the yaml must invalidate the cache.
+    frontend_yaml_dict['All functions']['Elements'].pop()
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.safe_dump(frontend_yaml_dict))
+    _, functions = data_loader.read_frontend_yaml(yaml_file)
+    assert functions is not None and len(functions) == 1
+
+    # A corrupt cache is ignored.
+    with open(cache_file, 'wb') as f:
+        f.write(b'not a cache')
+    _, functions = data_loader.read_frontend_yaml(yaml_file)
+    assert functions is not None and len(functions) == 1
+
+
+def test_read_frontend_yaml_shared_function_table(tmpdir, monkeypatch,
+                                                  frontend_yaml_dict):
+    """Harnesses of the same project load the function table once"""
+    monkeypatch.setattr(data_loader, '_function_tables', {})
+    project = datatypes.Project([])
+    project.report = frontend_yaml_dict
+    yaml_files = []
+    for name in ['fuzz1', 'fuzz2']:
+        yaml_file = os.path.join(tmpdir, f'fuzzerLogFile-{name}.data.yaml')
+        project.dump_module_logic(yaml_file, harness_source=f'/src/{name}.c')
+        yaml_files.append(yaml_file)
+
+    # The files are still complete yaml documents.
+    content = utils.data_file_read_yaml(yaml_files[1])
+    assert content is not None
+    assert content['Fuzzer filename'] == '/src/fuzz2.c'
+    assert len(content['All functions']['Elements']) == 2
+
+    # Nothing is written next to the data files.
+    data_loader.read_frontend_yaml(yaml_files[0])
+    assert sorted(os.listdir(tmpdir)) == [
+        'fuzzerLogFile-fuzz1.data.yaml', 'fuzzerLogFile-fuzz2.data.yaml'
+    ]
+
+    cache_dir = os.path.join(tmpdir, 'cache')
+    monkeypatch.setenv('FI_FUNCTION_TABLE_CACHE_DIR', cache_dir)
+    data_loader._function_tables.clear()
+    data_dict, functions = data_loader.read_frontend_yaml(yaml_files[0])
+    assert data_dict is not None and functions is not None
+    table_digest = data_dict[constants.FUNCTION_TABLE_DIGEST_KEY]
+    assert os.path.isfile(
+        data_loader._function_table_cache_path(cache_dir, table_digest))
+    assert not os.path.isfile(data_loader._profile_cache_path(yaml_files[0]))
+
+    # Each profile gets its own copy of the shared table, either from this
+    # process or from the cache on disk.
+    for _ in range(2):
+        shared_dict, shared_functions = data_loader.read_frontend_yaml(
+            yaml_files[1])
+        assert shared_dict is not None and shared_functions is not None
+        assert shared_dict['Fuzzer filename'] == '/src/fuzz2.c'
+        assert [func.function_name for func in shared_functions
+                ] == [func.function_name for func in functions]
+        assert shared_functions[0] is not functions[0]
+        data_loader._function_tables.clear()
+
+    # A table that no longer matches its digest is parsed in full.
+    with open(yaml_files[1]) as f:
+        content = f.read()
+    with open(yaml_files[1], 'w') as f:
+        f.write(content.replace('target_func', 'other_func'))
+    shared_dict, shared_functions = data_loader.read_frontend_yaml(
+        yaml_files[1])
+    assert shared_dict is not None and shared_functions is not None
+    assert constants.FUNCTION_TABLE_DIGEST_KEY not in shared_dict
+    assert shared_functions[1].function_name == 'other_func'
+
+
+def test_load_all_profiles_clears_function_tables(tmpdir, monkeypatch,
+                                                  frontend_yaml_dict):
+    """Shared function tables are dropped once the profiles are loaded"""
+    monkeypatch.setattr(data_loader, '_function_tables', {})
+    project = datatypes.Project([])
+    project.report = frontend_yaml_dict
+    for name in ['fuzz1', 'fuzz2']:
+        data_file = os.path.join(tmpdir, f'fuzzerLogFile-{name}.data')
+        with open(data_file, 'w') as f:
+            f.write('Call tree\n'
+                    'LLVMFuzzerTestOneInput /src/fuzz.c linenumber=-1\n')
+        project.dump_module_logic(f'{data_file}.yaml',
+                                  harness_source=f'/src/{name}.c')
+
+    profiles = data_loader.load_all_profiles(str(tmpdir), 'c-cpp', False)
+    assert len(profiles) == 2
+    assert not data_loader._function_tables
+
+
+def _function_table_worker(yaml_file):
+    """Reads a frontend yaml file as a profile does, returns the number of
+    function tables parsed in this worker and the functions read."""
+    parsed = []
+    construct_all_functions = data_loader._construct_all_functions
+
+    def counting_construct(*args):
+        parsed.append(yaml_file)
+        return construct_all_functions(*args)
+
+    data_loader._construct_all_functions = counting_construct
+    try:
+        _, functions = data_loader.read_frontend_yaml(yaml_file)
+    finally:
+        data_loader._construct_all_functions = construct_all_functions
+    return len(parsed), [func.function_name for func in functions]
+
+
+def test_profile_workers_share_function_tables(tmpdir, monkeypatch,
+                                               frontend_yaml_dict):
+    """Workers that are not forked reuse the tables preloaded by the parent"""
+    monkeypatch.setattr(data_loader, '_function_tables', {})
+    monkeypatch.delenv('FI_FUNCTION_TABLE_CACHE_DIR', raising=False)
+    project = datatypes.Project([])
+    project.report = frontend_yaml_dict
+    yaml_files = []
+    for name in ['fuzz1', 'fuzz2', 'fuzz3']:
+        yaml_file = os.path.join(tmpdir, f'fuzzerLogFile-{name}.data.yaml')
+        project.dump_module_logic(yaml_file, harness_source=f'/src/{name}.c')
+        yaml_files.append(yaml_file)
+
+    parsed = []
+    construct_all_functions = data_loader._construct_all_functions
+
+    def counting_construct(*args):
+        parsed.append(args)
+        return construct_all_functions(*args)
+
+    monkeypatch.setattr(data_loader, '_construct_all_functions',
+                        counting_construct)
+    monkeypatch.setattr(data_loader, '_profile_pool_context',
+                        lambda: multiprocessing.get_context('spawn'))
+    data_loader.preload_function_tables(yaml_files)
+    assert len(parsed) == 1
+
+    results = data_loader._run_profile_jobs(
+        _function_table_worker, [(yaml_file, ) for yaml_file in yaml_files],
+        True, 'c-cpp', 2)
+    assert results == [(0, ['LLVMFuzzerTestOneInput', 'target_func'])] * 3
+
+
+@pytest.mark.parametrize('parallelise,handoff', [(True, 'pipe'),
+                                                 (True, 'file'),
+                                                 (False, '')])
+def test_load_all_profiles(tmpdir, monkeypatch, frontend_yaml_dict,
+                           parallelise, handoff):
+    """Profiles are loaded and accummulated in the workers"""
+    monkeypatch.setenv('FI_PROFILE_HANDOFF', handoff)
+    for name in ['fuzz1', 'fuzz2']:
+        data_file = os.path.join(tmpdir, f'fuzzerLogFile-{name}.data')
+        with open(data_file, 'w') as f:
+            f.write('Call tree\n'
+                    'LLVMFuzzerTestOneInput /src/fuzz.c linenumber=-1\n'
+                    '  target_func /src/lib.c linenumber=12\n')
+        with open(f'{data_file}.yaml', 'w') as f:
+            f.write(yaml.safe_dump(frontend_yaml_dict))
+
+    profiles = data_loader.load_all_profiles(str(tmpdir),
+                                             'c-cpp',
+                                             parallelise,
+                                             jobs=2)
+    data_files = sorted(
+        os.path.basename(profile.introspector_data_file)
+        for profile in profiles)
+    assert data_files == ['fuzzerLogFile-fuzz1.data', 'fuzzerLogFile-fuzz2.data']
+    for profile in profiles:
+        assert 'target_func' in profile.functions_reached_by_fuzzer
+
+
+def _coverage_worker(target_dir):
+    """Loads all covreports of a directory as a profile does, returns the
+    reports parsed in this worker."""
+    parsed = []
+    parse_report = code_coverage.parse_llvm_coverage_report
+
+    def counting_parse(profile_file, is_rust=False):
+        parsed.append(os.path.basename(profile_file))
+        return parse_report(profile_file, is_rust)
+
+    code_coverage.parse_llvm_coverage_report = counting_parse
+    try:
+        code_coverage.load_llvm_coverage(target_dir, 'unknown')
+    finally:
+        code_coverage.parse_llvm_coverage_report = parse_report
+    return parsed
+
+
+def test_profile_workers_share_coverage(tmpdir, monkeypatch):
+    """Workers that are not forked reuse the covreports of the parent"""
+    test_data_path = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                  'data')
+    with open(os.path.join(test_data_path, 'sample_cov.covreport'),
+              'rb') as f:
+        content = f.read()
+    for name in ['fuzz1', 'fuzz2']:
+        with open(os.path.join(tmpdir, f'{name}.covreport'), 'wb') as f:
+            f.write(content)
+
+    parsed = []
+    parse_report = code_coverage.parse_llvm_coverage_report
+
+    def counting_parse(profile_file, is_rust=False):
+        parsed.append(os.path.basename(profile_file))
+        return parse_report(profile_file, is_rust)
+
+    monkeypatch.setattr(code_coverage, 'parse_llvm_coverage_report',
+                        counting_parse)
+    monkeypatch.setattr(data_loader, '_profile_pool_context',
+                        lambda: multiprocessing.get_context('spawn'))
+    code_coverage.clear_llvm_coverage_cache()
+    try:
+        code_coverage.preload_llvm_coverage(str(tmpdir), parallelise=False)
+        worker_parsed = data_loader._run_profile_jobs(
+            _coverage_worker, [(str(tmpdir), ), (str(tmpdir), )], True,
+            'c-cpp', 2)
+    finally:
+        code_coverage.clear_llvm_coverage_cache()
+    assert sorted(parsed) == ['fuzz1.covreport', 'fuzz2.covreport']
+    assert worker_parsed == [[], []]
+
+
+def test_load_all_harness_profiles(tmpdir, frontend_yaml_dict):
+    """Profiles from in-memory frontend data are created in the workers"""
+    calltree = ('Call tree\n'
+                'LLVMFuzzerTestOneInput /src/fuzz.c linenumber=-1\n'
+                '  target_func /src/lib.c linenumber=12\n')
+    profiles = data_loader.load_all_harness_profiles(
+        [(frontend_yaml_dict, calltree), (frontend_yaml_dict, calltree)],
+        str(tmpdir),
+        'c-cpp',
+        jobs=2)
+    assert len(profiles) == 2
+    for profile in profiles:
+        assert 'target_func' in profile.functions_reached_by_fuzzer
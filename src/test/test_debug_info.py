@@ -0,0 +1,308 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test debug_info.py"""
+
+import json
+import os
+import concurrent.futures
+import sys
+
+import pytest
+import yaml
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import constants  # noqa: E402
+from fuzz_introspector import debug_info  # noqa: E402
+
+DEBUG_INFO = """<--- Debug Information for Module 2.0 --->
+Compile unit: DW_LANG_C99 /src/fuzz.c
+Compile unit: DW_LANG_C99 /src//build/lib.c
+
+## Functions defined in module
+Subprogram: parse
+ from /src/lib.h:12 ('parse')
+ - Operand Type: Name: {  int}Type:  DW_ATE_signed
+ - Operand Type: Type:  DW_TAG_pointer_type, DW_TAG_const_type,  char
+ - Operand Type: Name: {  size_t}Type:  from /src/types.h:3 DW_TAG_typedef
+
+Subprogram: LLVMFuzzerTestOneInput
+ from /src/fuzz.c:20
+ - Operand Type: Name: {  int}Type:  DW_ATE_signed
+
+## Global variables in module
+Global variable: counter from /src/lib.c:4
+
+## Types defined in module
+Type: Name: {  point} from /src/geometry.h:7 DW_TAG_structure_type Composite type
+ - Elements: 2
+ - Elem 0{  x from /src/geometry.h:8 }
+ - Elem 1{  y from /src/geometry.h:9 }
+
+Type: Name: {  size_t} from /src/types.h:3 DW_TAG_typedef
+
+"""
+
+
+def _expected_report(debug_files):
+    """Runs the individual scanners one after the other over each file."""
+    all_files = dict()
+    functions = dict()
+    global_variables = dict()
+    types = dict()
+    for debug_file in debug_files:
+        with open(debug_file) as f:
+            content = f.read()
+        debug_info.extract_all_compile_units(content, all_files)
+        debug_info.extract_all_functions_in_debug_info(content, functions,
+                                                       all_files)
+        debug_info.extract_global_variables(content, global_variables,
+                                            all_files)
+        debug_info.extract_types(content, types, all_files)
+    return {
+        'all_files_in_project': list(all_files.values()),
+        'all_functions_in_project': list(functions.values()),
+        'all_global_variables': list(global_variables.values()),
+        'all_types': list(types.values())
+    }
+
+
+@pytest.mark.parametrize('parallelise', [True, False])
+def test_load_debug_report(tmpdir, parallelise):
+    """The single pass parser matches the individual scanners"""
+    debug_files = []
+    for idx in range(2):
+        debug_file = os.path.join(tmpdir, f'fuzzer{idx}.debug_info')
+        with open(debug_file, 'w') as f:
+            f.write(DEBUG_INFO.replace('counter', f'counter{idx}'))
+        debug_files.append(debug_file)
+
+    report = debug_info.load_debug_report(debug_files, parallelise, jobs=2)
+    assert report == _expected_report(debug_files)
+
+    source_files = [
+        elem['source_file'] for elem in report['all_files_in_project']
+    ]
+    assert source_files == [
+        '/src/fuzz.c', '/build/lib.c', '/src/lib.h', '/src/lib.c',
+        '/src/geometry.h', '/src/types.h'
+    ]
+    parse = report['all_functions_in_project'][0]
+    assert parse['name'] == 'parse'
+    assert parse['return_type'] == 'int'
+    assert parse['args'] == ['const char *', 'size_t']
+    assert parse['source'] == {
+        'source_file': '/src/lib.h',
+        'source_line': '12'
+    }
+    # Entries are keyed by location, the last file wins.
+    assert [var['name']
+            for var in report['all_global_variables']] == ['counter1']
+    assert report['all_types'][0]['name'] == 'point'
+    assert [elem['name']
+            for elem in report['all_types'][0]['elements']] == ['x', 'y']
+
+
+def test_load_debug_report_jobs(tmpdir, monkeypatch):
+    """The number of parser processes is bounded by the jobs limit"""
+    debug_files = []
+    for idx in range(3):
+        debug_file = os.path.join(tmpdir, f'fuzzer{idx}.debug_info')
+        with open(debug_file, 'w') as f:
+            f.write(DEBUG_INFO)
+        debug_files.append(debug_file)
+
+    pool_sizes = []
+
+    class ProcessPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+
+        def __init__(self, max_workers):
+            pool_sizes.append(max_workers)
+            super().__init__(max_workers)
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor',
+                        ProcessPoolExecutor)
+    expected = debug_info.load_debug_report(debug_files, parallelise=False)
+    assert debug_info.load_debug_report(debug_files, jobs=2) == expected
+    assert debug_info.load_debug_report(debug_files, jobs=1) == expected
+    assert pool_sizes == [2]
+
+
+def _debug_type(addr, name, tag='DW_TAG_base_type'):
+    return {
+        'tag': tag,
+        'name': name,
+        'file_location': '/src/types.h:3',
+        'type_idx': 0,
+        'addr': addr,
+        'base_type_addr': 0,
+        'base_type_string': '',
+        'scope': 0,
+        'enum_elems': [],
+        'const_size': 0
+    }
+
+
+@pytest.mark.parametrize('parallelise', [True, False])
+def test_load_debug_all_yaml_files(tmpdir, monkeypatch, parallelise):
+    """Debug yaml files are loaded in order and cached by content"""
+    monkeypatch.setattr(constants, 'should_dump_files', True)
+    type_lists = [
+        [
+            _debug_type(16, 'int'),
+            _debug_type(32, 'point', 'DW_TAG_structure_type')
+        ],
+        [],
+        [_debug_type(16, '_Bool'), {
+            'addr': 48,
+            'name': 'odd'
+        }],
+    ]
+    yaml_files = []
+    for idx, types in enumerate(type_lists):
+        yaml_file = os.path.join(tmpdir, f'types{idx}.debug_all_types')
+        with open(yaml_file, 'w') as f:
+            f.write(yaml.dump(types) if types else '')
+        yaml_files.append(yaml_file)
+    expected = type_lists[0] + type_lists[2]
+
+    for _ in range(2):
+        assert debug_info.load_debug_all_yaml_files(yaml_files,
+                                                    parallelise) == expected
+    assert os.path.isfile(
+        os.path.join(tmpdir, '.types0.debug_all_types.ficache'))
+
+    # Stale caches are ignored.
+    with open(yaml_files[1], 'w') as f:
+        f.write(yaml.dump([_debug_type(64, 'long')]))
+    expected[2:2] = [_debug_type(64, 'long')]
+    assert debug_info.load_debug_all_yaml_files(yaml_files,
+                                                parallelise) == expected
+
+    # The table behaves as the records indexed by address in a dict, where
+    # the last record of an address wins.
+    type_table = debug_info.DebugTypeTable(yaml_files, parallelise)
+    type_dict = {int(elem['addr']): elem for elem in expected}
+    assert list(type_table.records()) == expected
+    assert len(type_table) == len(type_dict) == 4
+    assert list(type_table) == list(type_dict)
+    assert list(type_table.items()) == list(type_dict.items())
+    assert type_table[16]['name'] == '_Bool'
+    assert type_table.get('32')['name'] == 'point'
+    assert type_table.get(48) == {'addr': 48, 'name': 'odd'}
+    assert 64 in type_table
+    assert type_table.get(17) is None
+    assert -1 not in type_table
+    with pytest.raises(KeyError):
+        type_table[17]
+
+    type_table.rename_types('_Bool', 'bool')
+    type_table.rename_types('odd', 'even')
+    assert type_table[16]['name'] == 'bool'
+    assert type_table[48]['name'] == 'even'
+    assert type_table[32]['name'] == 'point'
+
+
+def test_correlate_debugged_function_to_debug_types(tmpdir):
+    """Correlating with a type table matches correlating with type lists"""
+    types = [
+        _debug_type(16, 'int'),
+        _debug_type(32, '', 'DW_TAG_pointer_type'),
+        _debug_type(48, 'counter', 'DW_TAG_member'),
+        _debug_type(64, 'point', 'DW_TAG_structure_type'),
+    ]
+    types[1]['base_type_addr'] = 16
+    types[2]['base_type_addr'] = 32
+    types[2]['scope'] = 64
+    yaml_file = os.path.join(tmpdir, 'types.debug_all_types')
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.dump(types))
+
+    outputs = []
+    for all_types in [
+            debug_info.load_debug_all_yaml_files([yaml_file], False),
+            debug_info.DebugTypeTable([yaml_file], False)
+    ]:
+        out_dir = os.path.join(tmpdir, f'out{len(outputs)}')
+        os.mkdir(out_dir)
+        functions = [{
+            'type_arguments': [32, 16, 64],
+            'file_location': '/src/lib.c:3'
+        }]
+        debug_info.correlate_debugged_function_to_debug_types(
+            all_types, functions, out_dir)
+        with open(os.path.join(out_dir,
+                               'all-friendly-debug-types.json')) as f:
+            outputs.append((f.read(), functions))
+    assert outputs[0] == outputs[1]
+    assert outputs[1][1][0]['func_signature_elems']['return_type'] == [
+        'DW_TAG_pointer_type', 'DW_TAG_base_type', 'int'
+    ]
+
+
+def test_syzkaller_get_struct_type_elems(tmpdir):
+    """Struct members are found in type tables as in type lists"""
+    types = [
+        _debug_type(16, 'int'),
+        _debug_type(48, 'counter', 'DW_TAG_member'),
+        _debug_type(64, 'point', 'DW_TAG_structure_type'),
+    ]
+    types[1]['base_type_addr'] = 16
+    types[1]['scope'] = 64
+    yaml_file = os.path.join(tmpdir, 'types.debug_all_types')
+    with open(yaml_file, 'w') as f:
+        f.write(yaml.dump(types))
+
+    members = debug_info.syzkaller_get_struct_type_elems(
+        'point', debug_info.load_debug_all_yaml_files([yaml_file], False))
+    assert [member['elem_name'] for member in members] == ['counter']
+    assert debug_info.syzkaller_get_struct_type_elems(
+        'point', debug_info.DebugTypeTable([yaml_file], False)) == members
+
+
+def test_friendly_type_resolver(tmpdir):
+    """Memoized type tags match walking each chain, including cycles"""
+    types = {
+        16: _debug_type(16, 'int'),
+        32: _debug_type(32, '', 'DW_TAG_pointer_type'),
+        48: _debug_type(48, '', 'DW_TAG_const_type'),
+        64: _debug_type(64, '', 'DW_TAG_array_type'),
+        80: _debug_type(80, '', 'DW_TAG_typedef'),
+        96: _debug_type(96, '', 'DW_TAG_pointer_type'),
+    }
+    types[32]['base_type_addr'] = 48
+    types[48]['base_type_addr'] = 16
+    types[64]['base_type_addr'] = 32
+    types[64]['const_size'] = 4
+    types[80]['base_type_addr'] = 96
+    types[96]['base_type_addr'] = 80
+
+    resolver = debug_info.FriendlyTypeResolver(types)
+    assert resolver.tags(64) == ('DW_TAG_array_type', 'ARRAY-SIZE: 4',
+                                 'DW_TAG_pointer_type', 'DW_TAG_const_type',
+                                 'DW_TAG_base_type', 'int')
+    assert resolver.tags(96) == ('DW_TAG_pointer_type', 'DW_TAG_typedef',
+                                 'Infinite loop')
+    for addr in list(types) + [0, 128]:
+        assert list(resolver.tags(addr)) == (
+            debug_info.extract_func_sig_friendly_type_tags(addr, types))
+    # Equal chains are shared.
+    assert resolver.tags('64') is resolver.tags(64)
+
+    debug_info.create_friendly_debug_types(types, tmpdir)
+    with open(os.path.join(tmpdir, 'all-friendly-debug-types.json')) as f:
+        friendly_types = json.load(f)
+    assert list(friendly_types) == [str(addr) for addr in types]
+    assert friendly_types['32']['friendly-info']['string_type'] == (
+        'const int *')
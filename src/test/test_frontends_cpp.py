@@ -13,7 +13,11 @@
 # limitations under the License.
 """Unit testing script for the CPP frontend"""
 
+import io
 import os
+import sys
+import inspect
+from fuzz_introspector.frontends import frontend_c_cpp  # noqa: E402
 from fuzz_introspector.frontends import oss_fuzz  # noqa: E402
 
 
@@ -164,3 +168,147 @@ def test_tree_sitter_cpp_sample7():
         'sample2.cpp']
     assert 'func1' in calltrees['sample1.cpp'] and 'func2' not in calltrees[
         'sample1.cpp']
+
+
+def test_tree_sitter_cpp_function_uses_and_depth():
+    project, _ = oss_fuzz.analyse_folder(
+        'c++',
+        'src/test/data/source-code/cpp/test-project-3',
+        'LLVMFuzzerTestOneInput',
+        dump_output=False,
+    )
+    project.generate_report()
+    functions = {
+        elem['functionName']: elem
+        for elem in project.report['All functions']['Elements']
+    }
+
+    # Callers defined after their callees are counted as well.
+    for level in range(1, 6):
+        func = functions[f'DeepNamespace::level{level}']
+        assert func['functionDepth'] == 5 - level
+        if level > 1:
+            assert func['functionUses'] > 0
+            xrefs = project.get_cross_references_by_name(
+                f'DeepNamespace::level{level}')
+            assert f'DeepNamespace::level{level - 1}' in [
+                xref.name for xref in xrefs
+            ]
+
+
+def test_tree_sitter_cpp_symbol_table():
+    first = frontend_c_cpp.analyse_source_code(
+        'namespace ns { int helper(int x) { return x; } }\n'
+        'int shared(void) { return 1; }\n'
+        'int Foo::bar(void) { return 2; }\n')
+    second = frontend_c_cpp.analyse_source_code(
+        'int shared(void) { return 3; }\n'
+        'int helper(void) { return 4; }\n')
+    project = frontend_c_cpp.CppProject([first])
+
+    result = project._find_source_with_func_def('shared')
+    assert result and result[0] is first and result[1].start_line == 2
+    result = project._find_source_with_func_def('ns::helper')
+    assert result and result[0] is first
+    assert project._find_source_with_func_def('bar') is None
+    assert project._find_source_with_func_def('helper') is None
+
+    # Adding a source file invalidates the symbol table, names defined in
+    # both files are ambiguous.
+    project.source_code_files.append(second)
+    assert project._find_source_with_func_def('shared') is None
+    assert project._find_source_with_func_def('ns::helper') is None
+    result = project._find_source_with_func_def('helper')
+    assert result and result[0] is second
+    result = project._find_source_with_func_def('Foo::bar')
+    assert result and result[0] is first
+
+    functions = first.func_defs + second.func_defs
+    node = frontend_c_cpp.get_function_node('shared', functions)
+    assert node is first.func_defs[2]
+    node = frontend_c_cpp.get_function_node('Other::Foo::bar', functions)
+    assert node is first.func_defs[3]
+    assert frontend_c_cpp.get_function_node('std::shared', functions) is None
+    frontend_c_cpp.clear_function_node_cache()
+
+
+def test_tree_sitter_cpp_frontend_cache(tmpdir, monkeypatch):
+    cache_dir = os.path.join(tmpdir, 'cache')
+    monkeypatch.setenv('FI_FRONTEND_CACHE_DIR', cache_dir)
+    source_file = os.path.join(tmpdir, 'fuzzer.c')
+    with open(source_file, 'w') as f:
+        f.write('#include <stdio.h>\n'
+                'int target(int x) { return x + 1; }\n'
+                'int LLVMFuzzerTestOneInput(const char *data, int size) {\n'
+                '  return target(size);\n'
+                '}\n')
+
+    project = frontend_c_cpp.load_treesitter_trees([source_file])
+    assert len(os.listdir(cache_dir)) == 1
+    report = project.get_report('empty')
+
+    # The second load comes from the cache.
+    cached_project = frontend_c_cpp.load_treesitter_trees([source_file])
+    assert cached_project.get_report('empty') == report
+    assert 'target' in cached_project.extract_calltree(
+        source_file, cached_project.source_code_files[0],
+        'LLVMFuzzerTestOneInput')
+
+    # Changed files are processed again.
+    with open(source_file, 'a') as f:
+        f.write('int other(void) { return 0; }\n')
+    project = frontend_c_cpp.load_treesitter_trees([source_file])
+    assert len(os.listdir(cache_dir)) == 2
+    func_names = [func.name for func in project.source_code_files[0].func_defs]
+    assert 'other' in func_names
+
+    # A corrupt cache is ignored.
+    for cache_file in os.listdir(cache_dir):
+        with open(os.path.join(cache_dir, cache_file), 'wb') as f:
+            f.write(b'not a cache')
+    project = frontend_c_cpp.load_treesitter_trees([source_file])
+    assert [func.name
+            for func in project.source_code_files[0].func_defs] == func_names
+
+
+def test_tree_sitter_cpp_deep_calltree(tmpdir):
+    source_file = os.path.join(tmpdir, 'fuzzer.c')
+    with open(source_file, 'w') as f:
+        f.write('int func200(int x) { return x; }\n')
+        for idx in reversed(range(200)):
+            f.write(f'int func{idx}(int x) {{ return func{idx + 1}(x); }}\n')
+        f.write('int LLVMFuzzerTestOneInput(const char *data, int size) {\n'
+                '  return func0(size);\n'
+                '}\n')
+
+    project = frontend_c_cpp.load_treesitter_trees([source_file])
+    project.generate_report()
+    harness = project.get_source_codes_with_harnesses()[0]
+
+    # The call chain is deeper than the stack allows.
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 100)
+    try:
+        calltree = project.extract_calltree(source_file, harness,
+                                            'LLVMFuzzerTestOneInput')
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+    lines = calltree.splitlines()
+    assert len(lines) == 202
+    assert lines[-1] == f'{"  " * 201}func200 {source_file} 2'
+
+    # The calltree can be streamed and limited in depth or size.
+    stream = io.StringIO()
+    project.write_calltree(stream,
+                           source_file,
+                           harness,
+                           'LLVMFuzzerTestOneInput',
+                           max_depth=2)
+    assert stream.getvalue() == ''.join(line + '\n' for line in lines[:3])
+    stream = io.StringIO()
+    project.write_calltree(stream,
+                           source_file,
+                           harness,
+                           'LLVMFuzzerTestOneInput',
+                           max_nodes=10)
+    assert stream.getvalue() == ''.join(line + '\n' for line in lines[:10])
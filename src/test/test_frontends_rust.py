@@ -208,3 +208,21 @@ def test_tree_sitter_rust_sample9():
 
     assert 'multiply_by_two' in functions_reached_two
     assert 'add_one' not in functions_reached_two
+
+
+def test_tree_sitter_rust_parallel_load():
+    reports = []
+    for jobs in [1, 2]:
+        project, _ = oss_fuzz.analyse_folder(
+            'rust',
+            'src/test/data/source-code/rust/test-project-2',
+            dump_output=False,
+            jobs=jobs,
+        )
+        harness = project.get_source_codes_with_harnesses()[0]
+        reports.append((project.get_report('empty'),
+                        project.extract_calltree(harness.source_file,
+                                                 harness)))
+
+    # Nodes of the trees parsed from macro tokens are restored as well.
+    assert reports[0] == reports[1]
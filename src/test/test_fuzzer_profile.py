@@ -21,6 +21,7 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
 
 from fuzz_introspector import code_coverage  # noqa: E402
 from fuzz_introspector.datatypes import fuzzer_profile  # noqa: E402
+import profile_helpers  # noqa: E402
 
 TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data')
 
@@ -91,26 +92,8 @@ def test_reaches_file_with_refine_path(tmpdir, sample_cfg1):
 
 
 def generate_temp_elem(name, func):
-    return {
-        "functionName": name,
-        "functionsReached": func,
-        "functionSourceFile": '/src/wuffs/fuzz/c/fuzzlib/fuzzlib.c',
-        "linkageType": None,
-        "functionLinenumber": None,
-        "returnType": None,
-        "argCount": None,
-        "argTypes": None,
-        "argNames": None,
-        "BBCount": None,
-        "ICount": None,
-        "EdgeCount": None,
-        "CyclomaticComplexity": None,
-        "functionUses": None,
-        "functionDepth": None,
-        "constantsTouched": None,
-        "BranchProfiles": [],
-        "Callsites": []
-    }
+    return profile_helpers.function_elem(
+        name, func, source_file='/src/wuffs/fuzz/c/fuzzlib/fuzzlib.c')
 
 
 def test_reaches_func(tmpdir, sample_cfg1):
@@ -0,0 +1,131 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test json_report.py"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import constants  # noqa: E402
+from fuzz_introspector import json_report  # noqa: E402
+
+
+def _write_reports(out_dir):
+    json_report.add_project_key_value_to_report('overview',
+                                                {'language': 'c-cpp'}, out_dir)
+    json_report.add_fuzzer_key_value_to_report('fuzz1', 'stats', {'bbs': 3},
+                                               out_dir)
+    json_report.add_analysis_json_str_as_dict_to_report(
+        'Metadata', '{"a": [1, 2]}', out_dir)
+    json_report.add_fuzzer_key_value_to_report('fuzz1', 'coverage', 50.0,
+                                               out_dir)
+    json_report.add_branch_blocker_key_value_to_report(
+        'fuzz1', 'branch_blockers', [{
+            'function_name': 'parse'
+        }], out_dir)
+    json_report.add_project_key_value_to_report('overview', {'é': 'ü'},
+                                                out_dir)
+
+
+def _read_reports(out_dir):
+    reports = []
+    for filename in [constants.SUMMARY_FILE, constants.BRANCH_BLOCKERS_FILE]:
+        with open(os.path.join(out_dir, filename)) as f:
+            reports.append(f.read())
+    return reports
+
+
+@pytest.mark.parametrize('dump_files', [True, False])
+def test_batched_reports(tmpdir, monkeypatch, dump_files):
+    """Batched reports are written once, as when updating the files"""
+    monkeypatch.setattr(constants, 'should_dump_files', dump_files)
+    direct_dir = os.path.join(tmpdir, 'direct')
+    batched_dir = os.path.join(tmpdir, 'batched')
+    for out_dir in [direct_dir, batched_dir]:
+        os.mkdir(out_dir)
+        # Reports from previous runs are kept.
+        with open(os.path.join(out_dir, constants.SUMMARY_FILE), 'w') as f:
+            json.dump({'fuzz0': {'stats': {}}}, f)
+
+    _write_reports(direct_dir)
+    with json_report.batched_reports(batched_dir):
+        # Nested batches share the builder of the run.
+        with json_report.batched_reports(batched_dir + '/'):
+            _write_reports(batched_dir)
+        assert not os.path.isfile(
+            os.path.join(batched_dir, constants.BRANCH_BLOCKERS_FILE))
+    assert _read_reports(batched_dir) == _read_reports(direct_dir)
+    assert sorted(os.listdir(batched_dir)) == sorted(os.listdir(direct_dir))
+
+    with open(os.path.join(batched_dir, constants.SUMMARY_FILE)) as f:
+        summary = json.load(f)
+    if dump_files:
+        assert summary['fuzz1'] == {'stats': {'bbs': 3}, 'coverage': 50.0}
+        assert summary['analyses'] == {'Metadata': {'a': [1, 2]}}
+    else:
+        assert summary == {'fuzz0': {'stats': {}}}
+
+
+def test_write_json_stream(tmpdir, monkeypatch):
+    """Large reports are written in chunks, in the format of json.dump"""
+    monkeypatch.setattr(json_report, 'JSON_WRITE_CHUNK_SIZE', 64)
+    report = {
+        'functions': [{
+            'name': f'func{idx}',
+            'reached': [idx, None, True, 1.5]
+        } for idx in range(100)]
+    }
+    path = os.path.join(tmpdir, 'report.json')
+    json_report.write_json_stream(report, path)
+    with open(path) as f:
+        assert f.read() == json.dumps(report)
+    assert os.listdir(tmpdir) == ['report.json']
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_write_json_records(tmpdir, monkeypatch, use_orjson):
+    """Records are encoded one at a time into a single json list"""
+    if use_orjson:
+        pytest.importorskip('orjson')
+    monkeypatch.setattr(json_report, '_HAS_ORJSON', use_orjson)
+    monkeypatch.setattr(json_report, 'JSON_WRITE_CHUNK_SIZE', 64)
+    records = [{
+        'Func name': f'func{idx}',
+        'Args': ['char *', 'é'],
+        'asserts': [],
+        'I Count': idx,
+    } for idx in range(50)]
+    # orjson does not encode integers wider than 64 bits.
+    records.append({'I Count': 1 << 70})
+
+    path = os.path.join(tmpdir, 'all_functions.js')
+    json_report.write_json_records((record for record in records),
+                                   path,
+                                   prefix='var data = ')
+    with open(path) as f:
+        content = f.read()
+    assert content.isascii()
+    assert content.startswith('var data = ')
+    assert json.loads(content[len('var data = '):]) == records
+    if not use_orjson:
+        assert content == 'var data = ' + json.dumps(records)
+
+    json_report.write_json_records([], path)
+    with open(path) as f:
+        assert f.read() == '[]'
+    assert os.listdir(tmpdir) == ['all_functions.js']
@@ -0,0 +1,118 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test datatypes/project_profile.py"""
+
+import os
+import sys
+import random
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector.datatypes import fuzzer_profile  # noqa: E402
+from fuzz_introspector.datatypes import project_profile  # noqa: E402
+import profile_helpers  # noqa: E402
+
+
+def accummulated_profile(tmpdir, name, elems, runtime_reached):
+    fp = fuzzer_profile.FuzzerProfile(
+        os.path.join(tmpdir, f"fuzzerLogFile-{name}.data"), {
+            "Fuzzer filename": f"/src/{name}.c",
+            "All functions": {
+                "Elements": elems
+            }
+        },
+        "c-cpp",
+        cfg_content="")
+    fp.binary_executable = f"/out/{name}"
+    fp._propagate_functions_reached()
+    fp._set_all_reached_functions()
+    fp._set_all_unreached_functions()
+    fp.functions_reached_by_fuzzer_runtime = runtime_reached
+    return fp
+
+
+def test_merged_profile_reachability(tmpdir):
+    """Test hitcounts and complexities of the merged profile"""
+    elems = [
+        profile_helpers.function_elem("LLVMFuzzerTestOneInput", ["parse"], 1,
+                                      1, "/src/fuzz1.c"),
+        profile_helpers.function_elem("parse", ["read"], 2, 10),
+        profile_helpers.function_elem("read", [], 3, 20),
+        profile_helpers.function_elem("unused", ["read"], 4, 30),
+    ]
+    fuzz1 = accummulated_profile(tmpdir, "fuzz1", elems, [])
+    elems2 = [
+        profile_helpers.function_elem("LLVMFuzzerTestOneInput", ["read"], 1,
+                                      1, "/src/fuzz2.c"),
+        profile_helpers.function_elem("read", [], 3, 20),
+    ]
+    fuzz2 = accummulated_profile(tmpdir, "fuzz2", elems2, ["parse"])
+
+    merged = project_profile.MergedProjectProfile([fuzz1, fuzz2], "c-cpp")
+    assert set(merged.all_functions) == {"parse", "read", "unused"}
+
+    read = merged.all_functions["read"]
+    assert sorted(read.reached_by_fuzzers) == ["fuzz1", "fuzz2"]
+    assert read.hitcount == 2
+    assert sorted(read.incoming_references) == ["parse", "unused"]
+    # The copy of the function in the other profile is updated too.
+    assert fuzz2.all_class_functions["read"].hitcount == 2
+
+    parse = merged.all_functions["parse"]
+    assert parse.reached_by_fuzzers == ["fuzz1"]
+    assert parse.reached_by_fuzzers_runtime == ["fuzz2"]
+    assert sorted(parse.reached_by_fuzzers_combined) == ["fuzz1", "fuzz2"]
+    assert parse.hitcount_combined == 2
+    assert parse.total_cyclomatic_complexity == 5
+    assert parse.new_unreached_complexity == 0
+
+    unused = merged.all_functions["unused"]
+    assert unused.hitcount == 0
+    assert unused.total_cyclomatic_complexity == 7
+    assert unused.new_unreached_complexity == 4
+
+
+def _merge_line_coverage_loop(coverages):
+    merged = coverages[0]
+    for line_counts in coverages[1:]:
+        new_line_counts = []
+        for idx1 in range(len(merged)):
+            ln1, ht1 = merged[idx1]
+            ln2, ht2 = line_counts[idx1] if idx1 < len(line_counts) else merged[idx1]
+            if ln1 != ln2:
+                continue
+            new_line_counts.append((ln1, max(ht1, ht2)))
+        merged = new_line_counts
+    return merged
+
+
+def test_merge_line_coverage():
+    """Columnar merge matches merging line by line"""
+    rand = random.Random(99)
+    for _ in range(200):
+        base = sorted(rand.sample(range(1, 60), rand.randint(0, 20)))
+        coverages = []
+        for _ in range(rand.randint(1, 5)):
+            if coverages and rand.random() < 0.3:
+                coverages.append(rand.choice(coverages))
+                continue
+            lines = list(base)
+            if rand.random() < 0.3:
+                lines = lines[:rand.randint(0, len(lines))]
+            if rand.random() < 0.3 and lines:
+                lines[rand.randrange(len(lines))] += 100
+            coverages.append([(ln, rand.choice([0, 1, 7, 10**10])) for ln in lines])
+        merged = project_profile._merge_line_coverage('func', coverages)
+        assert merged == _merge_line_coverage_loop(coverages)
+        assert all(type(ln) is int and type(ht) is int for ln, ht in merged)
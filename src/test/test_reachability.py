@@ -0,0 +1,87 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test reachability.py"""
+
+import os
+import sys
+import random
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import reachability  # noqa: E402
+
+
+def _brute_force_reached(call_graph, func_name):
+    visited = set()
+    worklist = list(call_graph.get(func_name, []))
+    while worklist:
+        elem = worklist.pop()
+        if elem in visited:
+            continue
+        visited.add(elem)
+        worklist.extend(call_graph.get(elem, []))
+    return visited
+
+
+def test_reachability_dag():
+    """Reachability and depth of an acyclic graph"""
+    graph = reachability.ReachabilityGraph({
+        'main': ['parse', 'process'],
+        'parse': ['read', 'memcpy'],
+        'process': ['read'],
+        'read': ['memcpy'],
+    })
+    assert set(
+        graph.reached_names('main')) == {'parse', 'process', 'read', 'memcpy'}
+    assert set(graph.reached_names('process')) == {'read', 'memcpy'}
+    assert graph.reached_names('memcpy') == []
+    assert graph.reached_names('unknown') == []
+
+    assert graph.function_depth('main') == 3
+    assert graph.function_depth('parse') == 2
+    assert graph.function_depth('read') == 1
+    assert graph.function_depth('memcpy') == 0
+
+
+def test_reachability_cycles():
+    """Functions in a cycle reach each other, but not themselves otherwise"""
+    graph = reachability.ReachabilityGraph({
+        'main': ['a'],
+        'a': ['b'],
+        'b': ['a', 'leaf'],
+        'rec': ['rec'],
+    })
+    assert set(graph.reached_names('main')) == {'a', 'b', 'leaf'}
+    assert set(graph.reached_names('a')) == {'a', 'b', 'leaf'}
+    assert set(graph.reached_names('b')) == {'a', 'b', 'leaf'}
+    assert graph.reached_names('rec') == ['rec']
+
+    assert graph.function_depth('a') == 2
+    assert graph.function_depth('main') == 3
+    assert graph.function_depth('rec') == 1
+
+
+def test_reachability_random_graph():
+    """Compare against a plain traversal on random graphs"""
+    rand = random.Random(1234)
+    for _ in range(20):
+        names = [f'func{idx}' for idx in range(40)]
+        call_graph = {
+            name: rand.sample(names + ['external'], rand.randint(0, 4))
+            for name in names
+        }
+        graph = reachability.ReachabilityGraph(call_graph)
+        for name in names:
+            expected = _brute_force_reached(call_graph, name)
+            assert set(graph.reached_names(name)) == expected